@@ -50,7 +50,8 @@ from qgis.core import (
     QgsRasterLayer,
     QgsCoordinateReferenceSystem,
     QgsVectorLayer,
-    QgsSettings
+    QgsSettings,
+    QgsApplication
 )
 from qgis.gui import QgsMapToolIdentify
 from qgis import utils as qgis_utils
@@ -70,26 +71,10 @@ from .modules.workpanel import Workpanel
 
 # GeoKKP-GIS Modules
 from .modules.initialization import Initialize
-from .modules.featuresearch import FeatureSearchDialog
 
 Initialize()
 
-from .modules.add_layer import AddLayerDialog
-from .modules.add_basemap import AddBasemapDialog
-from .modules.gotoxy import GotoXYDialog
-from .modules.settings import SettingsDialog
-from .modules.plotcoord import PlotCoordinateDialog
-from .modules.login import LoginDialog
-from .modules.openaerialmap import OAMDialog
-from .modules.adjust import AdjustDialog
-from .modules.import_from_file import ImportGeomFromFile
-from .modules.coordinate_transform import CoordinateTransformDialog
-from .modules.layout import LayoutDialog
-from .modules.layout_gu import LayoutGUDialog
-from .modules.trilateration import TrilaterationDialog
-from .modules.triangulation import TriangulationDialog
-from .modules.pengaturan_lokasi import PengaturanLokasiDialog
-from .modules.draw_nlp import DrawNLPDialog
+from .modules.dialogs import DialogRegistry
 from .modules.draw_dimension import (
     DimensionDistanceTool, DimensionAngleTool, DimensionPointTool)
 from .modules.utils import (
@@ -98,6 +83,13 @@ from .modules.utils import (
     icon
 )
 from .modules.memo import app_state
+from .modules.api.base import close_clients
+from .modules.api.cache import response_cache
+from .modules.layer_cache import layer_cache
+from .modules.settings_cache import settings_cache
+from .modules.wilayah_sync import wilayah_store, wilayah_sync
+from .modules.sdo import shutdown_pool
+from .modules.provider import GeoKKPProvider
 
 
 class GeoKKP:
@@ -131,6 +123,7 @@ class GeoKKP:
 
         # Declare instance attributes
         self.actions = []
+        self.provider = None
 
         # initialize locale
         locale = QgsSettings().value('locale/userLocale')[0:2]
@@ -170,25 +163,26 @@ class GeoKKP:
 
         # self.canvasClicked = pyqtSignal('QgsPointXY')
 
-        # Set widgets
-        self.workpanel = Workpanel()
-        self.addlayeraction = AddLayerDialog()
-        self.addbasemapaction = AddBasemapDialog()
-        self.gotoxyaction = GotoXYDialog()
-        self.setting_action = SettingsDialog()
-        self.plotxyaction = PlotCoordinateDialog()
-        self.import_from_file_widget = ImportGeomFromFile(self)
-        self.loginaction = LoginDialog()
-        self.oamaction = OAMDialog()
-        self.adjustaction = AdjustDialog()
-        self.layoutaction = LayoutDialog()
-        self.layoutguaction = LayoutGUDialog()
-        self.trilaterationaction = TrilaterationDialog()
-        self.triangulationaction = TriangulationDialog()
-        self.coordinate_transform_dialog = CoordinateTransformDialog()
-        self.aturlokasi_action = PengaturanLokasiDialog()
-        self.pencarianlokasi_action = FeatureSearchDialog()
-        self.inspeksinlp_action = DrawNLPDialog()
+        # Set widgets, dialogs are created when first opened
+        self.workpanel = None
+        self.dialogs = DialogRegistry()
+        self.dialogs.register('addlayer', 'add_layer', 'AddLayerDialog')
+        self.dialogs.register('addbasemap', 'add_basemap', 'AddBasemapDialog')
+        self.dialogs.register('gotoxy', 'gotoxy', 'GotoXYDialog')
+        self.dialogs.register('settings', 'settings', 'SettingsDialog')
+        self.dialogs.register('plotxy', 'plotcoord', 'PlotCoordinateDialog')
+        self.dialogs.register('import_from_file', 'import_from_file', 'ImportGeomFromFile', self)
+        self.dialogs.register('login', 'login', 'LoginDialog')
+        self.dialogs.register('oam', 'openaerialmap', 'OAMDialog')
+        self.dialogs.register('adjust', 'adjust', 'AdjustDialog')
+        self.dialogs.register('layout', 'layout', 'LayoutDialog')
+        self.dialogs.register('layout_gu', 'layout_gu', 'LayoutGUDialog')
+        self.dialogs.register('trilateration', 'trilateration', 'TrilaterationDialog')
+        self.dialogs.register('triangulation', 'triangulation', 'TriangulationDialog')
+        self.dialogs.register('coordinate_transform', 'coordinate_transform', 'CoordinateTransformDialog')
+        self.dialogs.register('aturlokasi', 'pengaturan_lokasi', 'PengaturanLokasiDialog')
+        self.dialogs.register('pencarianlokasi', 'featuresearch', 'FeatureSearchDialog')
+        self.dialogs.register('inspeksinlp', 'draw_nlp', 'DrawNLPDialog')
         # self.loginaction.loginChanged.connect()
 
     # noinspection PyMethodMayBeStatic
@@ -297,6 +291,9 @@ class GeoKKP:
         # start the deck
         self.run()
 
+        # batch algorithms in the processing toolbox
+        self.initProcessing()
+
         # ========== Menu: Login Pengguna ==========
         # self.add_action(
         #    iconPath("login.png"),
@@ -666,6 +663,18 @@ class GeoKKP:
         )
         self.popupPeralatan.addAction(self.actionFeatureSearch)
 
+        #  --- Sub-menu Hapus Cache ---
+        self.actionPurgeCache = self.add_action(
+            QIcon(':/images/themes/default/mActionDeleteSelected.svg'),
+            text=self.tr(u"Hapus Cache Data Server"),
+            callback=self.purge_cache,
+            add_to_toolbar=False,
+            add_to_menu=False,
+            need_auth=False,
+            parent=self.popupPeralatan
+        )
+        self.popupPeralatan.addAction(self.actionPurgeCache)
+
         # Pengaturan Dropdown menu Peralatan
         self.PeralatanButton = QToolButton()
         self.PeralatanButton.setMenu(self.popupPeralatan)
@@ -783,14 +792,25 @@ class GeoKKP:
         # self.workpanel = None
         self.pluginIsActive = False
 
+    def initProcessing(self):
+        self.provider = GeoKKPProvider()
+        QgsApplication.processingRegistry().addProvider(self.provider)
+
     def unload(self):
         """Removes the plugin menu item and icon from QGIS GUI."""
+        if self.provider is not None:
+            QgsApplication.processingRegistry().removeProvider(self.provider)
+            self.provider = None
+
         for action in self.actions:
             self.iface.removePluginMenu(
                 self.tr(u'&GeoKKP-GIS'),
                 action)
             self.iface.removeToolBarIcon(action)
 
+        # close the dialogs opened in this session
+        self.dialogs.clear()
+
         # remove the dockwidget
         if self.workpanel is not None:
             print("not none")
@@ -814,6 +834,15 @@ class GeoKKP:
                 panel.deleteLater()
                 del panel
 
+        # release the shared API clients
+        wilayah_sync.cancel()
+        close_clients()
+        response_cache.close()
+        wilayah_store.close()
+        shutdown_pool()
+        # write settings still waiting for the debounced sync
+        settings_cache.flush()
+
         # clear all local variables
         clear_all_vars()
 
@@ -826,7 +855,7 @@ class GeoKKP:
             #    removed on close (see self.onClosePlugin method)
             if self.workpanel is None:
                 # Create the dockwidget (after translation) and keep reference
-                self.workpanel = Workpanel()
+                self.workpanel = Workpanel(self.dialogs)
 
             # connect to provide cleanup on closing of dockwidget
             self.workpanel.closingPlugin.connect(self.onClosePlugin)
@@ -959,30 +988,22 @@ class GeoKKP:
         self.iface.mapCanvas().unsetMapTool(self.pointTool)
 
     def aturlokasi(self):
-        if self.aturlokasi_action is None:
-            self.aturlokasi_action = PengaturanLokasiDialog()
-        self.aturlokasi_action.show()
+        self.dialogs.get('aturlokasi').show()
     
     def inspeksinlp(self):
-        if self.inspeksinlp_action is None:
-            self.inspeksinlp_action = DrawNLPDialog()
-        self.inspeksinlp_action.show()
+        self.dialogs.get('inspeksinlp').show()
 
     def gotoxy(self):
-        if self.gotoxyaction is None:
-            self.gotoxyaction = GotoXYDialog()
-        self.gotoxyaction.selectProj.setCrs(QgsCoordinateReferenceSystem('EPSG:4326'))
+        gotoxyaction = self.dialogs.get('gotoxy')
+        gotoxyaction.selectProj.setCrs(QgsCoordinateReferenceSystem('EPSG:4326'))
 
-        # self.gotoxyaction.closingPlugin.connect(self.onClosePlugin)
+        # gotoxyaction.closingPlugin.connect(self.onClosePlugin)
 
         # show the dialog
-        self.gotoxyaction.show()
+        gotoxyaction.show()
 
     def open_settings(self):
-        if self.setting_action is None:
-            self.setting_action = SettingsDialog()
-
-        self.setting_action.show()
+        self.dialogs.get('settings').show()
 
     def search_for_feature(self):
         try:
@@ -990,6 +1011,11 @@ class GeoKKP:
         except Exception as e:
             dialogBox(e)
     
+    def purge_cache(self):
+        response_cache.purge()
+        layer_cache.purge()
+        self.iface.messageBar().pushMessage("Cache data server GeoKKP telah dihapus", level=Qgis.Info)
+
     def toggle_titik_persil(self):
         # check whether batas persil layer (20100) is loaded
         persil_layer = None
@@ -1014,25 +1040,21 @@ class GeoKKP:
             persil_layer.reload()
 
     def coordinate_transform(self):
-        if self.coordinate_transform_dialog is None:
-            self.coordinate_transform_dialog = CoordinateTransformDialog()
+        coordinate_transform_dialog = self.dialogs.get('coordinate_transform')
         # show the dialog
-        self.coordinate_transform_dialog.show()
+        coordinate_transform_dialog.show()
 
     def plotxy(self):
-        if self.plotxyaction is None:
-            self.plotxyaction = PlotCoordinateDialog()
-        self.plotxyaction.listCoordsProj.setCrs(QgsCoordinateReferenceSystem('EPSG:4326'))
+        plotxyaction = self.dialogs.get('plotxy')
+        plotxyaction.listCoordsProj.setCrs(QgsCoordinateReferenceSystem('EPSG:4326'))
 
         # self.gotoxyaction.closingPlugin.connect(self.onClosePlugin)
 
         # show the dialog
-        self.plotxyaction.show()
+        plotxyaction.show()
 
     def print_layout(self):
-        if self.layoutaction is None:
-            self.layoutaction = LayoutDialog()
-        self.layoutaction.show()
+        self.dialogs.get('layout').show()
 
     # def layout_gu(self):
     #     if self.layoutguaction is None:
@@ -1040,24 +1062,16 @@ class GeoKKP:
     #     self.layoutguaction.show()
 
     def trilateration(self):
-        if self.trilaterationaction is None:
-            self.trilaterationaction = TrilaterationDialog()
-        self.trilaterationaction.show()
+        self.dialogs.get('trilateration').show()
 
     def triangulation(self):
-        if self.triangulationaction is None:
-            self.triangulationaction = TriangulationDialog()
-        self.triangulationaction.show()
+        self.dialogs.get('triangulation').show()
 
     def add_layers(self):
-        if self.addlayeraction is None:
-            self.addlayeraction = AddLayerDialog()
-        self.addlayeraction.show()
+        self.dialogs.get('addlayer').show()
 
     def add_basemap(self):
-        if self.addbasemapaction is None:
-            self.addbasemapaction = AddBasemapDialog()
-        self.addbasemapaction.show()
+        self.dialogs.get('addbasemap').show()
 
     def toggle_cad_mode(self):
         if 'qad' in qgis_utils.active_plugins:
@@ -1068,19 +1082,13 @@ class GeoKKP:
         QMessageBox.warning(None, 'Plugin tidak ditemukan', 'Plugin QAD perlu diaktifkan lebih dahulu')
 
     def import_file(self):
-        if self.import_from_file_widget is None:
-            self.import_from_file_widget = ImportGeomFromFile()
-        self.import_from_file_widget.show()
+        self.dialogs.get('import_from_file').show()
 
     def login_geokkp(self):
-        if self.loginaction is None:
-            self.loginaction = LoginDialog()
-        self.loginaction.show()
+        self.dialogs.get('login').show()
 
     def loadoam(self):
-        if self.oamaction is None:
-            self.oamaction = OAMDialog()
-        self.oamaction.show()
+        self.dialogs.get('oam').show()
 
     def show_atribute(self):
         if self.layer.selectedFeatures():
@@ -1139,9 +1147,7 @@ class GeoKKP:
                 # print(x)
 
     def auto_adjust(self):
-        if self.adjustaction is None:
-            self.adjustaction = AdjustDialog()
-        self.adjustaction.show()
+        self.dialogs.get('adjust').show()
 
     def addlayersmenu(self):
         for action in self.iface.mainWindow().findChildren(QAction):
@@ -22,15 +22,14 @@
  ***************************************************************************/
 """
 
-import os
 
-from qgis.PyQt import QtWidgets, uic
+from qgis.PyQt import QtWidgets
 from qgis.PyQt.QtCore import pyqtSignal
 from qgis.utils import iface
 from qgis.core import QgsProject
+from .modules.ui_loader import load_ui
 
-FORM_CLASS, _ = uic.loadUiType(os.path.join(
-    os.path.dirname(__file__), 'ui/panel_kerja.ui'))
+FORM_CLASS, _ = load_ui('panel_kerja')
 
 
 class GeoKKPDockWidget(QtWidgets.QDockWidget, FORM_CLASS):
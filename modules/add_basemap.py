@@ -1,10 +1,8 @@
-import os
-
 # from qgis.PyQt.QtCore import Qt, QTimer
 # from qgis.PyQt.QtWidgets import QTreeWidgetItem
 from qgis.PyQt.QtGui import QStandardItemModel, QStandardItem
 
-from qgis.PyQt import QtWidgets, uic
+from qgis.PyQt import QtWidgets
 from qgis.PyQt.QtCore import pyqtSignal
 from qgis.utils import iface
 
@@ -12,12 +10,10 @@ from .utils import logMessage, readSetting, loadXYZ
 
 # using utils
 from .utils import icon
-
-data_basemap = readSetting("basemaps")
+from .ui_loader import load_ui
 
 
-FORM_CLASS, _ = uic.loadUiType(os.path.join(
-    os.path.dirname(__file__), '../ui/basemap.ui'))
+FORM_CLASS, _ = load_ui('basemap')
 
 
 class AddBasemapDialog(QtWidgets.QDialog, FORM_CLASS):
@@ -33,7 +29,7 @@ class AddBasemapDialog(QtWidgets.QDialog, FORM_CLASS):
         self.setWindowIcon(icon("icon.png"))
         self.setupUi(self)
 
-        self.populateDaftarBasemap(data_basemap)
+        self.populateDaftarBasemap(readSetting("basemaps"))
         self.buttonTambahLayer.clicked.connect(self.addToQGIS)
 
     def closeEvent(self, event):
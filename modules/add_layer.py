@@ -1,17 +1,15 @@
-import os
 import json
 from qgis.PyQt.QtCore import Qt
 from qgis.PyQt.QtWidgets import QTreeWidgetItem
-from qgis.PyQt import QtWidgets, uic
+from qgis.PyQt import QtWidgets
 from qgis.PyQt.QtCore import pyqtSignal
 from qgis.utils import iface
 
 from .utils import logMessage, readSetting, add_layer, icon
+from .ui_loader import load_ui
 
-data_layer = readSetting("layers")
 
-FORM_CLASS, _ = uic.loadUiType(os.path.join(
-    os.path.dirname(__file__), '../ui/addlayerv2.ui'))
+FORM_CLASS, _ = load_ui('addlayerv2')
 
 
 class AddLayerDialog(QtWidgets.QDialog, FORM_CLASS):
@@ -29,7 +27,7 @@ class AddLayerDialog(QtWidgets.QDialog, FORM_CLASS):
         self.setupUi(self)
 
         try:
-            self.populateDaftarLayer(data_layer)
+            self.populateDaftarLayer(readSetting("layers"))
         except Exception:
             logMessage("daftar layer gagal dimuat")
 
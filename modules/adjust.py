@@ -1,9 +1,7 @@
-import os
-
 from qgis.PyQt.QtCore import Qt
 
 from qgis.core import QgsProject, QgsVectorLayer
-from qgis.PyQt import QtWidgets, uic
+from qgis.PyQt import QtWidgets
 from qgis.PyQt.QtGui import QCursor
 from qgis.PyQt.QtCore import pyqtSignal
 from qgis.utils import iface
@@ -13,13 +11,11 @@ except ImportError:
     from qgis.core import QgsMapLayerProxyModel
 
 # using utils
-from .utils import (
-    icon,
-    snap_geometries_to_layer
-)
+from .utils import icon
+from .snapping import snapping_engine
+from .ui_loader import load_ui
 
-FORM_CLASS, _ = uic.loadUiType(os.path.join(
-    os.path.dirname(__file__), '../ui/adjust.ui'))
+FORM_CLASS, _ = load_ui('adjust')
 
 TARGET_LAYER = '(20100) Batas Persil'
 
@@ -92,13 +88,8 @@ class AdjustDialog(QtWidgets.QDialog, FORM_CLASS):
     def adjust_parcel(self):
         selected_layer_index = self.layer_acuan.currentIndex()
         ref_layer = self.layer_acuan.layer(selected_layer_index)
-        if not ref_layer and not isinstance(self._layer, QgsVectorLayer):
+        if not isinstance(ref_layer, QgsVectorLayer):
             self.layer_acuan_not_found()
+            return
 
-        out = snap_geometries_to_layer(self._layer, ref_layer, only_selected=True)
-        adjusted_features = out.getFeatures()
-
-        selected_feature_ids = [feature.id() for feature in self._selected_features]
-        self._layer.dataProvider().deleteFeatures(selected_feature_ids)
-        self._layer.dataProvider().addFeatures(adjusted_features)
-        self._layer.triggerRepaint()
+        snapping_engine.snap_features(self._layer, self._layer.selectedFeatureIds(), ref_layer)
@@ -0,0 +1,81 @@
+import os
+import sqlite3
+
+from qgis.core import (
+    QgsApplication,
+    QgsFeatureRequest,
+    QgsVectorFileWriter,
+    QgsVectorLayer
+)
+
+from .adm_index import ADM_DISTRICT_FILE, NAME_FIELD
+from .crs import crs_registry
+
+"""
+Batas Administrasi Kabupaten
+===========================================
+
+Konversi data/idn_adm_lv2.json ke GeoPackage dengan indeks atribut WAK
+dan indeks spasial R-tree (sekali, saat pertama dipakai), lalu ambil
+hanya fitur kabupaten yang dipilih ke layer memori.
+"""
+
+ADM_GPKG_FILE = os.path.join(QgsApplication.qgisSettingsDirPath(), 'geokkp', 'idn_adm_lv2.gpkg')
+ADM_TABLE = 'idn_adm_lv2'
+
+
+def _is_current(path, source):
+    return os.path.exists(path) and os.path.getmtime(path) >= os.path.getmtime(source)
+
+
+def ensure_adm_geopackage(path=ADM_GPKG_FILE, source=ADM_DISTRICT_FILE):
+    """
+    Convert the TopoJSON to a GeoPackage unless an up to date one exists.
+    Returns the GeoPackage layer uri, or None when it cannot be written.
+    """
+    uri = f'{path}|layername={ADM_TABLE}'
+    if _is_current(path, source):
+        return uri
+
+    layer = QgsVectorLayer(source, ADM_TABLE, 'ogr')
+    if not layer.isValid():
+        return None
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    options = QgsVectorFileWriter.SaveVectorOptions()
+    options.driverName = 'GPKG'
+    options.layerName = ADM_TABLE
+    options.layerOptions = ['SPATIAL_INDEX=YES']
+    options.forceMulti = True
+    options.actionOnExistingFile = QgsVectorFileWriter.CreateOrOverwriteFile
+    error = QgsVectorFileWriter.writeAsVectorFormat(layer, path, options)
+    if error[0] != QgsVectorFileWriter.NoError:
+        return None
+
+    db = sqlite3.connect(path)
+    try:
+        db.execute(f'CREATE INDEX IF NOT EXISTS {ADM_TABLE}_wak ON {ADM_TABLE} ({NAME_FIELD})')
+        db.commit()
+    finally:
+        db.close()
+    return uri
+
+
+def district_layer(name, layer_name=None):
+    """
+    Memory layer with only the boundary of one kabupaten/kota, or None when
+    no feature has that name. Reads the indexed GeoPackage, or the
+    TopoJSON itself when the GeoPackage cannot be written.
+    """
+    uri = ensure_adm_geopackage() or ADM_DISTRICT_FILE
+    source = QgsVectorLayer(uri, ADM_TABLE, 'ogr')
+    if not source.isValid():
+        return None
+    quoted = name.replace("'", "''")
+    request = QgsFeatureRequest().setFilterExpression(f"\"{NAME_FIELD}\" = '{quoted}'")
+    layer = source.materialize(request)
+    if layer.featureCount() == 0:
+        return None
+    layer.setName(layer_name or name)
+    if not layer.crs().isValid():
+        layer.setCrs(crs_registry.crs('EPSG:4326'))
+    return layer
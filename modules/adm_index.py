@@ -0,0 +1,183 @@
+"""
+Indeks Batas Administrasi Kabupaten
+===========================================
+
+Indeks ringkas dari data/idn_adm_lv2.json: kotak batas, titik pusat,
+zona TM-3 dan urutan fitur setiap kabupaten/kota. Indeks dibuat sekali
+(``python -m modules.adm_index`` atau ``make adm-index``) dan disimpan
+sebagai JSON kecil, sehingga pencarian zona tidak perlu membuka TopoJSON.
+Modul ini tidak bergantung pada qgis.
+"""
+
+import hashlib
+import json
+import math
+import os
+from functools import lru_cache
+
+DATA_DIR = os.path.normpath(os.path.join(os.path.dirname(__file__), '..', 'data'))
+ADM_DISTRICT_FILE = os.path.join(DATA_DIR, 'idn_adm_lv2.json')
+ADM_INDEX_FILE = os.path.join(DATA_DIR, 'idn_adm_lv2_index.json')
+ADM_OBJECT = 'IDN_adm_lv2_district'
+NAME_FIELD = 'WAK'
+
+
+def tm3_zone(lon):
+    """TM-3 zone name of a longitude, as utils.get_tm3_zone"""
+    major = math.floor((lon - 90) / 6) + 46
+    minor = 2 if math.floor((lon - 93) / 3) % 2 == 0 else 1
+    return f'{major}.{minor}'
+
+
+def tm3_zone_epsg(zone):
+    """EPSG code of a TM-3 zone name, as utils.get_epsg_from_tm3_zone"""
+    major, _, minor = zone.partition('.')
+    return 23800 + int(major) * 2 + int(minor or 1) - 64
+
+
+def _decode_arcs(topology):
+    """Absolute coordinates of every arc of a (quantized) topology"""
+    transform = topology.get('transform')
+    arcs = []
+    for arc in topology['arcs']:
+        if transform:
+            (sx, sy), (tx, ty) = transform['scale'], transform['translate']
+            x = y = 0
+            points = []
+            for dx, dy in arc:
+                x += dx
+                y += dy
+                points.append((x * sx + tx, y * sy + ty))
+        else:
+            points = [tuple(point[:2]) for point in arc]
+        arcs.append(points)
+    return arcs
+
+
+def _ring(arcs, indexes):
+    points = []
+    for index in indexes:
+        arc = arcs[index] if index >= 0 else arcs[~index][::-1]
+        points.extend(arc[1:] if points else arc)
+    return points
+
+
+def _ring_moments(ring):
+    """Signed area and first moments of a ring (shoelace formula)"""
+    area = cx = cy = 0.0
+    for (x0, y0), (x1, y1) in zip(ring, ring[1:]):
+        cross = x0 * y1 - x1 * y0
+        area += cross
+        cx += (x0 + x1) * cross
+        cy += (y0 + y1) * cross
+    return area / 2, cx / 6, cy / 6
+
+
+def _polygons(geometry):
+    if geometry['type'] == 'Polygon':
+        return [geometry['arcs']]
+    if geometry['type'] == 'MultiPolygon':
+        return geometry['arcs']
+    return []
+
+
+def read_topology(path=ADM_DISTRICT_FILE):
+    """Decoded arcs and the kabupaten geometries of the TopoJSON"""
+    with open(path, encoding='utf-8') as source:
+        topology = json.load(source)
+    return _decode_arcs(topology), topology['objects'][ADM_OBJECT]['geometries']
+
+
+def feature_rings(arcs, geometry):
+    """Rings of a polygon feature as (ring number in its polygon, points)"""
+    for polygon in _polygons(geometry):
+        for number, indexes in enumerate(polygon):
+            yield number, _ring(arcs, indexes)
+
+
+def feature_summary(arcs, geometry):
+    """Bounding box and area weighted centroid of a polygon feature"""
+    xmin = ymin = math.inf
+    xmax = ymax = -math.inf
+    area = mx = my = 0.0
+    for number, ring in feature_rings(arcs, geometry):
+        xs = [x for x, y in ring]
+        ys = [y for x, y in ring]
+        xmin, xmax = min(xmin, *xs), max(xmax, *xs)
+        ymin, ymax = min(ymin, *ys), max(ymax, *ys)
+        ring_area, ring_mx, ring_my = _ring_moments(ring)
+        # the outer ring adds, holes subtract, whatever their orientation
+        sign = (1 if ring_area >= 0 else -1) * (1 if number == 0 else -1)
+        area += sign * ring_area
+        mx += sign * ring_mx
+        my += sign * ring_my
+    if area:
+        centroid = (mx / area, my / area)
+    else:
+        centroid = ((xmin + xmax) / 2, (ymin + ymax) / 2)
+    return [xmin, ymin, xmax, ymax], centroid, abs(area)
+
+
+def source_digest(path=ADM_DISTRICT_FILE):
+    with open(path, 'rb') as source:
+        return hashlib.sha1(source.read()).hexdigest()
+
+
+def build_index(path=ADM_DISTRICT_FILE):
+    """
+    Index of the kabupaten boundaries, keyed by name. Names used by more
+    than one feature get the combined bounding box and centroid.
+    """
+    arcs, geometries = read_topology(path)
+
+    parts = {}
+    for offset, geometry in enumerate(geometries):
+        properties = geometry.get('properties') or {}
+        bbox, centroid, area = feature_summary(arcs, geometry)
+        parts.setdefault(properties[NAME_FIELD], []).append((offset, properties, bbox, centroid, area))
+
+    districts = {}
+    for name, features in parts.items():
+        total = sum(area for *_, area in features) or 1
+        lon = sum(centroid[0] * area for *_, centroid, area in features) / total
+        lat = sum(centroid[1] * area for *_, centroid, area in features) / total
+        zone = tm3_zone(lon)
+        districts[name] = {
+            'bbox': [
+                round(min(bbox[0] for _, _, bbox, *_ in features), 6),
+                round(min(bbox[1] for _, _, bbox, *_ in features), 6),
+                round(max(bbox[2] for _, _, bbox, *_ in features), 6),
+                round(max(bbox[3] for _, _, bbox, *_ in features), 6),
+            ],
+            'centroid': [round(lon, 6), round(lat, 6)],
+            'zone': zone,
+            'epsg': tm3_zone_epsg(zone),
+            'kode_bpn': [properties.get('KODE_BPN') for _, properties, *_ in features],
+            'offsets': [offset for offset, *_ in features],
+        }
+    return {'source': source_digest(path), 'districts': districts}
+
+
+def write_index(index, path=ADM_INDEX_FILE):
+    with open(path, 'w', encoding='utf-8') as target:
+        json.dump(index, target, ensure_ascii=False, separators=(',', ':'), sort_keys=True)
+
+
+@lru_cache(maxsize=1)
+def load_index(path=ADM_INDEX_FILE):
+    """District index, built from the TopoJSON when the index file is missing"""
+    try:
+        with open(path, encoding='utf-8') as source:
+            return json.load(source)['districts']
+    except (OSError, ValueError, KeyError):
+        return build_index()['districts']
+
+
+def district(name):
+    """Index entry of a kabupaten/kota name, or None"""
+    return load_index().get(name)
+
+
+if __name__ == '__main__':
+    write_index(build_index())
+    print(f'{ADM_INDEX_FILE} ditulis')
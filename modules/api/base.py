@@ -1,9 +1,12 @@
 import json
+from functools import partial, wraps
 
 from .networkaccessmanager import (
     NetworkAccessManager,
     DEFAULT_MAX_REDIRECTS
 )
+from .future import ApiFuture
+from .cache import response_cache
 
 BASE_URL = 'http://10.20.22.90:5001/spatialapi'
 
@@ -11,10 +14,22 @@ DEFAULT_HEADER = {
     b'Content-Type': b'application/json'
 }
 
+# long-lived clients, keyed by base url and client configuration
+_clients = {}
+
+# ms a run_latest call waits for a newer one before it is sent
+DEFAULT_DEBOUNCE = 300
+# reference calls waiting for their reply, keyed like response_cache entries
+_in_flight = {}
+# last run_latest call per channel
+_latest = {}
+
 
 class API:
     def __init__(self, base_url=BASE_URL, *args, **kwargs):
         self._base_url = base_url
+        self._client_args = args
+        self._client_kwargs = kwargs
         self._client = NetworkAccessManager(*args, **kwargs)
 
     def _build_url(self, endpoint):
@@ -48,18 +63,138 @@ class API:
         else:
             return self._client
 
+    def request_async(
+            self,
+            endpoint,
+            method='POST',
+            body=None,
+            headers=DEFAULT_HEADER,
+            redirections=DEFAULT_MAX_REDIRECTS,
+            resolve=None):
+        """
+        Non-blocking request, returns an ApiFuture.
+        Each call gets its own NetworkAccessManager since a manager tracks a
+        single reply, the underlying QgsNetworkAccessManager is still shared.
+        resolve is applied to a successful response before it is handed out.
+        """
+        future = ApiFuture(
+            NetworkAccessManager(*self._client_args, **self._client_kwargs),
+            resolve=resolve
+        )
+        return future.start(
+            url=self._build_url(endpoint),
+            method=method,
+            body=self.build_api_payload(body),
+            headers=dict(headers),
+            redirections=redirections
+        )
+
+    def close(self):
+        self._client.close()
+
+
+def get_client(base_url=BASE_URL, **client_config):
+    """
+    Return the shared API client for base_url, creating it on first use.
+    Reusing a client saves building a NetworkAccessManager and connecting
+    its requestTimedOut trap on every call.
+    """
+    key = (base_url, tuple(sorted(client_config.items())))
+    client = _clients.get(key)
+    if client is None:
+        client = API(base_url=base_url, **client_config)
+        _clients[key] = client
+    return client
+
+
+def close_clients():
+    """Close and forget every shared client, e.g. on logout or plugin unload"""
+    for future in _latest.values():
+        future.cancel()
+    _latest.clear()
+    for client in _clients.values():
+        client.close()
+    _clients.clear()
+
+
+def _forget_in_flight(key, future):
+    if _in_flight.get(key) is future:
+        del _in_flight[key]
+
 
 def api(endpoint, base_url=BASE_URL, method='POST', **client_config):
+    """
+    Turn a payload builder into an API call.
+    The decorated function blocks until the response arrives, its
+    run_async attribute sends the same request and returns an ApiFuture.
+    Responses of reference endpoints go through response_cache, and
+    identical reference calls made while one is running share its request.
+    run_async(..., revalidate=True) asks the server even for a fresh entry,
+    with a conditional request when the entry has validators.
+    run_latest is run_async for calls made in bursts (e.g. while a combo
+    is scrolled): it is sent after a short delay, and a newer call on the
+    same channel cancels it, or the reply it is waiting for.
+    """
     def decorator(function):
+        @wraps(function)
         def wrapper(*args, **kwargs):
-            client = API(base_url=base_url, **client_config)
+            client = get_client(base_url=base_url, **client_config)
             payload = function(*args, **kwargs)
+            blocking = kwargs.get('blocking', True)
+            if blocking:
+                cached, validators = response_cache.lookup(endpoint, payload)
+                if cached is not None:
+                    return cached
+                if validators:
+                    kwargs['headers'] = {**kwargs.get('headers', DEFAULT_HEADER), **validators}
             response = client.request(
                 endpoint=endpoint,
                 method=method,
                 body=payload,
                 **kwargs
             )
+            if blocking:
+                response = response_cache.store(endpoint, payload, response)
             return response
+
+        def run_async(*args, revalidate=False, **kwargs):
+            client = get_client(base_url=base_url, **client_config)
+            payload = function(*args, **kwargs)
+            cached, validators = response_cache.lookup(endpoint, payload, revalidate)
+            if cached is not None:
+                return ApiFuture.resolved(cached)
+            if not response_cache.is_cached(endpoint):
+                return client.request_async(
+                    endpoint=endpoint,
+                    method=method,
+                    body=payload,
+                    headers={**DEFAULT_HEADER, **(validators or {})},
+                )
+
+            key = response_cache.key(endpoint, payload)
+            future = _in_flight.get(key)
+            if future is None or future.done():
+                future = client.request_async(
+                    endpoint=endpoint,
+                    method=method,
+                    body=payload,
+                    headers={**DEFAULT_HEADER, **(validators or {})},
+                    resolve=partial(response_cache.store, endpoint, payload)
+                )
+                _in_flight[key] = future
+                forget = partial(_forget_in_flight, key, future)
+                future.on_finished(lambda _: forget()).on_error(lambda _: forget()).on_cancelled(forget)
+            return ApiFuture.following(future)
+
+        def run_latest(*args, channel=endpoint, delay=DEFAULT_DEBOUNCE, **kwargs):
+            previous = _latest.get(channel)
+            if previous is not None:
+                previous.cancel()
+            future = ApiFuture.deferred(delay, partial(run_async, *args, **kwargs))
+            _latest[channel] = future
+            return future
+
+        wrapper.run_async = run_async
+        wrapper.run_latest = run_latest
         return wrapper
     return decorator
@@ -0,0 +1,186 @@
+import os
+import json
+import time
+import sqlite3
+import hashlib
+
+from qgis.core import QgsApplication
+
+from .networkaccessmanager import Response
+
+# seconds a cached response is served without asking the server,
+# endpoints not listed here are never cached
+HOUR = 60 * 60
+DAY = 24 * HOUR
+CACHE_TTL = {
+    'getPropinsi': 7 * DAY,
+    'getKabupaten': 7 * DAY,
+    'getKecamatan': 7 * DAY,
+    'getDesa': 7 * DAY,
+    'getProgram': DAY,
+    'getProgramInvent': DAY,
+    'getProgramParticipatoryMapping': DAY,
+    'GetZonaTm3ByBerkas': 30 * DAY,
+}
+
+DEFAULT_CACHE_SIZE = 50 * 1024 * 1024
+DEFAULT_CACHE_FILE = os.path.join(QgsApplication.qgisSettingsDirPath(), 'geokkp', 'response_cache.sqlite')
+
+
+def successful(content):
+    """
+    A reply worth caching: valid JSON whose status, when present, is not
+    false. The server reports application errors with HTTP 200 and
+    "status": false, those must not be served again from the cache.
+    """
+    try:
+        payload = json.loads(content)
+    except (TypeError, ValueError):
+        return False
+    return not isinstance(payload, dict) or payload.get('status', True) is not False
+
+
+class ResponseCache:
+    """
+    On-disk cache of API responses for reference endpoints
+
+    Entries are keyed by endpoint and canonicalized payload. A fresh entry
+    (younger than the endpoint TTL) is served without a network request.
+    A stale entry carrying ETag/Last-Modified validators is revalidated
+    with a conditional request, a 304 answer refreshes it in place.
+    The least recently used entries are evicted above max_size bytes.
+    Only replies accepted by validate are stored.
+    """
+
+    def __init__(self, path=DEFAULT_CACHE_FILE, ttl=CACHE_TTL, max_size=DEFAULT_CACHE_SIZE, validate=successful):
+        self._path = path
+        self._ttl = ttl
+        self._max_size = max_size
+        self._validate = validate
+        self._db = None
+
+    def _connection(self):
+        if self._db is None:
+            os.makedirs(os.path.dirname(self._path), exist_ok=True)
+            self._db = sqlite3.connect(self._path)
+            self._db.execute(
+                'CREATE TABLE IF NOT EXISTS response ('
+                'key TEXT PRIMARY KEY, endpoint TEXT, content BLOB, etag TEXT, '
+                'last_modified TEXT, stored_at REAL, accessed_at REAL, size INTEGER)'
+            )
+            self._db.execute('CREATE INDEX IF NOT EXISTS response_accessed ON response (accessed_at)')
+        return self._db
+
+    def is_cached(self, endpoint):
+        return endpoint in self._ttl
+
+    @staticmethod
+    def key(endpoint, payload):
+        canonical = json.dumps(payload, sort_keys=True, separators=(',', ':'))
+        digest = hashlib.sha1(canonical.encode('utf8')).hexdigest()
+        return f'{endpoint}:{digest}'
+
+    def lookup(self, endpoint, payload, revalidate=False):
+        """
+        Return (response, validators). response is set when the entry is
+        fresh, validators holds the conditional request headers of a stale
+        entry, or of any entry when revalidate is set. Both are None on a miss.
+        """
+        if not self.is_cached(endpoint):
+            return None, None
+        key = self.key(endpoint, payload)
+        db = self._connection()
+        row = db.execute(
+            'SELECT content, etag, last_modified, stored_at FROM response WHERE key = ?', (key,)
+        ).fetchone()
+        if row is None:
+            return None, None
+
+        content, etag, last_modified, stored_at = row
+        now = time.time()
+        if not revalidate and now - stored_at < self._ttl[endpoint]:
+            db.execute('UPDATE response SET accessed_at = ? WHERE key = ?', (now, key))
+            db.commit()
+            return cached_response(content), None
+
+        validators = {}
+        if etag:
+            validators[b'If-None-Match'] = etag.encode('latin-1')
+        if last_modified:
+            validators[b'If-Modified-Since'] = last_modified.encode('latin-1')
+        return None, validators or None
+
+    def store(self, endpoint, payload, response):
+        """
+        Save a server response and return the response to hand to the caller.
+        A 304 Not Modified answer is replaced by the cached content.
+        """
+        if not self.is_cached(endpoint):
+            return response
+        key = self.key(endpoint, payload)
+        db = self._connection()
+        now = time.time()
+
+        if response.status_code == 304:
+            row = db.execute('SELECT content FROM response WHERE key = ?', (key,)).fetchone()
+            if row is None:
+                return response
+            db.execute('UPDATE response SET stored_at = ?, accessed_at = ? WHERE key = ?', (now, now, key))
+            db.commit()
+            return cached_response(row[0])
+
+        content = response.content
+        if not response.ok or not self._validate(content):
+            return response
+
+        headers = response.headers or {}
+        db.execute(
+            'INSERT OR REPLACE INTO response VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+            (key, endpoint, content, headers.get('etag'), headers.get('last-modified'), now, now, len(content))
+        )
+        self._evict(db)
+        db.commit()
+        return response
+
+    def _evict(self, db):
+        total = db.execute('SELECT COALESCE(SUM(size), 0) FROM response').fetchone()[0]
+        if total <= self._max_size:
+            return
+        rows = db.execute('SELECT key, size FROM response ORDER BY accessed_at').fetchall()
+        for key, size in rows:
+            if total <= self._max_size:
+                break
+            db.execute('DELETE FROM response WHERE key = ?', (key,))
+            total -= size
+
+    def purge(self, endpoint=None):
+        """Remove every cached response, or only those of endpoint"""
+        db = self._connection()
+        if endpoint is None:
+            db.execute('DELETE FROM response')
+        else:
+            db.execute('DELETE FROM response WHERE endpoint = ?', (endpoint,))
+        db.commit()
+        db.execute('VACUUM')
+
+    def close(self):
+        if self._db is not None:
+            self._db.close()
+            self._db = None
+
+
+def cached_response(content):
+    return Response({
+        'status': 200,
+        'status_code': 200,
+        'status_message': 'OK',
+        'content': bytes(content),
+        'ok': True,
+        'headers': {},
+        'reason': 'Cached response',
+        'exception': None,
+        'from_cache': True,
+    })
+
+
+response_cache = ResponseCache()
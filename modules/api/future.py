@@ -0,0 +1,232 @@
+from qgis.PyQt.QtCore import QObject, QTimer, pyqtSignal
+
+from .networkaccessmanager import RequestsExceptionUserAbort
+
+# running futures, referenced here so they are not garbage collected
+# before their reply arrives
+_running = set()
+
+
+class ApiFuture(QObject):
+    """
+    Handle of a non-blocking API call
+
+    Callbacks can be attached with the on_* methods (chainable) or by
+    connecting the signals directly. A callback attached after the call
+    has completed is invoked immediately.
+
+    Usage
+    -----
+    ::
+        future = endpoints.get_wilayah_sdo.run_async(wilayah_id, 'Desa', srs)
+        future.on_finished(self.load_batas_desa).on_error(self.show_error)
+        ...
+        future.cancel()
+
+    Large responses can be consumed while they download with on_data().
+    The body is then handed to the data callbacks chunk by chunk and is
+    not kept, the finished response has empty content.
+
+    A future can also follow another one, completing as it does: each
+    caller of a shared (de-duplicated) call gets its own handle, and the
+    shared call is aborted once every handle has been cancelled. A
+    deferred future follows the call it makes after a delay, cancelling
+    it before then means no request is sent at all.
+    """
+
+    finished = pyqtSignal(object)
+    failed = pyqtSignal(object)
+    cancelled = pyqtSignal()
+    progress = pyqtSignal(int, int)
+    dataReceived = pyqtSignal(object)
+
+    def __init__(self, client, parent=None, resolve=None):
+        super(ApiFuture, self).__init__(parent)
+        self._client = client
+        self._resolve = resolve
+        self._reply = None
+        self._done = False
+        self._cancelled = False
+        self._response = None
+        self._exception = None
+        self._streaming = False
+        # followed future, and the number of handles following this one
+        self._inner = None
+        self._shares = 0
+        self._timer = None
+
+    @classmethod
+    def resolved(cls, response):
+        """Already completed future, e.g. for a response served from cache"""
+        future = cls(None)
+        future._done = True
+        future._response = response
+        return future
+
+    @classmethod
+    def following(cls, future):
+        """Own handle on a future shared with other callers"""
+        handle = cls(None)
+        _running.add(handle)
+        handle._follow(future)
+        return handle
+
+    @classmethod
+    def deferred(cls, delay, send):
+        """Future of the call send() makes after delay ms, unless cancelled before"""
+        future = cls(None)
+        _running.add(future)
+        future._timer = QTimer(future)
+        future._timer.setSingleShot(True)
+        future._timer.timeout.connect(lambda: future._follow(send()))
+        future._timer.start(delay)
+        return future
+
+    def _follow(self, future):
+        self._timer = None
+        self._inner = future
+        future._shares += 1
+        future.progress.connect(self.progress)
+        if self._streaming:
+            future.on_data(self.dataReceived.emit)
+        future.on_finished(self._inner_finished)
+        future.on_error(self._inner_failed)
+        future.on_cancelled(self._inner_cancelled)
+
+    def _inner_finished(self, response):
+        if not self._done:
+            self._done = True
+            _running.discard(self)
+            self._response = response
+            self.finished.emit(response)
+
+    def _inner_failed(self, exception):
+        if not self._done:
+            self._done = True
+            _running.discard(self)
+            self._exception = exception
+            self.failed.emit(exception)
+
+    def _inner_cancelled(self):
+        if not self._done:
+            self._done = True
+            self._cancelled = True
+            _running.discard(self)
+            self._exception = RequestsExceptionUserAbort('Request cancelled')
+            self.cancelled.emit()
+
+    def _release(self):
+        """A following handle was cancelled, abort once none is left"""
+        self._shares -= 1
+        if self._shares <= 0:
+            self.cancel()
+
+    def start(self, **request_kwargs):
+        self._client.request(blocking=False, **request_kwargs)
+        self._reply = self._client.reply
+        self._reply.finished.connect(self._reply_finished)
+        self._reply.downloadProgress.connect(self.progress)
+        _running.add(self)
+        return self
+
+    def _reply_finished(self):
+        # NetworkAccessManager.replyFinished is connected first and has
+        # already filled the result
+        result = self._client.httpResult()
+        self._done = True
+        _running.discard(self)
+        self._client.close()
+        self._reply = None
+
+        if self._cancelled:
+            self._exception = RequestsExceptionUserAbort(result.reason)
+            self.cancelled.emit()
+        elif result.ok and self._streaming:
+            # the body was read in _ready_read, except what arrived last
+            if result.content:
+                self.dataReceived.emit(bytes(result.content))
+            result.content = b''
+            self._response = result
+            self.finished.emit(result)
+        elif result.ok:
+            if self._resolve is not None:
+                result = self._resolve(result)
+            self._response = result
+            self.finished.emit(result)
+        else:
+            self._exception = result.exception or Exception(result.reason)
+            self.failed.emit(self._exception)
+
+    def _ready_read(self):
+        data = self._reply.readAll()
+        if data:
+            self.dataReceived.emit(bytes(data))
+
+    def on_data(self, callback):
+        """Receive the response body in chunks as it arrives"""
+        if self._done:
+            if self._response is not None and self._response.content:
+                callback(bytes(self._response.content))
+            return self
+        if not self._streaming and self._reply is not None:
+            self._streaming = True
+            self._reply.readyRead.connect(self._ready_read)
+        elif not self._streaming and self._inner is not None:
+            self._streaming = True
+            self._inner.on_data(self.dataReceived.emit)
+        elif self._timer is not None:
+            # forwarded from the call once it is made
+            self._streaming = True
+        self.dataReceived.connect(callback)
+        return self
+
+    def on_finished(self, callback):
+        if self._done and self._response is not None:
+            callback(self._response)
+        else:
+            self.finished.connect(callback)
+        return self
+
+    def on_error(self, callback):
+        if self._done and self._exception is not None and not self._cancelled:
+            callback(self._exception)
+        else:
+            self.failed.connect(callback)
+        return self
+
+    def on_cancelled(self, callback):
+        if self._done and self._cancelled:
+            callback()
+        else:
+            self.cancelled.connect(callback)
+        return self
+
+    def on_progress(self, callback):
+        self.progress.connect(callback)
+        return self
+
+    def cancel(self):
+        if self._done:
+            return False
+        if self._client is not None:
+            self._cancelled = True
+            self._client.abort()
+            return True
+        if self._timer is not None:
+            self._timer.stop()
+        elif self._inner is not None:
+            self._inner._release()
+        self._inner_cancelled()
+        return True
+
+    def done(self):
+        return self._done
+
+    def is_cancelled(self):
+        return self._cancelled
+
+    def response(self):
+        return self._response
+
+    def exception(self):
+        return self._exception
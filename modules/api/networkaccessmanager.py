@@ -140,9 +140,16 @@ class NetworkAccessManager(object):
         self.reply = None
         self.debug = debug
         self.exception_class = exception_class
+        self.default_exception_class = exception_class
         self.on_abort = False
         self.blocking_mode = False
-        self.http_call_result = Response({
+        self.http_call_result = self._empty_result()
+        self._timed_reply = None
+        self._timeout_connected = False
+
+    @staticmethod
+    def _empty_result():
+        return Response({
             'status': 0,
             'status_code': 0,
             'status_message': '',
@@ -175,6 +182,10 @@ class NetworkAccessManager(object):
         """
         self.msg_log(u'http_call request: {0}'.format(url))
 
+        # the manager may be reused by a long-lived client, start from a clean state
+        self.http_call_result = self._empty_result()
+        self.exception_class = self.default_exception_class
+
         self.blocking_mode = blocking
         req = QNetworkRequest()
         # Avoid double quoting form QUrl
@@ -199,6 +210,7 @@ class NetworkAccessManager(object):
             QgsAuthManager.instance().updateNetworkRequest(req, self.authid)
         if self.reply is not None and self.reply.isRunning():
             self.reply.close()
+            self._disconnect_reply()
         if method.lower() == 'delete':
             func = getattr(QgsNetworkAccessManager.instance(), 'deleteResource')
         else:
@@ -221,7 +233,11 @@ class NetworkAccessManager(object):
 
         # necessary to trap local timout manage by QgsNetworkAccessManager
         # calling QgsNetworkAccessManager::abortRequest
-        QgsNetworkAccessManager.instance().requestTimedOut.connect(self.requestTimedOut)
+        # connected once for the lifetime of this manager, see close()
+        self._timed_reply = self.reply
+        if not self._timeout_connected:
+            QgsNetworkAccessManager.instance().requestTimedOut.connect(self.requestTimedOut)
+            self._timeout_connected = True
 
         self.reply.sslErrors.connect(self.sslErrors)
         self.reply.finished.connect(self.replyFinished)
@@ -261,8 +277,11 @@ class NetworkAccessManager(object):
         pass
 
     # @pyqtSlot(QNetworkReply)
-    def requestTimedOut(self, QNetworkReply):
+    def requestTimedOut(self, reply):
         """Trap the timeout. In Async mode requestTimedOut is called after replyFinished"""
+        if isinstance(reply, QNetworkReply) and reply is not self._timed_reply:
+            # QgsNetworkAccessManager is shared, ignore timeouts of other requests
+            return
         # adapt http_call_result basing on receiving qgs timer timout signal
         self.exception_class = RequestsExceptionTimeout
         self.http_call_result.exception = RequestsExceptionTimeout("Timeout error")
@@ -276,8 +295,10 @@ class NetworkAccessManager(object):
         self.http_call_result.status = httpStatus
         self.http_call_result.status_message = httpStatusMessage
         for k, v in self.reply.rawHeaderPairs():
-            self.http_call_result.headers[str(k)] = str(v)
-            self.http_call_result.headers[str(k).lower()] = str(v)
+            name = bytes(k).decode('latin-1')
+            value = bytes(v).decode('latin-1')
+            self.http_call_result.headers[name] = value
+            self.http_call_result.headers[name.lower()] = value
 
         if err != QNetworkReply.NoError:
             # handle error
@@ -330,6 +351,7 @@ class NetworkAccessManager(object):
                     self.reply.url().toString(), redirectionUrl.toString())
                 self.msg_log(msg)
 
+                self._disconnect_reply()
                 self.reply.deleteLater()
                 self.reply = None
                 self.request(redirectionUrl.toString())
@@ -362,15 +384,23 @@ class NetworkAccessManager(object):
             if self.reply.isRunning():
                 self.reply.close()
             self.msg_log("Deleting reply ...")
-            # Disconnect all slots
-            self.reply.sslErrors.disconnect(self.sslErrors)
-            self.reply.finished.disconnect(self.replyFinished)
-            self.reply.downloadProgress.disconnect(self.downloadProgress)
+            self._disconnect_reply()
             self.reply.deleteLater()
             self.reply = None
         else:
             self.msg_log("Reply was already deleted ...")
 
+    def _disconnect_reply(self):
+        """Disconnect the reply slots connected in request()"""
+        if self.reply is None:
+            return
+        try:
+            self.reply.sslErrors.disconnect(self.sslErrors)
+            self.reply.finished.disconnect(self.replyFinished)
+            self.reply.downloadProgress.disconnect(self.downloadProgress)
+        except TypeError:
+            pass
+
     # @pyqtSlot()
     def sslErrors(self, ssl_errors):
         """
@@ -391,3 +421,17 @@ class NetworkAccessManager(object):
         if (self.reply and self.reply.isRunning()):
             self.on_abort = True
             self.reply.abort()
+
+    def close(self):
+        """
+        Abort any running request and release the timeout trap connected on
+        the shared QgsNetworkAccessManager instance
+        """
+        self.abort()
+        if self._timeout_connected:
+            try:
+                QgsNetworkAccessManager.instance().requestTimedOut.disconnect(self.requestTimedOut)
+            except TypeError:
+                pass
+            self._timeout_connected = False
+        self._timed_reply = None
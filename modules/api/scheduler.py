@@ -0,0 +1,103 @@
+from qgis.PyQt.QtCore import QObject, pyqtSignal
+
+
+class RequestScheduler(QObject):
+    """
+    Run a set of non-blocking API calls, firing every call as soon as the
+    calls it depends on have finished. Independent calls run in parallel,
+    so the total wait is the critical path instead of the sum of round trips.
+
+    A call is a function receiving the dict of finished responses (keyed by
+    name) and returning an ApiFuture, or None to skip it. Calls depending on
+    a failed or skipped call are skipped as well.
+
+    Usage
+    -----
+    ::
+        scheduler = RequestScheduler()
+        scheduler.add('provinsi', lambda r: endpoints.get_provinsi_by_kantor.run_async(kantor_id, tipe))
+        scheduler.add('kabupaten', lambda r: ..., depends=['provinsi'])
+        scheduler.finished.connect(on_ready)
+        scheduler.start()
+    """
+
+    finished = pyqtSignal(dict)
+    failed = pyqtSignal(str, object)
+
+    def __init__(self, parent=None):
+        super(RequestScheduler, self).__init__(parent)
+        self._calls = {}
+        self._depends = {}
+        self._futures = {}
+        self._results = {}
+        self._settled = set()
+        self._done = False
+
+    def add(self, name, call, depends=()):
+        for dependency in depends:
+            if dependency not in self._calls:
+                raise ValueError(f'Unknown dependency {dependency} for {name}')
+        self._calls[name] = call
+        self._depends[name] = tuple(depends)
+        return self
+
+    def start(self):
+        self._schedule()
+        return self
+
+    def cancel(self):
+        for future in list(self._futures.values()):
+            future.cancel()
+
+    def results(self):
+        return dict(self._results)
+
+    def _schedule(self):
+        progressed = True
+        while progressed:
+            progressed = False
+            for name, depends in self._depends.items():
+                if name in self._futures or name in self._settled:
+                    continue
+                if any(dependency in self._settled and dependency not in self._results
+                       for dependency in depends):
+                    # a dependency failed or was skipped
+                    self._settle(name)
+                    progressed = True
+                elif all(dependency in self._results for dependency in depends):
+                    self._fire(name)
+                    progressed = True
+
+        if not self._done and len(self._settled) == len(self._calls):
+            self._done = True
+            self.finished.emit(self.results())
+
+    def _fire(self, name):
+        try:
+            future = self._calls[name](self.results())
+        except Exception as e:
+            self.failed.emit(name, e)
+            self._settle(name)
+            return
+        if future is None:
+            self._settle(name)
+            return
+        self._futures[name] = future
+        future.on_finished(lambda response: self._call_finished(name, response))
+        future.on_error(lambda exception: self._call_failed(name, exception))
+        future.on_cancelled(lambda: self._call_failed(name, None))
+
+    def _settle(self, name):
+        self._futures.pop(name, None)
+        self._settled.add(name)
+
+    def _call_finished(self, name, response):
+        self._results[name] = response
+        self._settle(name)
+        self._schedule()
+
+    def _call_failed(self, name, exception):
+        if exception is not None:
+            self.failed.emit(name, exception)
+        self._settle(name)
+        self._schedule()
@@ -0,0 +1,148 @@
+"""
+Transformasi Koordinat Massal
+===========================================
+
+Pembacaan daftar koordinat (tempelan teks atau CSV) dan transformasi
+per blok. Titik dikelompokkan menurut zona UTM / TM-3 tujuan lalu setiap
+kelompok ditransformasi dalam satu panggilan (pyproj bila tersedia).
+Modul ini tidak bergantung pada qgis.
+"""
+
+import re
+from functools import lru_cache
+
+import numpy as np
+
+try:
+    from pyproj import Transformer
+except ImportError:
+    Transformer = None
+
+# TM-3 zone 46.2 (EPSG:23830) starts at 93 E, every zone is 3 degrees wide
+TM3_FIRST_EPSG = 23830
+TM3_LAST_EPSG = 23845
+TM3_WEST = 93.0
+TM3_WIDTH = 3.0
+
+GEOGRAPHIC = 'EPSG:4326'
+TARGET_UTM = 'UTM'
+TARGET_TM3 = 'TM3'
+
+CHUNK_SIZE = 50000
+
+_DELIMITER = re.compile(r'[\s,;]+')
+
+
+def parse_coordinate_line(line):
+    """
+    Points of one line: "x, y", "id, x, y" or the "x,y;x,y" form accepted
+    by the single point dialog. Returns a list of (id, x, y), empty for
+    blank and header lines.
+    """
+    line = line.strip()
+    if not line or line.startswith('#'):
+        return []
+    if ',' in line and ';' in line:
+        parts = [part.split(',') for part in line.split(';') if part.strip()]
+    else:
+        parts = [_DELIMITER.split(line)]
+
+    points = []
+    for tokens in parts:
+        tokens = [token.strip().strip('"') for token in tokens]
+        if len(tokens) < 2:
+            continue
+        point_id, tokens = (tokens[0], tokens[1:3]) if len(tokens) > 2 else (None, tokens)
+        try:
+            x, y = float(tokens[0]), float(tokens[1])
+        except ValueError:
+            continue
+        points.append((point_id, x, y))
+    return points
+
+
+def iter_coordinate_chunks(lines, chunk_size=CHUNK_SIZE):
+    """
+    Read lines of coordinates into chunks of (ids, x, y) arrays. Points
+    without an id column are numbered by their position in the input.
+    """
+    ids, xs, ys = [], [], []
+    number = 0
+    for line in lines:
+        for point_id, x, y in parse_coordinate_line(line):
+            number += 1
+            ids.append(point_id if point_id is not None else str(number))
+            xs.append(x)
+            ys.append(y)
+        if len(xs) >= chunk_size:
+            yield np.array(ids, dtype=object), np.array(xs), np.array(ys)
+            ids, xs, ys = [], [], []
+    if xs:
+        yield np.array(ids, dtype=object), np.array(xs), np.array(ys)
+
+
+def tm3_epsg_array(lon):
+    """EPSG codes of the TM-3 zones of longitudes, 0 outside Indonesia"""
+    code = TM3_FIRST_EPSG + np.floor((np.asarray(lon, dtype=float) - TM3_WEST) / TM3_WIDTH)
+    valid = (code >= TM3_FIRST_EPSG) & (code <= TM3_LAST_EPSG)
+    return np.where(valid, code, 0).astype(np.int64)
+
+
+def utm_epsg_array(lon, lat):
+    """EPSG codes of the WGS 84 / UTM zones of points"""
+    lon = np.asarray(lon, dtype=float)
+    zone = np.floor((lon + 180) / 6) + 1
+    valid = np.isfinite(zone) & (zone >= 1) & (zone <= 60)
+    code = np.where(np.asarray(lat) < 0, 32700, 32600) + np.where(valid, zone, 0)
+    return np.where(valid, code, 0).astype(np.int64)
+
+
+@lru_cache(maxsize=64)
+def _transformer(source, destination):
+    return Transformer.from_crs(source, destination, always_xy=True)
+
+
+def pyproj_transform(source, destination, x, y):
+    """Transform arrays of x (easting / longitude) and y in one call"""
+    return _transformer(source, destination).transform(x, y)
+
+
+def transform_chunks(chunks, source, target, transform=None):
+    """
+    Transform chunks of (ids, x, y) from the source CRS (auth id or WKT).
+
+    The target is an auth id, or TARGET_UTM / TARGET_TM3 to pick the zone
+    of every point; points are then grouped by zone and every group is
+    transformed with one call of ``transform(source, destination, x, y)``.
+    Yields (ids, x, y, out_x, out_y, epsg) per chunk in input order, with
+    NaN and epsg 0 for points outside the zones.
+    """
+    if transform is None:
+        if Transformer is None:
+            raise RuntimeError('pyproj tidak tersedia')
+        transform = pyproj_transform
+
+    for ids, x, y in chunks:
+        out_x = np.full(len(x), np.nan)
+        out_y = np.full(len(x), np.nan)
+        if target in (TARGET_UTM, TARGET_TM3):
+            if source == GEOGRAPHIC:
+                lon, lat = x, y
+            else:
+                lon, lat = (np.asarray(a) for a in transform(source, GEOGRAPHIC, x, y))
+            if target == TARGET_TM3:
+                codes = tm3_epsg_array(lon)
+            else:
+                codes = utm_epsg_array(lon, lat)
+        else:
+            codes = np.full(len(x), target, dtype=object)
+
+        for code in np.unique(codes):
+            if not code:
+                continue
+            mask = codes == code
+            destination = f'EPSG:{code}' if isinstance(code, np.integer) else code
+            group_x, group_y = transform(source, destination, x[mask], y[mask])
+            out_x[mask] = group_x
+            out_y[mask] = group_y
+        yield ids, x, y, out_x, out_y, codes
@@ -1,25 +1,38 @@
-import os
-import math
+import csv
 from functools import partial
 
 from qgis.PyQt.QtGui import QIcon
 
-from qgis.PyQt import uic
 from qgis.PyQt.QtWidgets import QApplication, QDialog
-from qgis.PyQt.QtCore import pyqtSignal
-from qgis.utils import iface
-
+from qgis.PyQt.QtCore import pyqtSignal, QVariant
 from qgis.core import (
+    QgsCsException,
+    QgsFeature,
+    QgsField,
+    QgsFields,
+    QgsGeometry,
     QgsPointXY,
-    QgsCoordinateTransform,
     QgsProject,
-    QgsCoordinateReferenceSystem)
+    QgsVectorLayer
+)
+from qgis.utils import iface
 
 # using utils
 from .utils import icon, parse_raw_coordinate, logMessage
+from .crs import crs_registry
+from .batch_transform import (
+    GEOGRAPHIC,
+    TARGET_TM3,
+    TARGET_UTM,
+    Transformer,
+    iter_coordinate_chunks,
+    pyproj_transform,
+    transform_chunks
+)
+from .ui_loader import load_ui
 
-FORM_CLASS, _ = uic.loadUiType(os.path.join(
-    os.path.dirname(__file__), '../ui/coordtrans.ui'))
+FORM_CLASS, _ = load_ui('coordtrans')
+BATCH_FORM_CLASS, _ = load_ui('coordtrans_batch')
 
 
 class CoordinateTransformDialog(QDialog, FORM_CLASS):
@@ -71,9 +84,9 @@ class CoordinateTransformDialog(QDialog, FORM_CLASS):
 
         # CRS
         self.coordinate_systems = [
-            QgsCoordinateReferenceSystem("EPSG:4326"),  # lat long
-            QgsCoordinateReferenceSystem("EPSG:32749"),  # UTM ?
-            QgsCoordinateReferenceSystem("EPSG:3857"),  # TM3 ?
+            crs_registry.crs("EPSG:4326"),  # lat long
+            crs_registry.crs("EPSG:32749"),  # UTM ?
+            crs_registry.crs("EPSG:3857"),  # TM3 ?
         ]
 
         # Copy icon
@@ -93,25 +106,32 @@ class CoordinateTransformDialog(QDialog, FORM_CLASS):
             self.copy_buttons[i].clicked.connect(partial(self.copy_clicked, i))
             self.copy_buttons[i].setToolTip("Salin koordinat dari %s" % self.names[i])
 
+        self.batch_dialog = None
+        self.batch_button.clicked.connect(self.show_batch)
+
     def transform_coordinate(self, source_crs, target_crs, point):
-        trans = QgsCoordinateTransform(source_crs, target_crs, QgsProject.instance())
+        trans = crs_registry.transform(source_crs, target_crs)
         new_point = trans.transform(point)
         return new_point
 
     def parse_coordinate(self, lineedit_index):
         coordinate_text = self.lineedits[lineedit_index].text()
         points = parse_raw_coordinate(coordinate_text)
-        # TODO: Extend with more than one coordinates
         first_point = next(points)
         return first_point
 
     def transform_clicked(self, button_index):
+        coordinate_text = self.lineedits[button_index].text()
+        if ';' in coordinate_text.strip().strip(';'):
+            # more than one point, continue in the batch mode
+            self.show_batch(text=coordinate_text, source=self.coordinate_systems[button_index])
+            return
         point = self.parse_coordinate(button_index)
 
         for i in range(len(self.names)):
             if i != button_index:
                 if i == 0:  # lon lat
-                    crs = QgsCoordinateReferenceSystem("EPSG:4326")
+                    crs = crs_registry.crs("EPSG:4326")
                     new_point = self.transform_coordinate(
                         self.coordinate_systems[button_index], crs, point)
                 elif i == 1:  # UTM:
@@ -139,22 +159,166 @@ class CoordinateTransformDialog(QDialog, FORM_CLASS):
         self.iface.statusBarIface().showMessage(
             "'{}' dari {} berhasil disalin".format(text, self.names[button_index]), 3000)
 
+    def show_batch(self, checked=False, text=None, source=None):
+        if self.batch_dialog is None:
+            self.batch_dialog = BatchTransformDialog(self)
+        if text is not None:
+            self.batch_dialog.input_text.setPlainText(text.replace(';', '\n'))
+        if source is not None:
+            self.batch_dialog.source_crs.setCrs(source)
+        self.batch_dialog.show()
+        self.batch_dialog.raise_()
+
     def closeEvent(self, event):
         self.closingPlugin.emit()
         event.accept()
 
     def get_crs_utm(self, lon, lat):
-        zone = (math.floor((lon + 180) / 6) ) + 1
-        epsg_code = 32600
-        epsg_code += int(zone)
-        if (lat < 0): # South
-            epsg_code += 100
-        return QgsCoordinateReferenceSystem("EPSG:%d" % epsg_code)
+        return crs_registry.utm_crs(lon, lat)
 
     def get_crs_tm3(self, lon, lat):
-        # find the CRS
-        point = QgsPointXY(lon, lat)
-        for epsg_code in range(23830, 23846):  # TM3
-            crs = QgsCoordinateReferenceSystem("EPSG:%d" % epsg_code)
-            if (crs.bounds().contains(point)):
-                return crs
+        # zone from the longitude, None outside the TM-3 zones of Indonesia
+        return crs_registry.tm3_crs(lon)
+
+
+class BatchTransformDialog(QDialog, BATCH_FORM_CLASS):
+    """
+    Transform lists of coordinates, pasted or read from a CSV file, into
+    lat long, the UTM / TM-3 zone of each point or any other CRS. Input
+    is read in chunks, the results are written to a CSV file or to one
+    point layer per target zone as each chunk is done.
+    """
+
+    TARGETS = [GEOGRAPHIC, TARGET_UTM, TARGET_TM3, None]
+
+    def __init__(self, parent=None):
+        super(BatchTransformDialog, self).__init__(parent)
+        self.setWindowIcon(icon("icon.png"))
+        self.setupUi(self)
+
+        self.source_crs.setCrs(crs_registry.crs(GEOGRAPHIC))
+        self.target_crs.setCrs(crs_registry.crs(GEOGRAPHIC))
+        self.target_combo.currentIndexChanged.connect(
+            lambda index: self.target_crs.setEnabled(self.TARGETS[index] is None))
+        self.output_combo.currentIndexChanged.connect(
+            lambda index: self.output_file.setEnabled(index == 1))
+        self.buttonBox.accepted.connect(self.run)
+
+        self.crs_lookup = {}
+        self.layers = {}
+
+    def crs_key(self, crs):
+        """Auth id of a CRS, or its WKT for custom CRS"""
+        key = crs.authid() if crs.authid().startswith('EPSG:') else crs.toWkt()
+        self.crs_lookup[key] = crs
+        return key
+
+    def qgis_transform(self, source, destination, x, y):
+        """Fallback for pyproj, one QgsCoordinateTransform call per point"""
+        transform = crs_registry.transform(
+            self.crs_lookup.get(source, source), self.crs_lookup.get(destination, destination)
+        )
+        out_x, out_y = [], []
+        for px, py in zip(x.tolist(), y.tolist()):
+            try:
+                point = transform.transform(QgsPointXY(px, py))
+                out_x.append(point.x())
+                out_y.append(point.y())
+            except QgsCsException:
+                out_x.append(float('nan'))
+                out_y.append(float('nan'))
+        return out_x, out_y
+
+    def input_lines(self):
+        path = self.input_file.filePath()
+        if path:
+            with open(path, newline='', encoding='utf-8-sig') as csv_file:
+                yield from csv_file
+        else:
+            yield from self.input_text.toPlainText().splitlines()
+
+    def run(self):
+        source = self.crs_key(self.source_crs.crs())
+        target = self.TARGETS[self.target_combo.currentIndex()]
+        if target is None:
+            target = self.crs_key(self.target_crs.crs())
+        transform = pyproj_transform if Transformer is not None else self.qgis_transform
+        if self.output_combo.currentIndex() == 1 and not self.output_file.filePath():
+            self.status_label.setText("Pilih file CSV hasil")
+            return
+
+        chunks = transform_chunks(iter_coordinate_chunks(self.input_lines()), source, target, transform)
+        try:
+            if self.output_combo.currentIndex() == 1:
+                count = self.write_csv(chunks, self.output_file.filePath())
+            else:
+                count = self.write_layers(chunks)
+        except Exception as e:
+            logMessage(f"Transformasi massal gagal: {e}")
+            self.status_label.setText(f"Transformasi gagal: {e}")
+            return
+        self.status_label.setText(f"{count} titik selesai ditransformasi")
+
+    def show_progress(self, count):
+        self.status_label.setText(f"{count} titik ...")
+        QApplication.processEvents()
+
+    def write_csv(self, chunks, path):
+        count = 0
+        with open(path, 'w', newline='', encoding='utf-8') as csv_file:
+            writer = csv.writer(csv_file)
+            writer.writerow(['id', 'x_asal', 'y_asal', 'x', 'y', 'crs'])
+            for ids, x, y, out_x, out_y, codes in chunks:
+                crs_names = [self.crs_name(code) for code in codes.tolist()]
+                writer.writerows(zip(ids.tolist(), x.tolist(), y.tolist(),
+                                     out_x.tolist(), out_y.tolist(), crs_names))
+                count += len(ids)
+                self.show_progress(count)
+        return count
+
+    def write_layers(self, chunks):
+        count = 0
+        self.layers = {}
+        for ids, x, y, out_x, out_y, codes in chunks:
+            features = {}
+            rows = zip(ids.tolist(), x.tolist(), y.tolist(), out_x.tolist(), out_y.tolist(), codes.tolist())
+            for point_id, px, py, qx, qy, code in rows:
+                if not code or qx != qx:
+                    continue
+                feature = QgsFeature(self.batch_layer(code).fields())
+                feature.setAttributes([point_id, px, py])
+                feature.setGeometry(QgsGeometry.fromPointXY(QgsPointXY(qx, qy)))
+                features.setdefault(code, []).append(feature)
+            for code, zone_features in features.items():
+                self.layers[code].dataProvider().addFeatures(zone_features)
+            count += len(ids)
+            self.show_progress(count)
+
+        for layer in self.layers.values():
+            layer.updateExtents()
+            QgsProject.instance().addMapLayer(layer)
+        return count
+
+    def crs_name(self, code):
+        if not code:
+            return ''
+        if isinstance(code, int):
+            return f'EPSG:{code}'
+        return self.crs_lookup[code].authid() if code in self.crs_lookup else code
+
+    def batch_layer(self, code):
+        layer = self.layers.get(code)
+        if layer is None:
+            crs = crs_registry.crs(f'EPSG:{code}') if isinstance(code, int) else self.crs_lookup.get(code)
+            if crs is None:
+                crs = crs_registry.crs(code)
+            layer = QgsVectorLayer("Point", f"Transformasi {crs.authid() or crs.description()}", "memory")
+            layer.setCrs(crs)
+            fields = QgsFields()
+            fields.append(QgsField("id", QVariant.String))
+            fields.append(QgsField("x_asal", QVariant.Double))
+            fields.append(QgsField("y_asal", QVariant.Double))
+            layer.dataProvider().addAttributes(fields)
+            layer.updateFields()
+            self.layers[code] = layer
+        return layer
@@ -0,0 +1,128 @@
+import math
+import threading
+
+from qgis.PyQt.QtCore import QCoreApplication, QThread
+from qgis.core import QgsCoordinateReferenceSystem, QgsCoordinateTransform, QgsProject
+
+from .batch_transform import TM3_FIRST_EPSG, TM3_LAST_EPSG, TM3_WEST, TM3_WIDTH
+
+"""
+Registry CRS dan Transformasi Koordinat
+===========================================
+
+Objek QgsCoordinateReferenceSystem dan QgsCoordinateTransform dibuat
+sekali lalu dipakai ulang, termasuk penentuan zona TM-3 / UTM dari bujur
+secara aritmetika
+"""
+
+
+def tm3_epsg(lon):
+    """EPSG code of the TM-3 zone containing a longitude, None outside Indonesia"""
+    code = TM3_FIRST_EPSG + math.floor((lon - TM3_WEST) / TM3_WIDTH)
+    if TM3_FIRST_EPSG <= code <= TM3_LAST_EPSG:
+        return code
+    return None
+
+
+def is_tm3(crs):
+    """Whether a CRS is one of the TM-3 zones"""
+    authid = crs.authid()
+    return authid.startswith('EPSG:') and authid[5:].isdigit() \
+        and TM3_FIRST_EPSG <= int(authid[5:]) <= TM3_LAST_EPSG
+
+
+def utm_epsg(lon, lat):
+    """EPSG code of the WGS 84 / UTM zone of a point"""
+    zone = math.floor((lon + 180) / 6) + 1
+    return (32700 if lat < 0 else 32600) + int(zone)
+
+
+class CrsRegistry:
+    """
+    Shared cache of CRS and transform objects
+
+    CRS are keyed by auth id (or WKT for custom CRS). Transforms using the
+    project transform context are keyed by source and destination and are
+    dropped when the project transform settings change; transforms with
+    any other context are built on each call. Lookups are guarded by a
+    lock, callers outside the main thread get their own copy of a
+    transform, as QgsCoordinateTransform instances must not be shared
+    between threads.
+
+    Usage
+    -----
+    ::
+        transform = crs_registry.transform('EPSG:4326', canvas_crs)
+        point = transform.transform(point)
+    """
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._crs = {}
+        self._transforms = {}
+        self._project = None
+
+    def crs(self, crs):
+        """CRS from an auth id such as 'EPSG:4326', or a CRS object"""
+        if isinstance(crs, QgsCoordinateReferenceSystem):
+            return crs
+        with self._lock:
+            cached = self._crs.get(crs)
+            if cached is None:
+                cached = QgsCoordinateReferenceSystem(crs)
+                self._crs[crs] = cached
+            return cached
+
+    def tm3_crs(self, lon):
+        code = tm3_epsg(lon)
+        return self.crs(f'EPSG:{code}') if code is not None else None
+
+    def utm_crs(self, lon, lat):
+        return self.crs(f'EPSG:{utm_epsg(lon, lat)}')
+
+    @staticmethod
+    def _crs_key(crs):
+        if isinstance(crs, QgsCoordinateReferenceSystem):
+            return crs.authid() or crs.toWkt()
+        return crs
+
+    def transform(self, source, destination, context=None):
+        """
+        Transform between two CRS (auth ids or CRS objects). Without a
+        context the project transform context is used.
+        """
+        project = QgsProject.instance()
+        self._watch(project)
+        if context is not None:
+            return QgsCoordinateTransform(self.crs(source), self.crs(destination), context)
+        key = (self._crs_key(source), self._crs_key(destination))
+
+        with self._lock:
+            transform = self._transforms.get(key)
+            if transform is None:
+                transform = QgsCoordinateTransform(
+                    self.crs(source), self.crs(destination), project.transformContext()
+                )
+                self._transforms[key] = transform
+
+        if QThread.currentThread() != QCoreApplication.instance().thread():
+            return QgsCoordinateTransform(transform)
+        return transform
+
+    def _watch(self, project):
+        if self._project is project:
+            return
+        self._project = project
+        project.transformContextChanged.connect(self.clear_transforms)
+
+    def clear_transforms(self):
+        with self._lock:
+            self._transforms.clear()
+
+    def clear(self):
+        with self._lock:
+            self._crs.clear()
+            self._transforms.clear()
+
+
+crs_registry = CrsRegistry()
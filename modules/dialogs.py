@@ -0,0 +1,62 @@
+import importlib
+
+from qgis.PyQt.QtCore import QObject
+from qgis.core import Qgis
+
+from .utils import logMessage
+
+"""
+Registry Dialog GeoKKP
+===========================================
+
+Dialog plugin (beserta modul dan berkas .ui-nya) baru diimpor dan dibuat
+saat pertama kali dibuka, bukan saat QGIS dijalankan.
+"""
+
+
+class DialogRegistry:
+    """
+    Dialogs created on first use
+
+    A dialog is registered with the module (relative to this package) and
+    class implementing it; the module is imported, and so its .ui file
+    loaded, by the first ``get``. Later calls return the same instance.
+
+    Usage
+    -----
+    ::
+        dialogs.register('gotoxy', 'gotoxy', 'GotoXYDialog')
+        dialogs.get('gotoxy').show()
+    """
+
+    def __init__(self):
+        self._specs = {}
+        self._instances = {}
+
+    def register(self, name, module, class_name, *args, **kwargs):
+        self._specs[name] = (module, class_name, args, kwargs)
+
+    def get(self, name):
+        instance = self._instances.get(name)
+        if instance is None:
+            module, class_name, args, kwargs = self._specs[name]
+            dialog_class = getattr(importlib.import_module(f'.{module}', __package__), class_name)
+            instance = dialog_class(*args, **kwargs)
+            self._instances[name] = instance
+        return instance
+
+    def created(self, name):
+        """The dialog if it has been opened before, None otherwise"""
+        return self._instances.get(name)
+
+    def clear(self):
+        """Close and release every created dialog, one failing does not stop the others"""
+        for name, instance in self._instances.items():
+            if not isinstance(instance, QObject):
+                continue
+            try:
+                instance.close()
+                instance.deleteLater()
+            except Exception as e:
+                logMessage(f'Gagal menutup dialog {name}: {e}', Qgis.Warning)
+        self._instances.clear()
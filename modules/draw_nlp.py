@@ -1,9 +1,7 @@
-import os
-
-from qgis.PyQt import QtWidgets, uic
+from qgis.PyQt import QtWidgets
 from qgis.PyQt.QtCore import pyqtSignal
 from qgis.utils import iface
-from qgis.core import QgsProject, QgsPointXY
+from qgis.core import QgsProject, QgsPointXY, QgsRectangle
 from qgis.gui import QgsVertexMarker
 
 # using utils
@@ -11,16 +9,13 @@ from .utils import (
     draw_rect_bound,
     icon,
     get_nlp,
-    bk_10000,
-    bk_2500,
-    bk_1000,
-    bk_500,
-    bk_250
+    nlp_to_rect
     )
+from .crs import crs_registry, is_tm3
 from .maptools import MapTool
+from .ui_loader import load_ui
 
-FORM_CLASS, _ = uic.loadUiType(os.path.join(
-    os.path.dirname(__file__), '../ui/gambar_nlp.ui'))
+FORM_CLASS, _ = load_ui('gambar_nlp')
 
 # constants
 skala = [
@@ -31,15 +26,6 @@ skala = [
     "1:250"
 ]
 
-# constants for NLP
-x_origin = 32000
-y_origin = 282000
-grid_10rb = 6000
-grid_2500 = 1500
-grid_1000 = 500
-grid_500 = 250
-grid_250 = 125
-
 
 class DrawNLPDialog(QtWidgets.QDialog, FORM_CLASS):
     """ Dialog for NLP Dialog """
@@ -59,11 +45,12 @@ class DrawNLPDialog(QtWidgets.QDialog, FORM_CLASS):
 
         # setup map tool
         self.previousMapTool = self.canvas.mapTool()
-        self.epsg = self.canvas.mapSettings().destinationCrs().authid()
 
         self.crs_tm3.setText(self.canvas.mapSettings().destinationCrs().description())
         # self.skala_peta.currentIndexChanged.connect(self.get_nlp_text())
         self.ambil_titik.clicked.connect(self.on_pressed)
+        self.zoom_nlp.clicked.connect(self.zoom_to_nlp)
+        self.nlp.returnPressed.connect(self.zoom_to_nlp)
 
         self.skala_peta.addItems(skala)
 
@@ -122,74 +109,58 @@ class DrawNLPDialog(QtWidgets.QDialog, FORM_CLASS):
         vm.setIconSize(7)
         return vm
 
+    def tm3_crs(self):
+        """CRS of the NLP grid: the canvas CRS, else the project CRS, None when neither is TM-3"""
+        for crs in (self.canvas.mapSettings().destinationCrs(), QgsProject.instance().crs()):
+            if is_tm3(crs):
+                return crs
+        return None
+
+    def titik_tm3(self):
+        """The picked point in the TM-3 CRS of the NLP grid, None without a point or TM-3 CRS"""
+        tm3 = self.tm3_crs()
+        if self.point is None or tm3 is None:
+            return None
+        return crs_registry.transform(self.canvas.mapSettings().destinationCrs(), tm3).transform(self.point)
+
     def get_nlp_text(self):
         skala_now = self.skala_peta.currentText()
-        if self.point is not None:
-            x, y = self.point
-            self.nlp.setText(get_nlp(skala_now[2:], x, y))
+        point = self.titik_tm3()
+        if point is not None:
+            self.nlp.setText(get_nlp(skala_now[2:], point.x(), point.y()))
         if self.checkBoxNLP.isChecked():
             self.draw_nlp()
 
     def draw_nlp(self):
-        xMin = xMax = yMin = yMax = None
         skala_now = self.skala_peta.currentText()
-        if self.point is not None:
-            x, y = self.point
-
-        def rect10rb():
-            k_10rb, b_10rb = bk_10000(x, y)
-            xMin = x_origin + (k_10rb - 1) * grid_10rb
-            yMin = y_origin + (b_10rb - 1) * grid_10rb
-            xMax = x_origin + (k_10rb) * grid_10rb
-            yMax = y_origin + (b_10rb) * grid_10rb
-            return [xMin, yMin, xMax, yMax]
-        
-        def rect2500():
-            k_2500, b_2500 = bk_2500(x, y)
-            ori_10rb_x, ori_10rb_y, p, q = rect10rb()
-            xMin = ori_10rb_x + (k_2500 - 1) * grid_2500
-            yMin = ori_10rb_y + (b_2500 - 1) * grid_2500
-            xMax = ori_10rb_x + (k_2500) * grid_2500
-            yMax = ori_10rb_y + (b_2500) * grid_2500
-            return [xMin, yMin, xMax, yMax]
-        
-        def rect1000():
-            k_1000, b_1000 = bk_1000(x, y)
-            ori_2500_x, ori_2500_y, p, q = rect2500()
-            xMin = ori_2500_x + (k_1000 - 1) * grid_1000
-            yMin = ori_2500_y + (b_1000 - 1) * grid_1000
-            xMax = ori_2500_x + (k_1000) * grid_1000
-            yMax = ori_2500_y + (b_1000) * grid_1000
-            return [xMin, yMin, xMax, yMax]
-        
-        def rect500():
-            k_500, b_500 = bk_500(x, y)
-            ori_1000_x, ori_1000_y, p, q = rect1000()
-            xMin = ori_1000_x + (k_500 - 1) * grid_500
-            yMin = ori_1000_y + (b_500 - 1) * grid_500
-            xMax = ori_1000_x + (k_500) * grid_500
-            yMax = ori_1000_y + (b_500) * grid_500
-            return [xMin, yMin, xMax, yMax]
-
-        def rect250():
-            k_250, b_250 = bk_250(x, y)
-            ori_500_x, ori_500_y, p, q = rect500()
-            xMin = ori_500_x + (k_250 - 1) * grid_250
-            yMin = ori_500_y + (b_250 - 1) * grid_250
-            xMax = ori_500_x + (k_250) * grid_250
-            yMax = ori_500_y + (b_250) * grid_250
-            return [xMin, yMin, xMax, yMax]
-
-        if skala_now == skala[0]:
-            xMin, yMin, xMax, yMax = rect10rb()
-        elif skala_now == skala[1]:
-            xMin, yMin, xMax, yMax = rect2500()
-        elif skala_now == skala[2]:
-            xMin, yMin, xMax, yMax = rect1000()
-        elif skala_now == skala[3]:
-            xMin, yMin, xMax, yMax = rect500()
-        elif skala_now == skala[4]:
-            xMin, yMin, xMax, yMax = rect250()
-
-        if xMin is not None:
-            draw_rect_bound(xMin, yMin, xMax, yMax, self.epsg)
+        point = self.titik_tm3()
+        if point is None:
+            return
+        try:
+            xMin, yMin, xMax, yMax, _ = nlp_to_rect(get_nlp(skala_now[2:], point.x(), point.y()))
+        except ValueError:
+            # point outside the NLP grid
+            return
+        draw_rect_bound(xMin, yMin, xMax, yMax, self.tm3_crs().authid())
+
+    def zoom_to_nlp(self):
+        """Zoom ke lembar dari Nomor Lembar Peta yang diketik"""
+        text = self.nlp.text()
+        try:
+            xMin, yMin, xMax, yMax, skala_nlp = nlp_to_rect(text)
+        except ValueError:
+            QtWidgets.QMessageBox.warning(self, "Inspeksi NLP", f"Nomor Lembar Peta tidak valid: {text}")
+            return
+        # the NLP only numbers the sheet inside a TM-3 zone
+        tm3 = self.tm3_crs()
+        if tm3 is None:
+            QtWidgets.QMessageBox.warning(self, "Inspeksi NLP", "CRS peta atau proyek harus zona TM-3")
+            return
+
+        self.skala_peta.setCurrentText(f"1:{skala_nlp}")
+        if self.checkBoxNLP.isChecked():
+            draw_rect_bound(xMin, yMin, xMax, yMax, tm3.authid())
+        transform = crs_registry.transform(tm3, self.canvas.mapSettings().destinationCrs())
+        rect = transform.transformBoundingBox(QgsRectangle(xMin, yMin, xMax, yMax))
+        self.canvas.setExtent(rect.buffered(rect.width() * 0.1))
+        self.canvas.refresh()
@@ -1,13 +1,12 @@
-import os
-from qgis.PyQt import QtWidgets, uic
+from qgis.PyQt import QtWidgets
 from qgis.PyQt.QtCore import pyqtSignal
 from qgis.utils import iface
 
 from qgis.core import QgsMapLayerProxyModel
+from .ui_loader import load_ui
 
 
-FORM_CLASS, _ = uic.loadUiType(os.path.join(
-    os.path.dirname(__file__), '../ui/pencarian_fitur.ui'))
+FORM_CLASS, _ = load_ui('pencarian_fitur')
 
 
 class FeatureSearchDialog(QtWidgets.QDialog, FORM_CLASS):
@@ -0,0 +1,268 @@
+"""
+Geocoding Balik Kabupaten
+===========================================
+
+Mencari kabupaten/kota, kantor pertanahan (KODE_BPN) dan zona TM-3 dari
+koordinat bujur/lintang, satu titik maupun jutaan titik sekaligus.
+Batas dari data/idn_adm_lv2.json diindeks dengan grid: titik di sel yang
+tidak dilewati batas langsung mendapat kabupaten sel tersebut, titik di
+sel batas diuji terhadap sisi-sisi di sel itu saja.
+Modul ini tidak bergantung pada qgis.
+"""
+
+import json
+import os
+import threading
+
+import numpy as np
+
+from .adm_index import ADM_DISTRICT_FILE, NAME_FIELD, feature_rings, load_index, read_topology
+
+KANTOR_FILE = os.path.normpath(os.path.join(os.path.dirname(__file__), '..', 'config', 'daftar_kantor.json'))
+
+DEFAULT_CELL_SIZE = 0.02
+CHUNK_SIZE = 200000
+
+
+def _edges(arcs, geometries):
+    """Edges of every feature as (x0, y0, x1, y1) arrays and their feature offset"""
+    coords = []
+    owners = []
+    for offset, geometry in enumerate(geometries):
+        for _, ring in feature_rings(arcs, geometry):
+            ring = np.asarray(ring, dtype=float)
+            coords.append(np.hstack([ring[:-1], ring[1:]]))
+            owners.append(np.full(len(ring) - 1, offset, dtype=np.int32))
+    coords = np.concatenate(coords)
+    return coords[:, 0], coords[:, 1], coords[:, 2], coords[:, 3], np.concatenate(owners)
+
+
+def _spans(low, high, origin, size, count):
+    first = np.clip(np.floor((low - origin) / size).astype(np.int64), 0, count - 1)
+    last = np.clip(np.floor((high - origin) / size).astype(np.int64), 0, count - 1)
+    return first, last
+
+
+def _expand(first, last):
+    """Index of the range every item belongs to, and the values first..last"""
+    lengths = last - first + 1
+    items = np.repeat(np.arange(len(first)), lengths)
+    starts = np.repeat(np.cumsum(lengths) - lengths, lengths)
+    return items, first[items] + np.arange(len(items)) - starts
+
+
+def _orient(ax, ay, bx, by, px, py):
+    return (bx - ax) * (py - ay) - (by - ay) * (px - ax)
+
+
+class ReverseGeocoder:
+    """
+    Point in polygon lookup of the kabupaten boundaries
+
+    The grid index is built on the first query. ``locate_array`` answers
+    arrays of points with feature offsets (-1 outside every kabupaten),
+    ``locate`` answers one point with its kabupaten, province, KODE_BPN and
+    TM-3 zone.
+
+    Usage
+    -----
+    ::
+        info = reverse_geocoder.locate(106.82, -6.17)
+        offsets = reverse_geocoder.locate_array(lons, lats)
+    """
+
+    def __init__(self, path=ADM_DISTRICT_FILE, cell_size=DEFAULT_CELL_SIZE):
+        self._path = path
+        self._cell_size = cell_size
+        self._lock = threading.Lock()
+        self._built = False
+
+    def _build(self):
+        with self._lock:
+            if self._built:
+                return
+            arcs, geometries = read_topology(self._path)
+            self._properties = [geometry.get('properties') or {} for geometry in geometries]
+            x0, y0, x1, y1, owner = _edges(arcs, geometries)
+            size = self._cell_size
+            self._origin = (min(x0.min(), x1.min()) - size, min(y0.min(), y1.min()) - size)
+            self._shape = (
+                int(np.ceil((max(y0.max(), y1.max()) - self._origin[1]) / size)) + 2,
+                int(np.ceil((max(x0.max(), x1.max()) - self._origin[0]) / size)) + 2,
+            )
+            self._edge_x0, self._edge_y0, self._edge_x1, self._edge_y1 = x0, y0, x1, y1
+            self._edge_owner = owner
+            crossings = self._row_crossings()
+            self._index_cells(crossings)
+            self._label_cells(crossings)
+            self._built = True
+
+    def _row_crossings(self):
+        """
+        Crossings of the horizontal line through the cell centres of every
+        row with the boundaries, as (row, feature, x) sorted in that order
+        """
+        rows, cols = self._shape
+        size = self._cell_size
+        x0, y0, x1, y1 = self._edge_x0, self._edge_y0, self._edge_x1, self._edge_y1
+        row_first, row_last = _spans(np.minimum(y0, y1) - size / 2, np.maximum(y0, y1) - size / 2,
+                                     self._origin[1], size, rows)
+        edge, row = _expand(row_first, row_last)
+        y = self._origin[1] + (row + 0.5) * size
+        crossing = (y0[edge] <= y) != (y1[edge] <= y)
+        edge, row, y = edge[crossing], row[crossing], y[crossing]
+        x = x0[edge] + (y - y0[edge]) / (y1[edge] - y0[edge]) * (x1[edge] - x0[edge])
+        owner = self._edge_owner[edge]
+        order = np.lexsort((x, owner, row))
+        return row[order], owner[order], x[order]
+
+    def _index_cells(self, crossings):
+        """
+        Edges of every cell their bounding box touches, the features owning
+        them and whether the cell centre is inside each of those features,
+        as CSR arrays
+        """
+        rows, cols = self._shape
+        size = self._cell_size
+        features = len(self._properties)
+        x0, y0, x1, y1 = self._edge_x0, self._edge_y0, self._edge_x1, self._edge_y1
+        col_first, col_last = _spans(np.minimum(x0, x1), np.maximum(x0, x1), self._origin[0], size, cols)
+        row_first, row_last = _spans(np.minimum(y0, y1), np.maximum(y0, y1), self._origin[1], size, rows)
+
+        edge, row = _expand(row_first, row_last)
+        pair, col = _expand(col_first[edge], col_last[edge])
+        edge, cell = edge[pair], row[pair] * cols + col
+        order = np.argsort(cell, kind='stable')
+        self._cell_edges = edge[order].astype(np.int32)
+        self._cell_start = np.searchsorted(cell[order], np.arange(rows * cols + 1))
+
+        keys = np.unique(cell * features + self._edge_owner[edge])
+        owner_cell, owner = keys // features, (keys % features).astype(np.int32)
+        self._cell_owners = owner
+        self._owner_start = np.searchsorted(owner_cell, np.arange(rows * cols + 1))
+
+        # the centre is inside a feature when an odd number of its crossings
+        # on the row lie left of the centre; x is offset within its group
+        row_of, owner_of, x = crossings
+        span = x.max() - x.min() + 1
+        group = (row_of.astype(np.float64) * features + owner_of) * span + (x - x.min())
+        centre = self._origin[0] + (owner_cell % cols + 0.5) * size
+        query = ((owner_cell // cols).astype(np.float64) * features + owner) * span + (centre - x.min())
+        group_start = np.searchsorted(group, ((owner_cell // cols).astype(np.float64) * features + owner) * span)
+        self._owner_inside = (np.searchsorted(group, query) - group_start) % 2 == 1
+
+    def _label_cells(self, crossings):
+        """Feature containing the centre of every cell, -1 for none"""
+        rows, cols = self._shape
+        labels = np.full((rows, cols), -1, dtype=np.int32)
+        centres_x = self._origin[0] + (np.arange(cols) + 0.5) * self._cell_size
+        row, owner, x = crossings
+        # consecutive crossings of the same feature on a row bound its inside
+        starts = np.flatnonzero(np.r_[True, (row[1:] != row[:-1]) | (owner[1:] != owner[:-1])])
+        ends = np.r_[starts[1:], len(row)]
+        for start, end in zip(starts, ends):
+            first = np.searchsorted(centres_x, x[start:end:2])
+            last = np.searchsorted(centres_x, x[start + 1:end:2])
+            line = labels[row[start]]
+            for a, b in zip(first, last):
+                line[a:b] = owner[start]
+        self._cell_labels = labels.ravel()
+
+    def locate_array(self, lon, lat):
+        """Feature offset of the kabupaten containing every point, -1 outside"""
+        self._build()
+        lon = np.asarray(lon, dtype=float)
+        lat = np.asarray(lat, dtype=float)
+        result = np.empty(len(lon), dtype=np.int32)
+        for start in range(0, len(lon), CHUNK_SIZE):
+            chunk = slice(start, start + CHUNK_SIZE)
+            result[chunk] = self._locate_chunk(lon[chunk], lat[chunk])
+        return result
+
+    def _locate_chunk(self, px, py):
+        rows, cols = self._shape
+        size = self._cell_size
+        features = len(self._properties)
+        col = np.floor((px - self._origin[0]) / size)
+        row = np.floor((py - self._origin[1]) / size)
+        inside = (col >= 0) & (col < cols) & (row >= 0) & (row < rows)
+        cell = np.where(inside, row * cols + col, 0).astype(np.int64)
+        result = np.where(inside, self._cell_labels[cell], -1).astype(np.int32)
+
+        # points in cells crossed by edges: walk from the cell centre to the
+        # point, every boundary crossed flips the membership of its feature
+        points = np.flatnonzero(inside & (self._cell_start[cell + 1] > self._cell_start[cell]))
+        if not len(points):
+            return result
+        point, position = _expand(self._cell_start[cell[points]], self._cell_start[cell[points] + 1] - 1)
+        point = points[point]
+        edge = self._cell_edges[position]
+
+        cx = self._origin[0] + (col[point] + 0.5) * size
+        cy = self._origin[1] + (row[point] + 0.5) * size
+        ax, ay, bx, by = self._edge_x0[edge], self._edge_y0[edge], self._edge_x1[edge], self._edge_y1[edge]
+        qx, qy = px[point], py[point]
+        crossed = (
+            ((_orient(ax, ay, bx, by, cx, cy) > 0) != (_orient(ax, ay, bx, by, qx, qy) > 0))
+            & ((_orient(cx, cy, qx, qy, ax, ay) > 0) != (_orient(cx, cy, qx, qy, bx, by) > 0))
+        )
+        keys, flips = np.unique(point[crossed] * features + self._edge_owner[edge[crossed]], return_counts=True)
+        flipped = keys[flips % 2 == 1]
+
+        # membership of the point in every feature with edges in its cell
+        point, position = _expand(self._owner_start[cell[points]], self._owner_start[cell[points] + 1] - 1)
+        point = points[point]
+        owner = self._cell_owners[position]
+        member = self._owner_inside[position] != np.isin(point * features + owner, flipped)
+
+        # the centre label holds unless its feature has edges in the cell
+        labelled = owner == result[point]
+        result[point[labelled]] = -1
+        result[point[member]] = owner[member]
+        return result
+
+    def properties(self, offset):
+        self._build()
+        return self._properties[offset] if offset >= 0 else None
+
+    def locate(self, lon, lat):
+        """
+        Kabupaten of a point as a dict with WAK, WA (province), KODE_BPN,
+        kantor (entry of daftar_kantor.json), zone and epsg, or None
+        """
+        offset = int(self.locate_array([lon], [lat])[0])
+        if offset < 0:
+            return None
+        properties = self.properties(offset)
+        name = properties.get(NAME_FIELD)
+        district = load_index().get(name) or {}
+        return {
+            'WAK': name,
+            'WA': properties.get('WA'),
+            'KODE_BPN': properties.get('KODE_BPN'),
+            'kantor': kantor_by_kode(properties.get('KODE_BPN')),
+            'zone': district.get('zone'),
+            'epsg': district.get('epsg'),
+        }
+
+
+_kantor = None
+
+
+def kantor_by_kode(kode_bpn):
+    """Entry of config/daftar_kantor.json with its province, by KODE_BPN"""
+    global _kantor
+    if _kantor is None:
+        with open(KANTOR_FILE, encoding='utf-8') as source:
+            daftar_kantor = json.load(source)
+        _kantor = {
+            int(kantor['KODE_BPN']): dict(kantor, propinsi=propinsi)
+            for propinsi, daftar in daftar_kantor.items() for kantor in daftar
+        }
+    try:
+        return _kantor.get(int(kode_bpn))
+    except (TypeError, ValueError):
+        return None
+
+
+reverse_geocoder = ReverseGeocoder()
@@ -1,25 +1,23 @@
-import os
-
 from qgis.PyQt.QtCore import Qt, QTimer
 from qgis.gui import QgsRubberBand
 
 from qgis.core import (
-    QgsCoordinateTransform,
     QgsRectangle,
     QgsPoint,
     QgsPointXY,
     QgsGeometry,
-    QgsWkbTypes,
-    QgsProject)
-from qgis.PyQt import QtWidgets, uic
+    QgsWkbTypes)
+from qgis.PyQt import QtWidgets
 from qgis.PyQt.QtCore import pyqtSignal
 from qgis.utils import iface
 
 # using utils
 from .utils import icon, parse_raw_coordinate
+from .crs import crs_registry
+from .geocoder import reverse_geocoder
+from .ui_loader import load_ui
 
-FORM_CLASS, _ = uic.loadUiType(os.path.join(
-    os.path.dirname(__file__), '../ui/goto.ui'))
+FORM_CLASS, _ = load_ui('goto')
 
 
 class GotoXYDialog(QtWidgets.QDialog, FORM_CLASS):
@@ -66,7 +64,7 @@ class GotoXYDialog(QtWidgets.QDialog, FORM_CLASS):
     def zoomTo(self, src_crs, lat, lon):
         self.canvas.zoomScale(1000)
         canvas_crs = self.canvas.mapSettings().destinationCrs()
-        transform = QgsCoordinateTransform(src_crs, canvas_crs, QgsProject.instance())
+        transform = crs_registry.transform(src_crs, canvas_crs)
         x, y = transform.transform(float(lon), float(lat))
 
         rect = QgsRectangle(x, y, x, y)
@@ -75,6 +73,16 @@ class GotoXYDialog(QtWidgets.QDialog, FORM_CLASS):
         pt = QgsPointXY(x, y)
         self.highlight(pt)
         self.canvas.refresh()
+        self.show_location(src_crs, float(lon), float(lat))
+
+    def show_location(self, src_crs, x, y):
+        """ Tampilkan kabupaten dan zona TM-3 titik tujuan di status bar """
+        lon, lat = crs_registry.transform(src_crs, 'EPSG:4326').transform(x, y)
+        info = reverse_geocoder.locate(lon, lat)
+        if info is None:
+            return
+        self.iface.statusBarIface().showMessage(
+            f"{info['WAK']}, {info['WA']} (KODE BPN {info['KODE_BPN']}) - zona TM-3 {info['zone']}", 5000)
 
     def highlight(self, point):
 
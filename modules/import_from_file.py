@@ -14,7 +14,7 @@ class ImportGeomFromFile():
     def _show_using_plotxy(self, file):
         self.parent.plotxy()
         with open(file, 'r') as f:
-            self.parent.plotxyaction.list_coords.setText(f.read())
+            self.parent.dialogs.get('plotxy').list_coords.setText(f.read())
 
     def show(self):
         self._file_browser.show()
@@ -1,11 +1,10 @@
 import os
 import json
+from functools import partial
 
 from qgis.utils import iface
-from .utils import (
-    dialogBox,
-    storeSetting,
-)
+from .utils import dialogBox
+from .settings_cache import settings_cache
 
 
 # Konstanta lokasi berkas
@@ -18,6 +17,14 @@ boundary_idn = os.path.join(
 default_layout_json = os.path.join(
     os.path.dirname(__file__), '../config/default_qpt_layout.json')
 
+# setting key: (config file, key in the file or None for the whole file)
+CONFIG_SETTINGS = {
+    "layers": (layer_json_file, 'layers'),
+    "basemaps": (basemap_json_file, 'basemaps'),
+    "list_kantor_id": (boundary_idn, None),
+    "layout": (default_layout_json, 'default_layout'),
+}
+
 
 class Initialize:
     """
@@ -25,52 +32,22 @@ class Initialize:
     ===========================================
 
     Pengisian project-wide settings: basemaps, layers, lokasi kantor, etc.
-    untuk dipanggil di geokkp.py pada saat inisiasi
-
+    untuk dipanggil di geokkp.py pada saat inisiasi. Berkas konfigurasi
+    baru dibaca saat pengaturannya pertama kali dipakai dan hanya disimpan
+    di memori, tidak disalin ke QgsSettings.
     """
     def __init__(self):
         self.iface = iface
 
-        self.simpan_layer_settings()
-        self.simpan_basemap_settings()
-        self.simpan_boundary_settings()
-        self.simpan_default_layout_settings()
-
-    def simpan_layer_settings(self):
-        """
-        Panggil daftar layer dan simbologi dari file layers.json, simpan ke dalam pengaturan lokal
-        """
-        f = open(layer_json_file,)
-        data = json.load(f)
-        f.close()
-        storeSetting("layers", data['layers'])
-
-    def simpan_basemap_settings(self):
-        """
-        Panggil daftar basemap dari file basemap.json, simpan ke dalam pengaturan lokal
-        """
-        f = open(basemap_json_file,)
-        data = json.load(f)
-        f.close()
-        storeSetting("basemaps", data['basemaps'])
+        for key, (path, field) in CONFIG_SETTINGS.items():
+            settings_cache.register_loader(key, partial(self.load_config, path, field))
 
-    def simpan_boundary_settings(self):
-        """
-        Panggil TopoJSON batas administrasi Indonesia level-2 (Kabupaten/Kantah)
-        """
+    def load_config(self, path, field):
+        """Panggil isi berkas konfigurasi, seluruhnya atau bagian field saja"""
         try:
-            f = open(boundary_idn,)
-            data = json.load(f)
+            with open(path, 'rb') as f:
+                data = json.loads(f.read())
         except Exception as e:
-            dialogBox("Gagal membaca data dari berkas: ", e)
-        storeSetting("list_kantor_id", data)
-        f.close()
-    
-    def simpan_default_layout_settings(self):
-        """
-        Panggil daftar layout default dari default_qpt_layout.json
-        """
-        f = open(default_layout_json)
-        data = json.load(f)
-        f.close()
-        storeSetting("layout", data['default_layout'])
+            dialogBox(f"Gagal membaca data dari berkas: {e}")
+            return None
+        return data[field] if field else data
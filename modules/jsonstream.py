@@ -0,0 +1,171 @@
+import re
+import json
+import codecs
+
+"""
+Parser JSON Bertahap
+===========================================
+
+Mengambil elemen array JSON (mis. "wilayahs") satu per satu selama
+respons server masih diunduh, tanpa menampung seluruh respons di memori
+"""
+
+# characters that change the scanner state outside of strings
+_STRUCTURAL = re.compile(r'["\[\]{}]')
+# rest of a string after its opening quote, up to and including the closing quote
+_STRING_TAIL = re.compile(r'[^"\\]*(?:\\.[^"\\]*)*"', re.DOTALL)
+# whitespace and commas between array elements
+_SEPARATOR = re.compile(r'[\s,]*')
+# characters that can follow a complete number or literal
+_TERMINATOR = re.compile(r'[\s,\]]')
+
+_BEFORE, _INSIDE, _AFTER = range(3)
+
+
+class JsonArrayStream:
+    """
+    Incremental reader of the array stored under a top level key
+
+    feed() takes the response bytes as they arrive and returns the array
+    elements completed so far, already decoded. Only the element being
+    received is buffered. The rest of the document is kept, envelope()
+    decodes it with an empty array in place of the streamed one. When the
+    key is missing, envelope() returns the whole document.
+
+    Usage
+    -----
+    ::
+        stream = JsonArrayStream('wilayahs')
+        for chunk in chunks:
+            for item in stream.feed(chunk):
+                ...
+        response = stream.envelope()
+    """
+
+    def __init__(self, key):
+        self._key = json.dumps(key)
+        self._text = codecs.getincrementaldecoder('utf-8')()
+        self._decoder = json.JSONDecoder()
+        self._state = _BEFORE
+        self._buffer = ''
+        self._pos = 0
+        self._depth = 0
+        # scan of the element being received: offset from its start and nesting depth reached
+        self._scanned = 0
+        self._item_depth = 0
+        self._last_key = None
+        self._prefix = ''
+        self.count = 0
+
+    def feed(self, data):
+        self._buffer += self._text.decode(bytes(data))
+        items = []
+        if self._state == _BEFORE:
+            self._find_array()
+        if self._state == _INSIDE:
+            self._read_items(items)
+        self.count += len(items)
+        return items
+
+    def _find_array(self):
+        buffer = self._buffer
+        pos = self._pos
+        while True:
+            match = _STRUCTURAL.search(buffer, pos)
+            if match is None:
+                pos = len(buffer)
+                break
+            index = match.start()
+            char = match.group()
+
+            if char == '"':
+                tail = _STRING_TAIL.match(buffer, index + 1)
+                if tail is None:
+                    # the string continues in the next chunk
+                    pos = index
+                    break
+                pos = tail.end()
+                if self._depth == 1:
+                    self._last_key = buffer[index:pos]
+                continue
+
+            pos = index + 1
+            if char in '[{':
+                if char == '[' and self._depth == 1 and self._last_key == self._key:
+                    self._state = _INSIDE
+                    self._prefix = buffer[:pos]
+                    self._buffer = buffer[pos:]
+                    self._pos = 0
+                    return
+                self._depth += 1
+            else:
+                self._depth -= 1
+        self._pos = pos
+
+    def _read_items(self, items):
+        buffer = self._buffer
+        pos = 0
+        while True:
+            pos = _SEPARATOR.match(buffer, pos).end()
+            if pos == len(buffer):
+                break
+            if buffer[pos] == ']':
+                # end of the array, the closing bracket stays for envelope()
+                self._state = _AFTER
+                break
+            end = self._element_end(buffer, pos)
+            if end is None:
+                # the element continues in the next chunk
+                break
+            try:
+                item, end = self._decoder.raw_decode(buffer, pos)
+            except ValueError:
+                break
+            items.append(item)
+            pos = end
+        self._buffer = buffer[pos:]
+
+    def _element_end(self, buffer, pos):
+        """
+        End of the element starting at pos, None while it is incomplete.
+        Objects and arrays are scanned once, the offset and depth reached
+        are kept for the next chunk, so the element is decoded only once.
+        """
+        char = buffer[pos]
+        if char == '"':
+            tail = _STRING_TAIL.match(buffer, pos + 1)
+            return tail.end() if tail else None
+        if char not in '[{':
+            # a number is complete only once a separator follows it
+            terminator = _TERMINATOR.search(buffer, pos)
+            return terminator.start() if terminator else None
+
+        scan = pos + self._scanned
+        depth = self._item_depth
+        while True:
+            match = _STRUCTURAL.search(buffer, scan)
+            if match is None:
+                scan = len(buffer)
+                break
+            index = match.start()
+            char = match.group()
+            if char == '"':
+                tail = _STRING_TAIL.match(buffer, index + 1)
+                if tail is None:
+                    # the string continues in the next chunk
+                    scan = index
+                    break
+                scan = tail.end()
+                continue
+            scan = index + 1
+            depth += 1 if char in '[{' else -1
+            if depth == 0:
+                self._scanned = self._item_depth = 0
+                return scan
+        self._scanned = scan - pos
+        self._item_depth = depth
+        return None
+
+    def envelope(self):
+        """Decode the document without the streamed array"""
+        return json.loads(self._prefix + self._buffer + self._text.decode(b'', final=True))
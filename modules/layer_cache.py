@@ -0,0 +1,155 @@
+import os
+import re
+import time
+import sqlite3
+
+from osgeo import ogr
+from qgis.core import QgsApplication, QgsProject, QgsVectorFileWriter, QgsVectorLayer
+
+from .api.cache import DAY
+from .api.endpoints import DEFAULT_APP_VERSION
+
+"""
+Cache Layer Wilayah
+===========================================
+
+Menyimpan layer hasil dekode SDO (batas wilayah / berkas) ke GeoPackage
+lokal dengan indeks spasial R-tree, sehingga wilayah yang sama tidak
+perlu diunduh dan didekode ulang.
+"""
+
+DEFAULT_LAYER_CACHE_FILE = os.path.join(QgsApplication.qgisSettingsDirPath(), 'geokkp', 'wilayah_cache.gpkg')
+DEFAULT_LAYER_TTL = 7 * DAY
+
+
+class LayerCache:
+    """
+    GeoPackage store of decoded wilayah/berkas layers
+
+    A layer is keyed by its kind (e.g. 'Desa'), wilayah id, SRS and the API
+    version the plugin asks the server with, so an API upgrade never serves
+    a layer decoded from the old response format. The server reports no
+    version of its boundary data, a boundary updated on the server is
+    picked up once the entry is older than the TTL, or right away after the
+    cache is purged. Cached layers are opened with the ogr provider,
+    read-only reference layers need no memory provider copy.
+
+    Usage
+    -----
+    ::
+        layer = layer_cache.load('Desa', desa_id, 'EPSG:23830', 'Batas Desa')
+        if layer is None:
+            layer = layer_cache.save(downloaded_layer, 'Desa', desa_id, 'EPSG:23830')
+    """
+
+    def __init__(self, path=DEFAULT_LAYER_CACHE_FILE, ttl=DEFAULT_LAYER_TTL, version=DEFAULT_APP_VERSION):
+        self._path = path
+        self._ttl = ttl
+        self._version = version
+
+    def table_name(self, kind, wilayah_id, srs):
+        key = f'{kind}_{wilayah_id}_{srs}_{self._version}'
+        return re.sub(r'\W', '_', key).lower()
+
+    def _uri(self, table):
+        return f'{self._path}|layername={table}'
+
+    def _metadata(self):
+        db = sqlite3.connect(self._path)
+        db.execute(
+            'CREATE TABLE IF NOT EXISTS geokkp_layer_cache ('
+            'table_name TEXT PRIMARY KEY, kind TEXT, wilayah_id TEXT, srs TEXT, version TEXT, stored_at REAL)'
+        )
+        return db
+
+    def load(self, kind, wilayah_id, srs, name):
+        """Return the cached layer named name, or None on a miss or stale entry"""
+        if not os.path.exists(self._path):
+            return None
+        table = self.table_name(kind, wilayah_id, srs)
+        db = self._metadata()
+        try:
+            row = db.execute('SELECT stored_at FROM geokkp_layer_cache WHERE table_name = ?', (table,)).fetchone()
+        finally:
+            db.close()
+        if row is None or time.time() - row[0] >= self._ttl:
+            return None
+
+        layer = QgsVectorLayer(self._uri(table), name, 'ogr')
+        return layer if layer.isValid() else None
+
+    def save(self, layer, kind, wilayah_id, srs):
+        """
+        Write layer to the GeoPackage with a spatial index and return the
+        layer reopened from disk, or the given layer if writing failed
+        """
+        os.makedirs(os.path.dirname(self._path), exist_ok=True)
+        table = self.table_name(kind, wilayah_id, srs)
+
+        options = QgsVectorFileWriter.SaveVectorOptions()
+        options.driverName = 'GPKG'
+        options.layerName = table
+        options.layerOptions = ['SPATIAL_INDEX=YES']
+        if os.path.exists(self._path):
+            options.actionOnExistingFile = QgsVectorFileWriter.CreateOrOverwriteLayer
+        else:
+            options.actionOnExistingFile = QgsVectorFileWriter.CreateOrOverwriteFile
+        error = QgsVectorFileWriter.writeAsVectorFormat(layer, self._path, options)
+        if error[0] != QgsVectorFileWriter.NoError:
+            return layer
+
+        db = self._metadata()
+        try:
+            db.execute(
+                'INSERT OR REPLACE INTO geokkp_layer_cache VALUES (?, ?, ?, ?, ?, ?)',
+                (table, kind, str(wilayah_id), srs, self._version, time.time())
+            )
+            db.commit()
+        finally:
+            db.close()
+
+        cached = QgsVectorLayer(self._uri(table), layer.name(), 'ogr')
+        return cached if cached.isValid() else layer
+
+    def purge(self):
+        """
+        Forget every cached layer. The file itself is removed when none of
+        its layers is loaded in the project, otherwise the tables of the
+        layers not loaded are dropped and the loaded ones are overwritten
+        by the next downloads. The tables are also dropped when the file
+        cannot be removed, e.g. still held open by OGR on Windows.
+        """
+        if not os.path.exists(self._path):
+            return
+        in_use = {
+            layer.source().partition('|layername=')[2].split('|')[0]
+            for layer in QgsProject.instance().mapLayers().values()
+            if layer.source().startswith(self._path)
+        }
+        if not in_use:
+            try:
+                os.remove(self._path)
+                return
+            except OSError:
+                pass
+        db = self._metadata()
+        try:
+            cached = {row[0] for row in db.execute('SELECT table_name FROM geokkp_layer_cache')}
+            db.execute('DELETE FROM geokkp_layer_cache')
+            db.commit()
+        finally:
+            db.close()
+
+        # dropped through OGR, which also removes the GeoPackage metadata and R-tree of each table;
+        # the freed pages are reused by the next downloads so the file stops growing
+        dataset = ogr.Open(self._path, update=1)
+        if dataset is None:
+            return
+        for index in reversed(range(dataset.GetLayerCount())):
+            name = dataset.GetLayerByIndex(index).GetName()
+            if name in cached and name not in in_use:
+                dataset.DeleteLayer(index)
+        dataset = None
+
+
+layer_cache = LayerCache()
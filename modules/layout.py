@@ -1,6 +1,6 @@
 import os
 
-from qgis.PyQt import QtWidgets, uic, QtXml
+from qgis.PyQt import QtWidgets, QtXml
 from qgis.core import (
     QgsProject, QgsPrintLayout, QgsReadWriteContext, QgsExpressionContextUtils,
     Qgis
@@ -12,9 +12,9 @@ from qgis.gui import QgsMessageBar
 
 # using utils
 from .utils import icon, readSetting
+from .ui_loader import load_ui
 
-FORM_CLASS, _ = uic.loadUiType(os.path.join(
-    os.path.dirname(__file__), '../ui/layout_all.ui'))
+FORM_CLASS, _ = load_ui('layout_all')
 
 class LayoutDialog(QtWidgets.QDialog, FORM_CLASS):
     """ Dialog for Layouting """
@@ -1,6 +1,6 @@
 import os
 
-from qgis.PyQt import QtWidgets, uic, QtXml
+from qgis.PyQt import QtWidgets, QtXml
 from qgis.core import QgsProject, QgsPrintLayout, QgsReadWriteContext, QgsExpressionContextUtils
 
 from qgis.PyQt.QtCore import pyqtSignal
@@ -8,9 +8,9 @@ from qgis.utils import iface
 
 # using utils
 from .utils import icon
+from .ui_loader import load_ui
 
-FORM_CLASS, _ = uic.loadUiType(os.path.join(
-    os.path.dirname(__file__), '../ui/layout_gu.ui'))
+FORM_CLASS, _ = load_ui('layout_gu')
 
 qpt_path_a3 = os.path.join(os.path.dirname(__file__), '../template/gu-a3.qpt')
 
@@ -1,7 +1,7 @@
-import os
 import json
+from functools import partial
 
-from qgis.PyQt import QtWidgets, uic
+from qgis.PyQt import QtWidgets
 from qgis.PyQt.QtCore import pyqtSignal
 from qgis.utils import iface
 from qgis.core import Qgis
@@ -18,10 +18,10 @@ from .utils import (
 from .api import endpoints
 from .memo import app_state
 from .postlogin import PostLoginDock
+from .ui_loader import load_ui
 
 
-FORM_CLASS, _ = uic.loadUiType(os.path.join(
-    os.path.dirname(__file__), '../ui/login.ui'))
+FORM_CLASS, _ = load_ui('login')
 
 
 class LoginDialog(QtWidgets.QDialog, FORM_CLASS):
@@ -68,10 +68,16 @@ class LoginDialog(QtWidgets.QDialog, FORM_CLASS):
         username = self.inputUsername.text()
         password = self.inputPassword.text()
         logMessage(f'{username}, {password}')
+        self.buttonBoxLogin.setEnabled(False)
+        future = endpoints.login.run_async(username, password)
+        future.on_finished(partial(self.loginFinished, username, password))
+        future.on_error(self.loginFailed)
+
+    def loginFinished(self, username, password, response):
         try:
-            response = endpoints.login(username, password)
             content = json.loads(response.content)
             if not content['status']:
+                self.buttonBoxLogin.setEnabled(True)
                 dialogBox(content['information'],)
             else:
                 if self.checkboxSaveLogin.isChecked():
@@ -84,22 +90,31 @@ class LoginDialog(QtWidgets.QDialog, FORM_CLASS):
                 app_state.set('logged_in', True)
                 self.getKantorProfile(username)
         except Exception as e:
-            print(e)
-            dialogBox("Kesalahan koneksi. Periksa sambungan Anda ke server GeoKKP", "Koneksi Bermasalah", "Warning")
+            self.loginFailed(e)
+
+    def loginFailed(self, exception):
+        logMessage(f"Login gagal: {exception}", Qgis.Warning)
+        self.buttonBoxLogin.setEnabled(True)
+        dialogBox("Kesalahan koneksi. Periksa sambungan Anda ke server GeoKKP", "Koneksi Bermasalah", "Warning")
 
     def getKantorProfile(self, username):
         """
         user entity
         API backend: {}/getEntityByUserName
         """
-        try:
-            response = endpoints.get_entity_by_username(username)
-        except Exception as e:
-            print(e)
-            dialogBox("Data Pengguna gagal dimuat dari server",
-                      "Koneksi Bermasalah",
-                      "Warning")
-
+        future = endpoints.get_entity_by_username.run_async(username)
+        future.on_finished(self.kantorProfileLoaded)
+        future.on_error(self.kantorProfileFailed)
+
+    def kantorProfileFailed(self, exception):
+        logMessage(f"Gagal memuat data pengguna: {exception}", Qgis.Warning)
+        self.buttonBoxLogin.setEnabled(True)
+        dialogBox("Data Pengguna gagal dimuat dari server",
+                  "Koneksi Bermasalah",
+                  "Warning")
+
+    def kantorProfileLoaded(self, response):
+        self.buttonBoxLogin.setEnabled(True)
         if response is not None:
             response_json = json.loads(response.content)
             storeSetting("jumlahkantor", len(response_json))
@@ -0,0 +1,292 @@
+"""
+Nomor Lembar Peta (NLP)
+===========================================
+
+Perhitungan NLP skala 1:10.000 sampai 1:250 dari koordinat TM-3.
+Semua tingkat dihitung dalam satu kali jalan, baik untuk satu titik
+maupun untuk array titik (NumPy). Modul ini tidak bergantung pada qgis.
+"""
+
+import re
+import math
+from functools import lru_cache
+
+import numpy as np
+
+# constants for NLP
+x_origin = 32000
+y_origin = 282000
+grid_10rb = 6000
+grid_2500 = 1500
+grid_1000 = 500
+grid_500 = 250
+grid_250 = 125
+
+SCALES = ('10000', '2500', '1000', '500', '250')
+GRIDS = (grid_10rb, grid_2500, grid_1000, grid_500, grid_250)
+# sheets per row of the parent sheet, for 2500, 1000, 500 and 250
+SHEETS_PER_ROW = (4, 3, 2, 2)
+
+NLP_PATTERN = re.compile(r'^\s*(\d+)\.(\d+)((?:-\d+){0,4})\s*$')
+NLP_CACHE_SIZE = 65536
+
+
+def bk_all(x, y, levels=len(GRIDS)):
+    """
+    Kolom and baris of a point at every scale, coarse to fine:
+    [(k_10rb, b_10rb), (k_2500, b_2500), ..., (k_250, b_250)]
+
+    Each level divides the offset from the origin of the parent sheet,
+    so the coarser levels are computed once instead of again for every
+    scale.
+    """
+    result = []
+    ox = x_origin
+    oy = y_origin
+    for grid in GRIDS[:levels]:
+        k = int((x - ox) / grid) + 1
+        b = int((y - oy) / grid) + 1
+        result.append((k, b))
+        ox += (k - 1) * grid
+        oy += (b - 1) * grid
+    return result
+
+
+def bk_10000(x, y):
+    return list(bk_all(x, y, 1)[0])
+
+
+def bk_2500(x, y):
+    return list(bk_all(x, y, 2)[1])
+
+
+def bk_1000(x, y):
+    return list(bk_all(x, y, 3)[2])
+
+
+def bk_500(x, y):
+    return list(bk_all(x, y, 4)[3])
+
+
+def bk_250(x, y):
+    return list(bk_all(x, y, 5)[4])
+
+
+def get_nlp(skala, x, y):
+    """
+    Cetak Nomor Lembar Peta berdasarkan skala
+
+    argumen:
+        skala   : skala peta dalam string
+        x       : koordinat x dalam CRS TM-3
+        y       : koordinat y dalam CRS TM-3
+    output: string NLP
+    """
+    if skala not in SCALES:
+        return "Kesalahan Penentuan skala"
+    # only the levels down to the requested scale
+    return nlp_from_bk(skala, bk_all(x, y, SCALES.index(skala) + 1))
+
+
+def nlp_from_bk(skala, bk):
+    """Format the NLP string of a scale from the bk_all() result"""
+    if skala not in SCALES:
+        return "Kesalahan Penentuan skala"
+    k_10rb, b_10rb = bk[0]
+    nlp = f'{k_10rb:02d}.{b_10rb:03d}'
+    for level in range(1, SCALES.index(skala) + 1):
+        k, b = bk[level]
+        number = SHEETS_PER_ROW[level - 1] * (b - 1) + k
+        nlp += f'-{number:02d}' if level == 1 else f'-{number}'
+    return nlp
+
+
+def sheet_size(skala):
+    """Width and height in meters of a sheet at a scale"""
+    return GRIDS[SCALES.index(skala)]
+
+
+def _sheet_range(xmin, ymin, xmax, ymax, grid):
+    """Global column and row range (end exclusive) of the sheets overlapping an extent"""
+    first_k = math.floor((xmin - x_origin) / grid)
+    first_b = math.floor((ymin - y_origin) / grid)
+    # a sheet only touching the extent border is not included
+    last_k = max(math.ceil((xmax - x_origin) / grid), first_k + 1)
+    last_b = max(math.ceil((ymax - y_origin) / grid), first_b + 1)
+    return first_k, first_b, last_k, last_b
+
+
+def count_sheets(xmin, ymin, xmax, ymax, skala):
+    """Number of sheets of a scale overlapping an extent"""
+    first_k, first_b, last_k, last_b = _sheet_range(xmin, ymin, xmax, ymax, sheet_size(skala))
+    return (last_k - first_k) * (last_b - first_b)
+
+
+def sheets_in_extent(xmin, ymin, xmax, ymax, skala):
+    """
+    Lower left corners (x, y arrays) of the sheets of a scale overlapping
+    an extent in TM-3. The grids of all scales share the origin and nest
+    exactly, so the sheets of one scale form a regular grid.
+    """
+    grid = sheet_size(skala)
+    first_k, first_b, last_k, last_b = _sheet_range(xmin, ymin, xmax, ymax, grid)
+    k, b = np.meshgrid(np.arange(first_k, last_k), np.arange(first_b, last_b))
+    return x_origin + k.ravel() * grid, y_origin + b.ravel() * grid
+
+
+def iter_sheet_grid(xmin, ymin, xmax, ymax, skala, chunk_size=10000):
+    """
+    Every sheet of a scale overlapping an extent, generated a block of
+    rows at a time so large extents never hold the whole grid in memory.
+    Yields (corner_x, corner_y, nlp) arrays of lower left corners and NLP.
+    """
+    grid = sheet_size(skala)
+    first_k, first_b, last_k, last_b = _sheet_range(xmin, ymin, xmax, ymax, grid)
+    columns = np.arange(first_k, last_k)
+    rows_per_chunk = max(1, chunk_size // len(columns))
+
+    for start in range(first_b, last_b, rows_per_chunk):
+        rows = np.arange(start, min(start + rows_per_chunk, last_b))
+        k, b = np.meshgrid(columns, rows)
+        corner_x = x_origin + k.ravel() * grid
+        corner_y = y_origin + b.ravel() * grid
+        # numbered at the sheet center, away from the shared edges
+        nlp = get_nlp_array(corner_x + grid / 2, corner_y + grid / 2, scales=(skala,))[skala]
+        yield corner_x, corner_y, nlp
+
+
+# little endian WKB polygon with one closed ring of 5 points
+RECTANGLE_WKB = np.dtype([
+    ('order', 'u1'), ('type', '<u4'), ('rings', '<u4'), ('points', '<u4'), ('xy', '<f8', (10,))
+])
+
+
+def rectangles_wkb(corner_x, corner_y, size):
+    """WKB of square polygons from their lower left corners, as a list of bytes"""
+    count = len(corner_x)
+    records = np.empty(count, dtype=RECTANGLE_WKB)
+    records['order'] = 1
+    records['type'] = 3
+    records['rings'] = 1
+    records['points'] = 5
+    x1 = corner_x + size
+    y1 = corner_y + size
+    xy = records['xy']
+    xy[:, 0::2] = np.stack([corner_x, x1, x1, corner_x, corner_x], axis=1)
+    xy[:, 1::2] = np.stack([corner_y, corner_y, y1, y1, corner_y], axis=1)
+
+    data = records.tobytes()
+    width = RECTANGLE_WKB.itemsize
+    return [data[i:i + width] for i in range(0, count * width, width)]
+
+
+@lru_cache(maxsize=NLP_CACHE_SIZE)
+def nlp_to_rect(nlp):
+    """
+    Inverse of get_nlp: the sheet of an NLP string such as '12.034-05-7-2-3'
+    as (xmin, ymin, xmax, ymax, skala) in TM-3.
+    Raises ValueError for a malformed NLP. Results are memoized, repeated
+    lookups (e.g. validating the NLP attribute of a layer) cost a dict hit.
+    """
+    match = NLP_PATTERN.match(nlp)
+    if match is None:
+        raise ValueError(f'NLP tidak valid: {nlp}')
+
+    xmin = x_origin + (int(match.group(1)) - 1) * grid_10rb
+    ymin = y_origin + (int(match.group(2)) - 1) * grid_10rb
+    numbers = [int(number) for number in match.group(3).split('-')[1:]]
+    for level, number in enumerate(numbers, start=1):
+        per_row = SHEETS_PER_ROW[level - 1]
+        if not 1 <= number <= per_row * per_row:
+            raise ValueError(f'NLP tidak valid: {nlp}')
+        xmin += (number - 1) % per_row * GRIDS[level]
+        ymin += (number - 1) // per_row * GRIDS[level]
+
+    grid = GRIDS[len(numbers)]
+    return xmin, ymin, xmin + grid, ymin + grid, SCALES[len(numbers)]
+
+
+def is_valid_nlp(nlp):
+    try:
+        nlp_to_rect(nlp)
+    except (ValueError, TypeError):
+        return False
+    return True
+
+
+def nlp_grid(x, y):
+    """
+    Vectorized bk_all for arrays of TM-3 coordinates.
+    Returns (kolom, baris) integer arrays of shape x.shape + (5,), the
+    last axis ordered as SCALES.
+    """
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    kolom = np.empty(x.shape + (len(GRIDS),), dtype=np.int64)
+    baris = np.empty(y.shape + (len(GRIDS),), dtype=np.int64)
+
+    # origins of the current parent sheet, integral so they stay exact
+    ox = np.full(x.shape, x_origin, dtype=np.int64)
+    oy = np.full(y.shape, y_origin, dtype=np.int64)
+    for level, grid in enumerate(GRIDS):
+        # truncation toward zero, as int() in bk_all
+        k = np.trunc((x - ox) / grid).astype(np.int64) + 1
+        b = np.trunc((y - oy) / grid).astype(np.int64) + 1
+        kolom[..., level] = k
+        baris[..., level] = b
+        ox += (k - 1) * grid
+        oy += (b - 1) * grid
+    return kolom, baris
+
+
+def nlp_numbers(kolom, baris):
+    """
+    Sheet numbers from nlp_grid(): column 0 and 1 hold k_10rb and b_10rb,
+    columns 2 to 5 the sheet number inside the parent sheet at 2500, 1000,
+    500 and 250
+    """
+    numbers = np.empty(kolom.shape[:-1] + (len(GRIDS) + 1,), dtype=np.int64)
+    numbers[..., 0] = kolom[..., 0]
+    numbers[..., 1] = baris[..., 0]
+    for level, per_row in enumerate(SHEETS_PER_ROW, start=1):
+        numbers[..., level + 1] = per_row * (baris[..., level] - 1) + kolom[..., level]
+    return numbers
+
+
+# zero padding of each column of nlp_numbers() in the NLP string
+PADDING = (2, 3, 2, 0, 0, 0)
+SEPARATORS = ('', '.', '-', '-', '-', '-')
+# sheet numbers below this are formatted by table lookup
+LOOKUP_SIZE = 10000
+
+
+@lru_cache(maxsize=None)
+def _lookup_table(padding):
+    return np.array([f'{value:0{padding}d}' for value in range(LOOKUP_SIZE)])
+
+
+def _column_strings(values, padding):
+    if values.size == 0 or (values.min() >= 0 and values.max() < LOOKUP_SIZE):
+        # indexing a table of formatted numbers is much faster than astype(str)
+        return _lookup_table(padding)[values]
+    strings = values.astype(str)
+    return np.char.zfill(strings, padding) if padding else strings
+
+
+def get_nlp_array(x, y, scales=SCALES):
+    """
+    NLP strings of arrays of TM-3 points at several scales at once.
+    Returns a dict of scale to an array of strings, identical to get_nlp
+    for every point.
+    """
+    numbers = nlp_numbers(*nlp_grid(x, y))
+    result = {}
+    nlp = None
+    for column, (padding, separator) in enumerate(zip(PADDING, SEPARATORS)):
+        part = _column_strings(numbers[..., column], padding)
+        nlp = part if nlp is None else np.char.add(np.char.add(nlp, separator), part)
+        # columns 0 and 1 together make the 10000 sheet
+        skala = SCALES[max(column - 1, 0)]
+        if column > 0 and skala in scales:
+            result[skala] = nlp
+    return result
@@ -0,0 +1,356 @@
+import numpy as np
+
+from qgis.PyQt.QtCore import QVariant, QCoreApplication
+from qgis.core import (
+    QgsCoordinateReferenceSystem,
+    QgsCoordinateTransform,
+    QgsFeature,
+    QgsFeatureRequest,
+    QgsFeatureSink,
+    QgsField,
+    QgsFields,
+    QgsGeometry,
+    QgsProcessing,
+    QgsProcessingAlgorithm,
+    QgsProcessingException,
+    QgsProcessingParameterCrs,
+    QgsProcessingParameterEnum,
+    QgsProcessingParameterExtent,
+    QgsProcessingParameterFeatureSink,
+    QgsProcessingParameterFeatureSource,
+    QgsProcessingParameterString,
+    QgsProcessingUtils,
+    QgsRectangle,
+    QgsWkbTypes,
+)
+
+from .nlp import SCALES, count_sheets, get_nlp_array, sheet_size, sheets_in_extent
+from .utils import icon, iter_nlp_sheet_features, nlp_sheet_fields
+
+"""
+Algoritma Processing NLP
+===========================================
+
+Penomoran NLP seluruh bidang dalam satu layer (mis. '(20100) Batas Persil')
+dan pembuatan grid lembar NLP untuk suatu extent
+"""
+
+TM3_AUTHIDS = [f'EPSG:{code}' for code in range(23830, 23846)]
+DEFAULT_PARCEL_LAYER = '(20100) Batas Persil'
+
+MODE_CENTROID = 0
+MODE_INTERSECTS = 1
+
+
+class NlpTaggingAlgorithm(QgsProcessingAlgorithm):
+    """
+    Tag every feature with its NLP at a chosen scale, from the centroid or
+    as the list of every sheet intersecting the geometry.
+
+    Coordinates are collected in a first pass and the sheet numbers are
+    computed for all of them at once with get_nlp_array, the features are
+    written in a second pass.
+    """
+
+    INPUT = 'INPUT'
+    SCALE = 'SCALE'
+    MODE = 'MODE'
+    FIELD = 'FIELD'
+    TM3_CRS = 'TM3_CRS'
+    OUTPUT = 'OUTPUT'
+
+    def tr(self, string):
+        return QCoreApplication.translate('NlpTaggingAlgorithm', string)
+
+    def createInstance(self):
+        return NlpTaggingAlgorithm()
+
+    def name(self):
+        return 'nlptagging'
+
+    def displayName(self):
+        return self.tr('Penomoran NLP Bidang')
+
+    def group(self):
+        return self.tr('NLP')
+
+    def groupId(self):
+        return 'nlp'
+
+    def icon(self):
+        return icon('icon.png')
+
+    def shortHelpString(self):
+        return self.tr(
+            'Menghitung Nomor Lembar Peta (NLP) pada skala terpilih untuk setiap fitur, '
+            'berdasarkan centroid atau seluruh lembar yang berpotongan dengan geometri. '
+            'Koordinat dihitung dalam TM-3; jika layer tidak dalam TM-3, pilih zona TM-3 tujuan.'
+        )
+
+    def initAlgorithm(self, config=None):
+        self.addParameter(QgsProcessingParameterFeatureSource(
+            self.INPUT,
+            self.tr('Layer bidang'),
+            [QgsProcessing.TypeVectorAnyGeometry],
+            defaultValue=DEFAULT_PARCEL_LAYER
+        ))
+        self.addParameter(QgsProcessingParameterEnum(
+            self.SCALE,
+            self.tr('Skala'),
+            options=[f'1:{skala}' for skala in SCALES],
+            defaultValue=SCALES.index('1000')
+        ))
+        self.addParameter(QgsProcessingParameterEnum(
+            self.MODE,
+            self.tr('Penentuan lembar'),
+            options=[self.tr('Centroid'), self.tr('Semua lembar yang berpotongan')],
+            defaultValue=MODE_CENTROID
+        ))
+        self.addParameter(QgsProcessingParameterString(
+            self.FIELD,
+            self.tr('Nama atribut NLP'),
+            defaultValue='NLP'
+        ))
+        self.addParameter(QgsProcessingParameterCrs(
+            self.TM3_CRS,
+            self.tr('Zona TM-3 (jika layer tidak dalam TM-3)'),
+            optional=True
+        ))
+        self.addParameter(QgsProcessingParameterFeatureSink(
+            self.OUTPUT,
+            self.tr('Bidang dengan NLP')
+        ))
+
+    def processAlgorithm(self, parameters, context, feedback):
+        source = self.parameterAsSource(parameters, self.INPUT, context)
+        if source is None:
+            raise QgsProcessingException(self.invalidSourceError(parameters, self.INPUT))
+        skala = SCALES[self.parameterAsEnum(parameters, self.SCALE, context)]
+        mode = self.parameterAsEnum(parameters, self.MODE, context)
+        field_name = self.parameterAsString(parameters, self.FIELD, context) or 'NLP'
+        transform = self._tm3_transform(source, parameters, context)
+
+        fields = QgsFields(source.fields())
+        field_index = fields.lookupField(field_name)
+        if field_index < 0:
+            fields.append(QgsField(field_name, QVariant.String, len=254))
+            field_index = fields.count() - 1
+
+        (sink, dest_id) = self.parameterAsSink(
+            parameters, self.OUTPUT, context, fields, source.wkbType(), source.sourceCrs()
+        )
+        if sink is None:
+            raise QgsProcessingException(self.invalidSinkError(parameters, self.OUTPUT))
+
+        # first pass: sheet numbers of every feature, computed at once
+        feedback.setProgressText(self.tr('Menghitung koordinat lembar'))
+        if mode == MODE_CENTROID:
+            nlp_by_feature = self._centroid_nlp(source, transform, skala, feedback)
+        else:
+            nlp_by_feature = self._intersecting_nlp(source, transform, skala, feedback)
+        if feedback.isCanceled():
+            return {}
+
+        # second pass: write the features with their NLP
+        feedback.setProgressText(self.tr('Menulis atribut NLP'))
+        total = 100.0 / source.featureCount() if source.featureCount() else 0
+        for current, feature in enumerate(source.getFeatures()):
+            if feedback.isCanceled():
+                break
+            attributes = feature.attributes()
+            value = nlp_by_feature.get(feature.id())
+            if field_index < len(attributes):
+                attributes[field_index] = value
+            else:
+                attributes.append(value)
+            output = QgsFeature(fields)
+            output.setGeometry(feature.geometry())
+            output.setAttributes(attributes)
+            sink.addFeature(output, QgsFeatureSink.FastInsert)
+            feedback.setProgress(50 + int(current * total) // 2)
+
+        return {self.OUTPUT: dest_id}
+
+    def _tm3_transform(self, source, parameters, context):
+        """Transform from the source CRS to TM-3, None when it already is TM-3"""
+        source_crs = source.sourceCrs()
+        if source_crs.authid() in TM3_AUTHIDS:
+            return None
+        target_crs = self.parameterAsCrs(parameters, self.TM3_CRS, context)
+        if not target_crs.isValid() or target_crs.authid() not in TM3_AUTHIDS:
+            raise QgsProcessingException(self.tr(
+                'Layer tidak menggunakan CRS TM-3, pilih zona TM-3 (EPSG:23830 - EPSG:23845)'
+            ))
+        return QgsCoordinateTransform(source_crs, QgsCoordinateReferenceSystem(target_crs), context.transformContext())
+
+    def _centroid_nlp(self, source, transform, skala, feedback):
+        ids = []
+        xs = []
+        ys = []
+        request = QgsFeatureRequest().setNoAttributes()
+        count = source.featureCount()
+        total = 100.0 / count if count else 0
+
+        for current, feature in enumerate(source.getFeatures(request)):
+            if feedback.isCanceled():
+                return {}
+            geometry = feature.geometry()
+            if geometry.isNull():
+                continue
+            centroid = geometry.centroid()
+            if transform is not None:
+                centroid.transform(transform)
+            point = centroid.asPoint()
+            ids.append(feature.id())
+            xs.append(point.x())
+            ys.append(point.y())
+            feedback.setProgress(int(current * total) // 2)
+
+        nlp = get_nlp_array(np.array(xs), np.array(ys), scales=(skala,))[skala]
+        return dict(zip(ids, nlp.tolist()))
+
+    def _intersecting_nlp(self, source, transform, skala, feedback):
+        """
+        Candidate sheets come from the geometry bounding box, only those
+        the geometry really intersects are kept
+        """
+        half = sheet_size(skala) / 2
+        ids = []
+        counts = []
+        xs = []
+        ys = []
+        request = QgsFeatureRequest().setNoAttributes()
+        count = source.featureCount()
+        total = 100.0 / count if count else 0
+
+        for current, feature in enumerate(source.getFeatures(request)):
+            if feedback.isCanceled():
+                return {}
+            geometry = QgsGeometry(feature.geometry())
+            if geometry.isNull():
+                continue
+            if transform is not None:
+                geometry.transform(transform)
+            box = geometry.boundingBox()
+            corner_x, corner_y = sheets_in_extent(
+                box.xMinimum(), box.yMinimum(), box.xMaximum(), box.yMaximum(), skala
+            )
+            if len(corner_x) > 1:
+                engine = QgsGeometry.createGeometryEngine(geometry.constGet())
+                engine.prepareGeometry()
+                keep = [
+                    engine.intersects(QgsGeometry.fromRect(QgsRectangle(x, y, x + 2 * half, y + 2 * half)).constGet())
+                    for x, y in zip(corner_x.tolist(), corner_y.tolist())
+                ]
+                corner_x = corner_x[keep]
+                corner_y = corner_y[keep]
+            ids.append(feature.id())
+            counts.append(len(corner_x))
+            xs.append(corner_x + half)
+            ys.append(corner_y + half)
+            feedback.setProgress(int(current * total) // 2)
+
+        if not ids:
+            return {}
+        # sheet centers of every feature in one call
+        nlp = get_nlp_array(np.concatenate(xs), np.concatenate(ys), scales=(skala,))[skala].tolist()
+        result = {}
+        start = 0
+        for feature_id, sheets in zip(ids, counts):
+            result[feature_id] = ', '.join(sorted(nlp[start:start + sheets]))
+            start += sheets
+        return result
+
+
+class NlpGridAlgorithm(QgsProcessingAlgorithm):
+    """
+    Every NLP sheet of a scale overlapping an extent, as one polygon layer
+    labelled with the sheet number. Sheets are generated and written a
+    block of rows at a time, so a whole kabupaten fits in one run.
+    """
+
+    EXTENT = 'EXTENT'
+    SCALE = 'SCALE'
+    TM3_CRS = 'TM3_CRS'
+    OUTPUT = 'OUTPUT'
+
+    def tr(self, string):
+        return QCoreApplication.translate('NlpGridAlgorithm', string)
+
+    def createInstance(self):
+        return NlpGridAlgorithm()
+
+    def name(self):
+        return 'nlpgrid'
+
+    def displayName(self):
+        return self.tr('Grid Lembar NLP')
+
+    def group(self):
+        return self.tr('NLP')
+
+    def groupId(self):
+        return 'nlp'
+
+    def icon(self):
+        return icon('icon.png')
+
+    def shortHelpString(self):
+        return self.tr(
+            'Membuat seluruh lembar NLP pada skala terpilih (1:10000 sampai 1:250) yang '
+            'berpotongan dengan extent, dalam satu layer dengan atribut NLP dan indeks spasial.'
+        )
+
+    def initAlgorithm(self, config=None):
+        self.addParameter(QgsProcessingParameterExtent(
+            self.EXTENT,
+            self.tr('Extent')
+        ))
+        self.addParameter(QgsProcessingParameterEnum(
+            self.SCALE,
+            self.tr('Skala'),
+            options=[f'1:{skala}' for skala in SCALES],
+            defaultValue=SCALES.index('1000')
+        ))
+        self.addParameter(QgsProcessingParameterCrs(
+            self.TM3_CRS,
+            self.tr('Zona TM-3'),
+            defaultValue='ProjectCrs'
+        ))
+        self.addParameter(QgsProcessingParameterFeatureSink(
+            self.OUTPUT,
+            self.tr('Grid NLP'),
+            QgsProcessing.TypeVectorPolygon
+        ))
+
+    def processAlgorithm(self, parameters, context, feedback):
+        skala = SCALES[self.parameterAsEnum(parameters, self.SCALE, context)]
+        crs = self.parameterAsCrs(parameters, self.TM3_CRS, context)
+        if not crs.isValid() or crs.authid() not in TM3_AUTHIDS:
+            raise QgsProcessingException(self.tr('Pilih zona TM-3 (EPSG:23830 - EPSG:23845)'))
+        extent = self.parameterAsExtent(parameters, self.EXTENT, context, crs)
+
+        fields = nlp_sheet_fields()
+        (sink, dest_id) = self.parameterAsSink(
+            parameters, self.OUTPUT, context, fields, QgsWkbTypes.Polygon, crs
+        )
+        if sink is None:
+            raise QgsProcessingException(self.invalidSinkError(parameters, self.OUTPUT))
+
+        bounds = (extent.xMinimum(), extent.yMinimum(), extent.xMaximum(), extent.yMaximum())
+        total = 100.0 / count_sheets(*bounds, skala)
+        written = 0
+        for features in iter_nlp_sheet_features(*bounds, skala, fields):
+            if feedback.isCanceled():
+                break
+            sink.addFeatures(features, QgsFeatureSink.FastInsert)
+            written += len(features)
+            feedback.setProgress(int(written * total))
+        feedback.pushInfo(self.tr('{} lembar NLP').format(written))
+
+        # memory outputs have no index of their own
+        layer = QgsProcessingUtils.mapLayerFromString(dest_id, context)
+        if layer is not None and layer.providerType() == 'memory':
+            layer.dataProvider().createSpatialIndex()
+
+        return {self.OUTPUT: dest_id}
@@ -1,16 +1,15 @@
-import os
 import xml.etree.ElementTree as ET
 
-from qgis.PyQt import QtWidgets, uic
+from qgis.PyQt import QtWidgets
 from qgis.core import QgsProject
 from qgis.PyQt.QtCore import pyqtSignal
 from qgis.utils import iface
 
 from .utils import dialogBox, logMessage
+from .ui_loader import load_ui
 
 
-FORM_CLASS, _ = uic.loadUiType(os.path.join(
-    os.path.dirname(__file__), '../ui/openaerialmap.ui'))
+FORM_CLASS, _ = load_ui('openaerialmap')
 
 
 class OAMDialog(QtWidgets.QDialog, FORM_CLASS):
@@ -1,12 +1,8 @@
-import os
-from osgeo import ogr
-
-
-from qgis.PyQt import QtWidgets, uic
+from qgis.PyQt import QtWidgets
 from qgis.PyQt.QtWidgets import QLineEdit
 from qgis.PyQt.QtCore import pyqtSignal
 from qgis.utils import iface
-from qgis.core import QgsCoordinateReferenceSystem, QgsProject
+from qgis.core import QgsProject
 
 # using utils
 from .utils import (
@@ -15,16 +11,14 @@ from .utils import (
     logMessage,
     readSetting,
     dialogBox,
-    get_tm3_zone,
     set_project_crs_by_epsg,
     set_symbology
 )
+from .adm_index import district
+from .adm_boundary import district_layer
+from .ui_loader import load_ui
 
-adm_district_file = os.path.join(
-    os.path.dirname(__file__), '../data/idn_adm_lv2.json')
-
-FORM_CLASS, _ = uic.loadUiType(os.path.join(
-    os.path.dirname(__file__), '../ui/pengaturan_lokasi.ui'))
+FORM_CLASS, _ = load_ui('pengaturan_lokasi')
 
 
 class PengaturanLokasiDialog(QtWidgets.QDialog, FORM_CLASS):
@@ -101,47 +95,22 @@ class PengaturanLokasiDialog(QtWidgets.QDialog, FORM_CLASS):
         # self.cari_kabupaten.setCompleter(completer)
 
     def setEPSG(self):
-        currentKabupaten = self.cari_kabupaten.currentText()
-        # print(currentKabupaten)
-        driver = ogr.GetDriverByName("TopoJSON")
-        dataSource = driver.Open(adm_district_file, 0)
-        layer = dataSource.GetLayer()
-
-        layer.SetAttributeFilter(f"WAK = '{currentKabupaten}'")
-
-        for feature in layer:
-            # print(feature.GetField("WAK"))
-            geom = feature.GetGeometryRef()
-            # print(geom.Centroid().GetX())
-            long = geom.Centroid().GetX()
-            self.zone = get_tm3_zone(long)
-            self.btsadmin_tm3.setText(self.zone)
-        layer.ResetReading()
+        """ Zona TM-3 kabupaten dari indeks batas administrasi """
+        entry = district(self.cari_kabupaten.currentText())
+        if entry is None:
+            return
+        self.zone = entry['zone']
+        self.btsadmin_tm3.setText(self.zone)
 
     def plot_lokasi(self):
         """ Eksekusi pencarian lokasi """
         currentKabupaten = self.cari_kabupaten.currentText()
-        self.iface.mainWindow().blockSignals(True)
-        layer = self.iface.addVectorLayer(adm_district_file, currentKabupaten, "ogr")
-        if not layer or not layer.isValid():
+        layer = district_layer(currentKabupaten)
+        if layer is None:
             dialogBox("Layer gagal dibaca dari Plugin GeoKKP!")
-        crs = QgsCoordinateReferenceSystem("EPSG:4326")
-        layer.setCrs(crs)
-        # QgsProject.instance().addMapLayer(layer)
-        self.iface.mainWindow().blockSignals(False)
-
-        layer.setSubsetString(f"WAK = '{currentKabupaten}'")
+            return
         set_symbology(layer, 'administrasi.qml')
-        self.iface.actionZoomToLayer().trigger()
-
-        # for feature in layer.getFeatures():
-        #    print(feature["WAK"])
-
-        epsg = get_epsg_from_tm3_zone(self.zone)
-        crs = QgsCoordinateReferenceSystem(str(epsg))
-        print(crs.isValid())
-        print(self.project.crs())
-        self.project.instance().setCrs(crs)
+        QgsProject.instance().addMapLayer(layer)
 
         try:
             epsg = get_epsg_from_tm3_zone(self.zone)
@@ -149,5 +118,6 @@ class PengaturanLokasiDialog(QtWidgets.QDialog, FORM_CLASS):
         except Exception:
             logMessage("Zona TM-3 tidak ditemukan!")
 
+        self.iface.setActiveLayer(layer)
+        self.iface.actionZoomToLayer().trigger()
         self.accept()
-
@@ -1,12 +1,9 @@
-import os
-
 from qgis.core import (
     Qgis,
-    QgsCoordinateTransform,
     QgsGeometry,
     QgsFeature,
     QgsProject)
-from qgis.PyQt import QtWidgets, uic
+from qgis.PyQt import QtWidgets
 from qgis.PyQt.QtGui import QTextCursor, QTextCharFormat
 from qgis.PyQt.QtCore import pyqtSignal, Qt
 from qgis.utils import iface
@@ -19,9 +16,10 @@ from .utils import (
     display_message_bar,
     logMessage
 )
+from .crs import crs_registry
+from .ui_loader import load_ui
 
-FORM_CLASS, _ = uic.loadUiType(os.path.join(
-    os.path.dirname(__file__), '../ui/plot_coordinate.ui'))
+FORM_CLASS, _ = load_ui('plot_coordinate')
 
 
 class CoordErrorHighlight():
@@ -114,7 +112,7 @@ class PlotCoordinateDialog(QtWidgets.QDialog, FORM_CLASS):
         # transform coordinates
         source_crs = self._currentcrs
         canvas_crs = self.canvas.mapSettings().destinationCrs()
-        tr = QgsCoordinateTransform(source_crs, canvas_crs, self.project.instance().transformContext())
+        tr = crs_registry.transform(source_crs, canvas_crs)
 
         # extract coordinate pairs
         coords = parse_raw_coordinate(raw_coords)
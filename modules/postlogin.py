@@ -2,7 +2,7 @@
 import os
 import json
 
-from qgis.PyQt import QtWidgets, uic
+from qgis.PyQt import QtWidgets
 from qgis.PyQt.QtCore import pyqtSignal
 from qgis.PyQt.QtWidgets import (
     QDockWidget
@@ -15,6 +15,7 @@ from qgis.core import (
 from .utils import (
     add_google_basemap,
     logMessage,
+    dialogBox,
     readSetting,
     storeSetting,
     get_epsg_from_tm3_zone,
@@ -22,8 +23,12 @@ from .utils import (
 )
 
 from .api import endpoints
+from .api.scheduler import RequestScheduler
 from .memo import app_state
 from .pengaturan_lokasi import PengaturanLokasiDialog
+from .wilayah_store import LEVEL_ORDER, WilayahStore
+from .wilayah_sync import wilayah_store, wilayah_sync
+from .ui_loader import load_ui
 
 # file constants
 layer_json_file = os.path.join(
@@ -32,8 +37,7 @@ basemap_json_file = os.path.join(
     os.path.dirname(__file__), '../config/basemap.json')
 
 # class UI form
-FORM_CLASS, _ = uic.loadUiType(os.path.join(
-    os.path.dirname(__file__), '../ui/postlogin2.ui'))
+FORM_CLASS, _ = load_ui('postlogin2')
 
 
 jsonKantor = readSetting("listkantor")
@@ -51,6 +55,8 @@ class PostLoginDock(QtWidgets.QDialog, FORM_CLASS):
         self.setupUi(self)
         self.project = QgsProject
 
+        self.scheduler = None
+
         # login_state = app_state.get('logged_in')
 
         for panel in self.iface.mainWindow().findChildren(QDockWidget):
@@ -116,55 +122,84 @@ class PostLoginDock(QtWidgets.QDialog, FORM_CLASS):
 
         storeSetting("kantorterpilih", [idKantorTerpilih, namaKantorTerpilih])
 
-        provinsi = self.simpanProvinsiSettings(idKantorTerpilih, idTipeKantorTerpilih)
-        kabupaten = self.simpanKabupatenSettings(idKantorTerpilih, idTipeKantorTerpilih, provinsi['PROPINSIID'])
-        kecamatan = self.simpanKecamatanSettings(idKantorTerpilih, idTipeKantorTerpilih, kabupaten['KABUPATENID'])
-        desa = self.simpanDesaSettings(idKantorTerpilih, idTipeKantorTerpilih, kecamatan['KECAMATANID'])
+        kantor_id = idKantorTerpilih
+        tipe_kantor_id = str(idTipeKantorTerpilih)
+
+        # a fresh wilayah snapshot of the kantor already holds the first wilayah of each level
+        wilayah = None if wilayah_sync.is_stale(kantor_id) else self.wilayahSnapshot(kantor_id)
+        if wilayah is not None:
+            self.simpanWilayah(*wilayah)
+            return
+
+        # each wilayah level below provinsi waits for the first item of its parent
+        self.buttonLanjut_3.setEnabled(False)
+        self.scheduler = RequestScheduler()
+        self.scheduler.add(
+            'provinsi',
+            lambda r: endpoints.get_provinsi_by_kantor.run_async(kantor_id, tipe_kantor_id))
+        self.scheduler.add(
+            'kabupaten',
+            lambda r: endpoints.get_kabupaten_by_kantor.run_async(
+                kantor_id, tipe_kantor_id, self.wilayahPertama(r['provinsi'], 'PROPINSI')['PROPINSIID']),
+            depends=['provinsi'])
+        self.scheduler.add(
+            'kecamatan',
+            lambda r: endpoints.get_kecamatan_by_kantor.run_async(
+                kantor_id, tipe_kantor_id, self.wilayahPertama(r['kabupaten'], 'KABUPATEN')['KABUPATENID']),
+            depends=['kabupaten'])
+        self.scheduler.add(
+            'desa',
+            lambda r: endpoints.get_desa_by_kantor.run_async(
+                kantor_id, tipe_kantor_id, self.wilayahPertama(r['kecamatan'], 'KECAMATAN')['KECAMATANID']),
+            depends=['kecamatan'])
+        self.scheduler.failed.connect(self.gagalMemuatData)
+        self.scheduler.finished.connect(self.simpanDataKantor)
+        self.scheduler.start()
+
+    def gagalMemuatData(self, name, exception):
+        logMessage(f"Gagal memuat {name}: {exception}")
+
+    def wilayahPertama(self, response, key):
+        response_json = json.loads(response.content)
+        if response_json and len(response_json[key]):
+            return response_json[key][0]
+
+    def wilayahSnapshot(self, kantor_id):
+        """First provinsi, kabupaten, kecamatan and desa in the snapshot of the kantor, None without one"""
+        wilayah = []
+        parent_id = None
+        for level in LEVEL_ORDER:
+            children = wilayah_store.children(kantor_id, level, parent_id)
+            if not children:
+                return None
+            wilayah.append(children[0])
+            parent_id = WilayahStore.record_id(level, children[0])
+        return wilayah
+
+    def simpanDataKantor(self, results):
+        self.buttonLanjut_3.setEnabled(True)
+        if 'desa' not in results:
+            dialogBox("Data wilayah kantor gagal dimuat dari server", "Koneksi Bermasalah", "Warning")
+            return
+
+        self.simpanWilayah(
+            self.wilayahPertama(results['provinsi'], 'PROPINSI'),
+            self.wilayahPertama(results['kabupaten'], 'KABUPATEN'),
+            self.wilayahPertama(results['kecamatan'], 'KECAMATAN'),
+            self.wilayahPertama(results['desa'], 'DESA')
+        )
+
+    def simpanWilayah(self, provinsi, kabupaten, kecamatan, desa):
+        storeSetting("provinsiterpilih", provinsi)
+        storeSetting("kabupatenterpilih", kabupaten)
+        storeSetting("kecamatanterpilih", kecamatan)
+        storeSetting("desaterpilih", desa)
 
         self.simpanSistemKoordinat(desa['ZONATM3'])
         self.simpanUserSettings()
         self.accept()
         self.panel.switch_panel(1)
 
-    def simpanProvinsiSettings(self, kantor_id, tipe_kantor_id):
-        response = endpoints.get_provinsi_by_kantor(kantor_id, str(tipe_kantor_id))
-        response_json = json.loads(response.content)
-        provinsi = None
-        if response_json and len(response_json['PROPINSI']):
-            provinsi = response_json['PROPINSI'][0]
-            storeSetting("provinsiterpilih", provinsi)
-        return provinsi
-
-    def simpanKabupatenSettings(self, kantor_id, tipe_kantor_id, provinsi_id):
-        response = endpoints.get_kabupaten_by_kantor(kantor_id, str(tipe_kantor_id), provinsi_id)
-        response_json = json.loads(response.content)
-        kabupaten = None
-        print(len(response_json['KABUPATEN']))
-        if response_json and len(response_json['KABUPATEN']):
-            kabupaten = response_json['KABUPATEN'][0]
-            storeSetting("kabupatenterpilih", kabupaten)
-        return kabupaten
-
-    def simpanKecamatanSettings(self, kantor_id, tipe_kantor_id, kabupaten_id):
-        response = endpoints.get_kecamatan_by_kantor(kantor_id, str(tipe_kantor_id), kabupaten_id)
-        response_json = json.loads(response.content)
-        kecamatan = None
-        print(len(response_json['KECAMATAN']))
-        if response_json and len(response_json['KECAMATAN']):
-            kecamatan = response_json['KECAMATAN'][0]
-            storeSetting("kecamatanterpilih", kecamatan)
-        return kecamatan
-
-    def simpanDesaSettings(self, kantor_id, tipe_kantor_id, kecamatan_id):
-        response = endpoints.get_desa_by_kantor(kantor_id, str(tipe_kantor_id), kecamatan_id)
-        response_json = json.loads(response.content)
-        desa = None
-        # print("========================", response_json['DESA'][0])
-        if response_json and len(response_json['DESA']):
-            desa = response_json['DESA'][0]
-            storeSetting("desaterpilih", desa)
-        return desa
-
     def simpanSistemKoordinat(self, tm3_zone):
         print("ZONA TM-3", tm3_zone)
         try:
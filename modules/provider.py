@@ -0,0 +1,21 @@
+from qgis.core import QgsProcessingProvider
+
+from .nlp_algorithm import NlpGridAlgorithm, NlpTaggingAlgorithm
+from .utils import icon
+
+
+class GeoKKPProvider(QgsProcessingProvider):
+    """Processing provider for the GeoKKP-GIS batch algorithms"""
+
+    def loadAlgorithms(self):
+        self.addAlgorithm(NlpTaggingAlgorithm())
+        self.addAlgorithm(NlpGridAlgorithm())
+
+    def id(self):
+        return 'geokkp'
+
+    def name(self):
+        return 'GeoKKP-GIS'
+
+    def icon(self):
+        return icon('icon.png')
@@ -0,0 +1,449 @@
+"""
+Decoder Geometri SDO (Oracle Spatial)
+===========================================
+
+Konversi sdoElemInfo/sdoOrdinates dari server GeoKKP ke WKB.
+Modul ini tidak bergantung pada qgis agar bisa dipakai di luar
+thread utama QGIS (mis. process pool)
+"""
+
+import os
+import sys
+import struct
+import multiprocessing
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from itertools import islice
+
+import numpy as np
+
+# constants for SDO Geometries
+GPOINT = 'Point'
+GLINESTRING = 'LineString'
+GPOLYGON = 'Polygon'
+SDO_GTYPE_MAP = {
+    '00': 'Unknown',
+    '01': GPOINT,
+    '02': GLINESTRING,
+    '03': GPOLYGON,
+    '04': 'Collection',
+    '05': 'MultiPoint',
+    '06': 'MultiLine',
+    '07': 'MultiPolygon',
+    '08': 'Solid',
+    '09': 'MultiSolid',
+}
+
+GMULTIPOINT = 'MultiPoint'
+GMULTILINE = 'MultiLine'
+GMULTIPOLYGON = 'MultiPolygon'
+GCOLLECTION = 'Collection'
+
+# SDO_ETYPE values
+ETYPE_POINT = 1
+ETYPE_LINE = 2
+ETYPE_COMPOUND_LINE = 4
+ETYPE_EXTERIOR = 1003
+ETYPE_INTERIOR = 2003
+ETYPE_COMPOUND_EXTERIOR = 1005
+ETYPE_COMPOUND_INTERIOR = 2005
+COMPOUND_ETYPES = (ETYPE_COMPOUND_LINE, ETYPE_COMPOUND_EXTERIOR, ETYPE_COMPOUND_INTERIOR)
+
+# SDO_INTERPRETATION values
+INTERP_LINEAR = 1
+INTERP_ARC = 2
+INTERP_RECTANGLE = 3
+INTERP_CIRCLE = 4
+
+# WKB geometry type codes
+WKB_POINT = 1
+WKB_LINESTRING = 2
+WKB_POLYGON = 3
+WKB_MULTIPOINT = 4
+WKB_MULTILINESTRING = 5
+WKB_MULTIPOLYGON = 6
+WKB_GEOMETRYCOLLECTION = 7
+WKB_CIRCULARSTRING = 8
+WKB_COMPOUNDCURVE = 9
+WKB_CURVEPOLYGON = 10
+WKB_MULTICURVE = 11
+WKB_MULTISURFACE = 12
+WKB_LITTLE_ENDIAN = 1
+
+# decode pipeline, responses smaller than POOL_THRESHOLD are decoded in process
+CHUNK_SIZE = 1000
+POOL_THRESHOLD = 5000
+WORKERS = max(1, (os.cpu_count() or 2) - 1)
+_pool = None
+_pool_disabled = False
+
+
+@lru_cache(maxsize=None)
+def parse_sdo_geometry_type(sdo_gtype):
+    sdo_gtype_str = str(sdo_gtype).rjust(4, '0')
+    gtype = sdo_gtype_str[2:4]
+    dim = max(2, int(sdo_gtype_str[0]))
+    return SDO_GTYPE_MAP[gtype], dim
+
+
+def _xy(coords, start, end, dim):
+    """(n, 2) view on coords[start:end], no copy is made for 2D data"""
+    part = coords[start:end]
+    count = len(part) // dim
+    return part[:count * dim].reshape(count, dim)[:, :2]
+
+
+def _header(wkb_type):
+    return struct.pack('<BI', WKB_LITTLE_ENDIAN, wkb_type)
+
+
+POLYGON_HEADER = _header(WKB_POLYGON) + struct.pack('<I', 1)
+LINESTRING_HEADER = _header(WKB_LINESTRING)
+
+
+def _points(xy):
+    return struct.pack('<I', len(xy)) + np.ascontiguousarray(xy).tobytes()
+
+
+def _collection(wkb_type, parts):
+    return _header(wkb_type) + struct.pack('<I', len(parts)) + b''.join(parts)
+
+
+def _circle(xy):
+    """
+    Full circle through three points as a closed 3 point circular string:
+    first point, the point diametrically opposite, first point again
+    """
+    (ax, ay), (bx, by), (cx, cy) = xy[:3]
+    d = 2 * (ax * (by - cy) + bx * (cy - ay) + cx * (ay - by))
+    a2 = ax * ax + ay * ay
+    b2 = bx * bx + by * by
+    c2 = cx * cx + cy * cy
+    ux = (a2 * (by - cy) + b2 * (cy - ay) + c2 * (ay - by)) / d
+    uy = (a2 * (cx - bx) + b2 * (ax - cx) + c2 * (bx - ax)) / d
+    return np.array([[ax, ay], [2 * ux - ax, 2 * uy - ay], [ax, ay]])
+
+
+def _rectangle(xy):
+    (x1, y1), (x2, y2) = xy[:2]
+    return np.array([[x1, y1], [x2, y1], [x2, y2], [x1, y2], [x1, y1]])
+
+
+class _Curve:
+    """
+    Line or ring of one SDO element. Linear curves keep their vertex view,
+    curved ones are encoded as CircularString/CompoundCurve WKB.
+    """
+    __slots__ = ('xy', 'wkb')
+
+    def __init__(self, xy=None, wkb=None):
+        self.xy = xy
+        self.wkb = wkb
+
+    @property
+    def linear(self):
+        return self.wkb is None
+
+    def as_wkb(self):
+        if self.wkb is not None:
+            return self.wkb
+        return _header(WKB_LINESTRING) + _points(self.xy)
+
+
+def _simple_curve(interp, xy, ring=False):
+    if interp == INTERP_ARC:
+        return _Curve(wkb=_header(WKB_CIRCULARSTRING) + _points(xy))
+    if ring and interp == INTERP_RECTANGLE:
+        return _Curve(xy=_rectangle(xy))
+    if ring and interp == INTERP_CIRCLE:
+        return _Curve(wkb=_header(WKB_CIRCULARSTRING) + _points(_circle(xy)))
+    return _Curve(xy=xy)
+
+
+def _compound_curve(segments):
+    return _Curve(wkb=_collection(
+        WKB_COMPOUNDCURVE,
+        [_simple_curve(interp, xy).as_wkb() for interp, xy in segments]
+    ))
+
+
+def _polygon_wkb(rings):
+    if all(ring.linear for ring in rings):
+        return _header(WKB_POLYGON) + struct.pack('<I', len(rings)) + b''.join(_points(r.xy) for r in rings)
+    return _collection(WKB_CURVEPOLYGON, [ring.as_wkb() for ring in rings])
+
+
+def iter_sdo_elements(elem_info, coords, dim):
+    """
+    Walk every sdoElemInfo triplet, yielding (etype, interpretation, xy)
+    for simple elements and (etype, None, [(interpretation, xy), ...]) for
+    compound elements. Every xy is a view on coords, consecutive
+    subelements of a compound share their connecting vertex.
+    """
+    triplets = [elem_info[i:i + 3] for i in range(0, len(elem_info) - 2, 3)]
+    offsets = [triplet[0] - 1 for triplet in triplets] + [len(coords)]
+    i = 0
+    while i < len(triplets):
+        offset, etype, interp = triplets[i]
+        if etype in COMPOUND_ETYPES:
+            count = interp
+            segments = []
+            for k in range(count):
+                sub_start = offsets[i + 1 + k]
+                if k < count - 1:
+                    sub_end = offsets[i + 2 + k] + dim
+                else:
+                    sub_end = offsets[i + 1 + count]
+                segments.append((triplets[i + 1 + k][2], _xy(coords, sub_start, sub_end, dim)))
+            yield etype, None, segments
+            i += 1 + count
+        else:
+            yield etype, interp, _xy(coords, offsets[i], offsets[i + 1], dim)
+            i += 1
+
+
+def sdo_to_wkb(elem_info, ordinates, sdo_gtype=None):
+    """
+    Encode an SDO geometry as little-endian (ISO) WKB bytes in a single pass
+    over every sdoElemInfo triplet: point clusters, lines, polygons with
+    interior rings, multi geometries, collections, arcs, rectangles, circles
+    and compound elements. Curved elements become curve geometries.
+
+    Without sdo_gtype the geometry type is inferred from the elements and the
+    dimension from the first etype, matching the previous decoder.
+    Returns None when there is nothing to decode.
+    """
+    if sdo_gtype is None:
+        gtype = None
+        dim = parse_sdo_geometry_type(elem_info[1])[1]
+    else:
+        gtype, dim = parse_sdo_geometry_type(sdo_gtype)
+
+    coords = np.asarray(ordinates, dtype='<f8')
+
+    # fast path for the common single element, straight edged parcel or line
+    if len(elem_info) == 3 and elem_info[2] == INTERP_LINEAR:
+        etype = elem_info[1]
+        if etype == ETYPE_EXTERIOR and gtype in (None, GPOLYGON):
+            return POLYGON_HEADER + _points(_xy(coords, elem_info[0] - 1, len(coords), dim))
+        if etype == ETYPE_LINE and gtype in (None, GLINESTRING):
+            return LINESTRING_HEADER + _points(_xy(coords, elem_info[0] - 1, len(coords), dim))
+
+    points, lines, polygons = [], [], []
+    # parts in element order, for collections
+    parts = []
+
+    for etype, interp, data in iter_sdo_elements(elem_info, coords, dim):
+        if etype == ETYPE_POINT:
+            # interpretation 0 is an orientation vector, not a point
+            if interp == 0:
+                continue
+            for xy in data[:interp]:
+                wkb = _header(WKB_POINT) + np.ascontiguousarray(xy).tobytes()
+                points.append(wkb)
+                parts.append(wkb)
+        elif etype == ETYPE_LINE:
+            curve = _simple_curve(interp, data)
+            lines.append(curve)
+            parts.append(curve)
+        elif etype == ETYPE_COMPOUND_LINE:
+            curve = _compound_curve(data)
+            lines.append(curve)
+            parts.append(curve)
+        elif etype in (ETYPE_EXTERIOR, ETYPE_INTERIOR, ETYPE_COMPOUND_EXTERIOR, ETYPE_COMPOUND_INTERIOR):
+            if interp is None:
+                ring = _compound_curve(data)
+            else:
+                ring = _simple_curve(interp, data, ring=True)
+            if etype in (ETYPE_EXTERIOR, ETYPE_COMPOUND_EXTERIOR) or not polygons:
+                rings = [ring]
+                polygons.append(rings)
+                parts.append(rings)
+            else:
+                polygons[-1].append(ring)
+
+    kinds = sum(1 for group in (points, lines, polygons) if group)
+    if not kinds:
+        return None
+
+    if gtype == GCOLLECTION or kinds > 1:
+        return _collection(WKB_GEOMETRYCOLLECTION, [
+            part if isinstance(part, bytes)
+            else part.as_wkb() if isinstance(part, _Curve)
+            else _polygon_wkb(part)
+            for part in parts
+        ])
+
+    if points:
+        if len(points) == 1 and gtype != GMULTIPOINT:
+            return points[0]
+        return _collection(WKB_MULTIPOINT, points)
+
+    if lines:
+        if len(lines) == 1 and gtype != GMULTILINE:
+            return lines[0].as_wkb()
+        if all(line.linear for line in lines):
+            return _collection(WKB_MULTILINESTRING, [line.as_wkb() for line in lines])
+        return _collection(WKB_MULTICURVE, [line.as_wkb() for line in lines])
+
+    if len(polygons) == 1 and gtype != GMULTIPOLYGON:
+        return _polygon_wkb(polygons[0])
+    if all(ring.linear for rings in polygons for ring in rings):
+        return _collection(WKB_MULTIPOLYGON, [_polygon_wkb(rings) for rings in polygons])
+    return _collection(WKB_MULTISURFACE, [_polygon_wkb(rings) for rings in polygons])
+
+
+def decode_sdo_chunk(chunk, fields):
+    """Decode a list of SDO records into (attributes, wkb) pairs"""
+    decoded = []
+    for sdo in chunk:
+        boundary = sdo['boundary']
+        wkb = sdo_to_wkb(boundary['sdoElemInfo'], boundary['sdoOrdinates'], boundary.get('sdoGtype'))
+        decoded.append(([sdo[field] for field in fields], wkb))
+    return decoded
+
+
+def _python_executable():
+    """
+    Interpreter for worker processes. Inside QGIS sys.executable may be the
+    QGIS binary itself, which must not be spawned as a worker.
+    """
+    executable = sys.executable
+    if os.path.basename(executable).lower().startswith('python'):
+        return executable
+    if os.name == 'nt':
+        candidate = os.path.join(sys.exec_prefix, 'pythonw.exe')
+    else:
+        candidate = os.path.join(sys.exec_prefix, 'bin', f'python{sys.version_info[0]}.{sys.version_info[1]}')
+    return candidate if os.path.exists(candidate) else None
+
+
+def _get_pool():
+    global _pool, _pool_disabled
+    if _pool is None and not _pool_disabled:
+        executable = _python_executable()
+        if executable is None:
+            _pool_disabled = True
+            return None
+        # spawn, forking a running Qt application is not safe
+        context = multiprocessing.get_context('spawn')
+        context.set_executable(executable)
+        try:
+            _pool = ProcessPoolExecutor(max_workers=WORKERS, mp_context=context)
+        except (OSError, ValueError):
+            _pool_disabled = True
+    return _pool
+
+
+def _disable_pool():
+    global _pool_disabled
+    _pool_disabled = True
+    shutdown_pool()
+
+
+def shutdown_pool():
+    global _pool
+    if _pool is not None:
+        _pool.shutdown(wait=False)
+        _pool = None
+
+
+def _chunks(items, size):
+    iterator = iter(items)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def _collect(chunk, future, fields):
+    if future is not None:
+        try:
+            return future.result()
+        except Exception:
+            # broken pool, decode this and every later chunk in process
+            _disable_pool()
+    return decode_sdo_chunk(chunk, fields)
+
+
+def iter_decoded_sdo(items, fields, chunk_size=CHUNK_SIZE):
+    """
+    Decode SDO records in a process pool, yielding lists of
+    (attributes, wkb) pairs chunk by chunk in input order.
+    At most two chunks per worker are in flight, so memory stays bounded
+    by the chunk size rather than the response size. Small inputs, or
+    environments where no worker can be started, are decoded in process.
+    """
+    pool = None
+    # one worker only adds pickling overhead to in process decoding
+    if WORKERS > 1 and (not isinstance(items, list) or len(items) >= POOL_THRESHOLD):
+        pool = _get_pool()
+    in_flight = 2 * WORKERS if pool is not None else 1
+
+    window = deque()
+    for chunk in _chunks(items, chunk_size):
+        future = None
+        if pool is not None and not _pool_disabled:
+            try:
+                future = pool.submit(decode_sdo_chunk, chunk, fields)
+            except Exception:
+                _disable_pool()
+        window.append((chunk, future))
+        if len(window) >= in_flight:
+            yield _collect(*window.popleft(), fields)
+    while window:
+        yield _collect(*window.popleft(), fields)
+
+
+class SdoStreamDecoder:
+    """
+    Push counterpart of iter_decoded_sdo for records arriving one by one,
+    e.g. parsed from a response that is still downloading. push() and
+    finish() return the chunks of (attributes, wkb) pairs decoded so far,
+    in input order, without waiting for chunks still in the pool unless
+    the in flight window is full.
+    """
+
+    def __init__(self, fields, chunk_size=CHUNK_SIZE):
+        self._fields = fields
+        self._chunk_size = chunk_size
+        self._chunk = []
+        self._window = deque()
+        # the response size is unknown up front, use the pool whenever it helps
+        self._pool = _get_pool() if WORKERS > 1 else None
+        self._in_flight = 2 * WORKERS if self._pool is not None else 1
+
+    def push(self, sdo):
+        self._chunk.append(sdo)
+        if len(self._chunk) >= self._chunk_size:
+            self._submit()
+        return self._ready()
+
+    def finish(self):
+        if self._chunk:
+            self._submit()
+        decoded = []
+        while self._window:
+            decoded.append(_collect(*self._window.popleft(), self._fields))
+        return decoded
+
+    def _submit(self):
+        chunk, self._chunk = self._chunk, []
+        future = None
+        if self._pool is not None and not _pool_disabled:
+            try:
+                future = self._pool.submit(decode_sdo_chunk, chunk, self._fields)
+            except Exception:
+                _disable_pool()
+        self._window.append((chunk, future))
+
+    def _ready(self):
+        decoded = []
+        while self._window:
+            future = self._window[0][1]
+            if future is not None and not future.done() and len(self._window) < self._in_flight:
+                break
+            decoded.append(_collect(*self._window.popleft(), self._fields))
+        return decoded
@@ -1,11 +1,9 @@
-import os
-
-from qgis.PyQt import QtWidgets, uic
+from qgis.PyQt import QtWidgets
 from qgis.PyQt.QtCore import pyqtSignal
 from qgis.utils import iface
+from .ui_loader import load_ui
 
-FORM_CLASS, _ = uic.loadUiType(os.path.join(
-    os.path.dirname(__file__), '../ui/settings.ui'))
+FORM_CLASS, _ = load_ui('settings')
 
 
 class SettingsDialog(QtWidgets.QDialog, FORM_CLASS):
@@ -0,0 +1,112 @@
+import os
+
+from qgis.PyQt.QtCore import QTimer
+from qgis.core import Qgis, QgsMessageLog, QgsSettings
+
+"""
+Cache Pengaturan GeoKKP
+===========================================
+
+Lapisan cache di memori di depan QgsSettings: nilai yang sudah dibaca
+tidak dideserialisasi ulang, penulisan langsung diteruskan ke QgsSettings
+dan sync ke disk ditunda lalu digabung menjadi satu.
+"""
+
+SETTINGS_PREFIX = 'geokkp/'
+DEFAULT_SYNC_DELAY = 2000  # ms
+DEBUG = bool(os.environ.get('GEOKKP_DEBUG'))
+
+_MISSING = object()
+
+
+class SettingsCache:
+    """
+    Write-through cache of the GeoKKP entries of QgsSettings
+
+    Reads hit a dict after the first access of a key, writes go to the dict
+    and to QgsSettings, and the flush to disk (sync) happens once per burst
+    of writes, ``sync_delay`` ms after the last one, or on ``flush()``.
+    Values are shared with the cache: callers must store a changed value
+    again rather than edit a list or dict read from it in place.
+
+    Usage
+    -----
+    ::
+        settings_cache.set_value('listkantor', kantor)
+        kantor = settings_cache.value('listkantor', [])
+        zone = settings_cache.value('zona', type=str)
+    """
+
+    def __init__(self, settings=None, prefix=SETTINGS_PREFIX, sync_delay=DEFAULT_SYNC_DELAY, debug=DEBUG):
+        self._settings = settings or QgsSettings()
+        self._prefix = prefix
+        self._values = {}
+        self._loaders = {}
+        self.debug = debug
+        self._sync_timer = QTimer()
+        self._sync_timer.setSingleShot(True)
+        self._sync_timer.setInterval(sync_delay)
+        self._sync_timer.timeout.connect(self.flush)
+
+    def _log(self, message):
+        if self.debug:
+            QgsMessageLog.logMessage(message, 'GeoKKP-GIS', level=Qgis.Info)
+
+    def value(self, key, default=None, type=None):
+        """Value of key, converted with type when given, or default"""
+        key = str(key)
+        value = self._values.get(key, _MISSING)
+        if value is _MISSING and key in self._loaders:
+            value = self._loaders[key]()
+            self._values[key] = value
+        elif value is _MISSING:
+            self._log(f'Mengambil data {key} dari memory proyek QGIS')
+            value = self._settings.value(self._prefix + key, _MISSING)
+            self._values[key] = value
+        if value is _MISSING or value is None:
+            return default
+        if type is bool and isinstance(value, str):
+            return value.lower() in ('true', '1')
+        return type(value) if type is not None and not isinstance(value, type) else value
+
+    def set_value(self, key, value):
+        key = str(key)
+        self._log(f'Menyimpan data {key} pada memory proyek QGIS')
+        self._values[key] = value
+        self._settings.setValue(self._prefix + key, value)
+        self._sync_timer.start()
+
+    def register_loader(self, key, loader):
+        """
+        Produce the value of key with loader() on its first read instead of
+        reading it from QgsSettings, e.g. for values kept in config files
+        """
+        key = str(key)
+        self._loaders[key] = loader
+        self._values.pop(key, None)
+
+    def contains(self, key):
+        return self.value(key, _MISSING) is not _MISSING
+
+    def remove_all(self):
+        """Remove every GeoKKP entry, cached or stored"""
+        self._values.clear()
+        for key in self._settings.allKeys():
+            if key.startswith(self._prefix.rstrip('/')):
+                self._settings.remove(key)
+        self.flush()
+
+    def invalidate(self, key=None):
+        """Forget cached values so they are read again from QgsSettings"""
+        if key is None:
+            self._values.clear()
+        else:
+            self._values.pop(str(key), None)
+
+    def flush(self):
+        """Write pending changes to disk now"""
+        self._sync_timer.stop()
+        self._settings.sync()
+
+
+settings_cache = SettingsCache()
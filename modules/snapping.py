@@ -0,0 +1,98 @@
+from functools import partial
+
+from qgis.analysis import QgsGeometrySnapper
+from qgis.core import QgsFeatureRequest
+
+from .utils import SNAP_ALIGNING_NODE_NOT_INSERT, SNAP_ANCHOR_NODES
+
+"""
+Snapping Bidang ke Layer Acuan
+===========================================
+
+Pengganti algoritma qgis:snapgeometries untuk penyesuaian bidang: indeks
+spasial layer acuan dibangun sekali dan dipakai ulang, dan hanya geometri
+bidang terpilih yang diubah langsung pada layer tanpa layer sementara.
+"""
+
+DEFAULT_TOLERANCE = 1
+
+
+class SnappingEngine:
+    """
+    QgsGeometrySnapper of each reference layer, kept between adjustments
+
+    The snapper indexes the reference features when it is created; it is
+    rebuilt only after the reference layer changes or is removed. The
+    behavior values are those of the qgis:snapgeometries BEHAVIOR parameter
+    (SNAP_* in utils), except SNAP_ANCHOR_NODES which only the algorithm
+    implements.
+
+    Usage
+    -----
+    ::
+        changed = snapping_engine.snap_features(layer, layer.selectedFeatureIds(), ref_layer)
+    """
+
+    def __init__(self):
+        self._snappers = {}
+        self._watched = set()
+
+    def snapper(self, ref_layer):
+        """Snapper indexing ref_layer, built on first use"""
+        layer_id = ref_layer.id()
+        snapper = self._snappers.get(layer_id)
+        if snapper is None:
+            # the layer is kept along, older QGIS fetch the reference features from it while snapping
+            snapper = (QgsGeometrySnapper(ref_layer), ref_layer)
+            self._snappers[layer_id] = snapper
+            if layer_id not in self._watched:
+                self._watched.add(layer_id)
+                ref_layer.dataChanged.connect(partial(self.invalidate, layer_id))
+                ref_layer.willBeDeleted.connect(partial(self.forget, layer_id))
+        return snapper[0]
+
+    def snap_features(
+            self,
+            layer,
+            feature_ids,
+            ref_layer,
+            tolerance=DEFAULT_TOLERANCE,
+            behavior=SNAP_ALIGNING_NODE_NOT_INSERT):
+        """
+        Snap the vertices of the features feature_ids of layer to ref_layer,
+        writing the geometries that moved back to the layer in one call.
+        Returns the number of features changed.
+        """
+        if behavior == SNAP_ANCHOR_NODES:
+            raise ValueError('SNAP_ANCHOR_NODES is not supported by QgsGeometrySnapper')
+        snapper = self.snapper(ref_layer)
+
+        changes = {}
+        for feature in layer.getFeatures(QgsFeatureRequest().setFilterFids(list(feature_ids))):
+            geometry = feature.geometry()
+            snapped = snapper.snapGeometry(geometry, tolerance, behavior)
+            if not snapped.isNull() and snapped.asWkb() != geometry.asWkb():
+                changes[feature.id()] = snapped
+
+        if changes:
+            layer.dataProvider().changeGeometryValues(changes)
+            layer.updateExtents()
+            layer.triggerRepaint()
+            if layer.id() == ref_layer.id():
+                # provider edits do not emit dataChanged
+                self.invalidate(layer.id())
+        return len(changes)
+
+    def invalidate(self, layer_id=None):
+        """Rebuild the index of layer_id, or of every layer, on next use"""
+        if layer_id is None:
+            self._snappers.clear()
+        else:
+            self._snappers.pop(layer_id, None)
+
+    def forget(self, layer_id):
+        self._snappers.pop(layer_id, None)
+        self._watched.discard(layer_id)
+
+
+snapping_engine = SnappingEngine()
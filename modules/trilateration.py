@@ -1,7 +1,6 @@
-import os
 import math
 
-from qgis.PyQt import QtWidgets, uic, QtXml, QtGui, QtCore
+from qgis.PyQt import QtWidgets, QtXml, QtGui, QtCore
 from qgis.core import (
     QgsProject, QgsPrintLayout, QgsReadWriteContext, QgsExpressionContextUtils, 
     QgsPointXY, QgsFeature, QgsGeometry, QgsVectorLayer, Qgis, QgsCircle, 
@@ -15,10 +14,10 @@ from qgis.gui import QgsVertexMarker, QgsMessageBar, QgsRubberBand
 from .maptools import MapTool
 # using utils
 from .utils import icon
+from .ui_loader import load_ui
 
 
-FORM_CLASS, _ = uic.loadUiType(os.path.join(
-    os.path.dirname(__file__), '../ui/trilateration.ui'))
+FORM_CLASS, _ = load_ui('trilateration')
 
 
 class TrilaterationDialog(QtWidgets.QDialog, FORM_CLASS):
@@ -0,0 +1,111 @@
+"""
+Pemuat Form UI GeoKKP
+===========================================
+
+Berkas ui/*.ui dikompilasi sekali menjadi modul Python di ui_compiled/
+(``python -m modules.ui_loader`` atau ``make compile-ui``), sehingga saat
+QGIS dijalankan form cukup diimpor tanpa mengurai XML dan membangkitkan
+kode dengan uic.loadUiType. Bila modul hasil kompilasi tidak ada atau
+sudah tidak sesuai dengan berkas .ui-nya, form dimuat seperti biasa.
+"""
+
+import hashlib
+import importlib
+import os
+import re
+import xml.etree.ElementTree as ET
+
+PLUGIN_DIR = os.path.normpath(os.path.join(os.path.dirname(__file__), '..'))
+UI_DIR = os.path.join(PLUGIN_DIR, 'ui')
+COMPILED_DIR = os.path.join(PLUGIN_DIR, 'ui_compiled')
+
+# geokkp.ui_compiled inside QGIS, ui_compiled when the plugin directory is on sys.path
+_root_package = (__package__ or '').rpartition('.')[0]
+COMPILED_PACKAGE = f'{_root_package}.ui_compiled' if _root_package else 'ui_compiled'
+
+# pyuic imports a custom widget from the module named after its C++ header
+_CUSTOM_WIDGET_IMPORT = re.compile(r'^from (?:qgs\w+|qgis\._gui) import (.+)$', re.MULTILINE)
+_FORM_CLASS = re.compile(r'^class (Ui_\w+)\(object\):', re.MULTILINE)
+
+
+def ui_path(name):
+    return os.path.join(UI_DIR, f'{name}.ui')
+
+
+def ui_digest(path):
+    """sha1 of a .ui file, stored in its compiled module to detect stale forms"""
+    with open(path, 'rb') as source:
+        return hashlib.sha1(source.read()).hexdigest()
+
+
+def compiled_form(name):
+    """(form class, base class) from ui_compiled/<name>.py, None if missing or stale"""
+    try:
+        module = importlib.import_module(f'{COMPILED_PACKAGE}.{name}')
+    except ImportError:
+        return None
+    if getattr(module, 'UI_SHA1', None) != ui_digest(ui_path(name)):
+        return None
+    return module.FORM_CLASS, module.BASE_CLASS
+
+
+def load_ui(name):
+    """
+    (form class, base class) of ui/<name>.ui, as returned by uic.loadUiType
+
+    Usage
+    -----
+    ::
+        FORM_CLASS, _ = load_ui('goto')
+    """
+    form = compiled_form(name)
+    if form is None:
+        from qgis.PyQt import uic
+        form = uic.loadUiType(ui_path(name))
+    return form
+
+
+def compile_ui(path, out_dir=COMPILED_DIR):
+    """Compile one .ui file to out_dir/<name>.py with pyuic, return the module path"""
+    import io
+    from PyQt5 import uic
+
+    name = os.path.splitext(os.path.basename(path))[0]
+    code = io.StringIO()
+    with open(path, encoding='utf-8') as source:
+        uic.compileUi(source, code)
+    code = code.getvalue().replace('from PyQt5 import', 'from qgis.PyQt import')
+    code = _CUSTOM_WIDGET_IMPORT.sub(r'from qgis.gui import \1', code)
+
+    base_class = ET.parse(path).getroot().find('widget').get('class')
+    if base_class.startswith('Qgs'):
+        code += f'from qgis.gui import {base_class}\n'
+    else:
+        base_class = f'QtWidgets.{base_class}'
+    code += (
+        f"\nUI_SHA1 = '{ui_digest(path)}'\n"
+        f'FORM_CLASS = {_FORM_CLASS.search(code).group(1)}\n'
+        f'BASE_CLASS = {base_class}\n'
+    )
+
+    target = os.path.join(out_dir, f'{name}.py')
+    with open(target, 'w', encoding='utf-8') as module:
+        module.write(code)
+    return target
+
+
+def compile_all(ui_dir=UI_DIR, out_dir=COMPILED_DIR):
+    """Compile every .ui file of ui_dir into the ui_compiled package"""
+    os.makedirs(out_dir, exist_ok=True)
+    with open(os.path.join(out_dir, '__init__.py'), 'w', encoding='utf-8') as package:
+        package.write('# generated by modules/ui_loader.py, do not edit\n')
+    return [
+        compile_ui(os.path.join(ui_dir, filename), out_dir)
+        for filename in sorted(os.listdir(ui_dir))
+        if filename.endswith('.ui')
+    ]
+
+
+if __name__ == '__main__':
+    for target in compile_all():
+        print(f'{target} ditulis')
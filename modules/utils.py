@@ -3,9 +3,6 @@ import os
 import math
 import urllib.parse
 
-from multiprocessing.dummy import Pool as ThreadPool
-from functools import partial
-
 from qgis.PyQt.QtCore import QVariant, QUrl # noqa
 from qgis.PyQt.QtGui import QIcon
 from qgis.PyQt.QtWidgets import QPushButton, QMessageBox
@@ -19,9 +16,11 @@ from qgis.core import (
                     QgsRasterLayer,
                     QgsVectorLayer,
                     QgsField,
+                    QgsFields,
                     QgsPointXY,
                     QgsRectangle,
                     QgsGeometry,
+                    QgsWkbTypes,
                     QgsFeature,
                     QgsApplication,
                     QgsAuthMethodConfig,
@@ -31,6 +30,39 @@ from qgis.gui import QgsMapToolIdentifyFeature
 from collections import namedtuple
 from qgis import processing
 
+from .sdo import (  # noqa: F401
+    GPOINT,
+    GLINESTRING,
+    GPOLYGON,
+    SDO_GTYPE_MAP,
+    parse_sdo_geometry_type,
+    sdo_to_wkb,
+    iter_decoded_sdo,
+    SdoStreamDecoder
+)
+from .settings_cache import settings_cache
+from .nlp import (  # noqa: F401
+    x_origin,
+    y_origin,
+    grid_10rb,
+    grid_2500,
+    grid_1000,
+    grid_500,
+    grid_250,
+    bk_10000,
+    bk_2500,
+    bk_1000,
+    bk_500,
+    bk_250,
+    get_nlp,
+    get_nlp_array,
+    nlp_to_rect,
+    is_valid_nlp,
+    sheet_size,
+    iter_sheet_grid,
+    rectangles_wkb
+)
+
 """
 Kumpulan Utilities untuk GeoKKP-QGIS
 ===========================================
@@ -50,15 +82,6 @@ DefaultMessageBarButton = QPushButton()
 DefaultMessageBarButton.setText("Show Me")
 DefaultMessageBarButton.pressed.connect(iface.openMessageLog)
 
-# constants for NLP
-x_origin = 32000
-y_origin = 282000
-grid_10rb = 6000
-grid_2500 = 1500
-grid_1000 = 500
-grid_500 = 250
-grid_250 = 125
-
 # constants for TM-3 Zone
 zona_TM3 = {
     "46.2": "EPSG:23830",
@@ -79,25 +102,17 @@ zona_TM3 = {
     "54.1": "EPSG:23845"
 }
 
-# constants for SDO Geometries
-GPOINT = 'Point'
-GLINESTRING = 'LineString'
-GPOLYGON = 'Polygon'
-SDO_GTYPE_MAP = {
-    '00': 'Unknown',
-    '01': GPOINT,
-    '02': GLINESTRING,
-    '03': GPOLYGON,
-    '04': 'Collection',
-    '05': 'MultiPoint',
-    '06': 'MultiLine',
-    '07': 'MultiPolygon',
-    '08': 'Solid',
-    '09': 'MultiSolid',
-}
-
 SDO_FIELD_EXCLUDE = ['text', 'boundary', 'rotation', 'height']
 
+# memory layer type for each SDO geometry type
+SDO_LAYER_TYPE = {
+    GLINESTRING: 'MultiLineString',
+    GPOLYGON: 'MultiPolygon',
+    'MultiLine': 'MultiLineString',
+    'MultiPolygon': 'MultiPolygon',
+    'Collection': 'GeometryCollection',
+}
+
 
 # constants for processing snap parameter (auto-adjust)
 SNAP_ALIGNING_NODE_INSERT_WHEN_REQUIRED = 0
@@ -205,32 +220,24 @@ def storeSetting(key, value):
     """
     Store value to QGIS Settings
     """
-    settings.setValue("geokkp/"+str(key), value)
-    logMessage('Menyimpan data '+str(key)+' pada memory proyek QGIS')
-    settings.sync()
+    settings_cache.set_value(key, value)
 
 
 def readSetting(key, default=None):
     """
     Read value from QGIS Settings
     """
-    logMessage('Mengambil data '+str(key)+' dari memory proyek QGIS')
     try:
-        return settings.value("geokkp/"+str(key), default)
+        return settings_cache.value(key, default)
     except Exception:
         logMessage("gagal memuat data")
-    settings.sync()
 
 
 def clear_all_vars():
     """ Hapus semua value dari QgsSettings yang digunakan oleh GeoKKP"""
-    for key in sorted(settings.allKeys()):
-        if key.startswith("geokkp"):
-            settings.remove(key)
-            # s.setValue(x, "")
+    settings_cache.remove_all()
     if not settings.contains("geokkp"):
         logMessage("Flushed all GeoKKP vars")
-    settings.sync()
 
 
 def is_layer_exist(project, layername):
@@ -374,74 +381,116 @@ def parse_raw_coordinate(coordList):
         yield point
 
 
-def parse_sdo_geometry_type(sdo_gtype):
-    sdo_gtype_str = str(sdo_gtype).rjust(4, '0')
-    gtype = sdo_gtype_str[2:4]
-    dim = max(2, int(sdo_gtype_str[0]))
-    return SDO_GTYPE_MAP[gtype], dim
-
-
 def parse_sdo_fields(sdo):
     fields = [field for field in sdo.keys() if field not in SDO_FIELD_EXCLUDE]
     return [QgsField(field, QVariant.String) for field in fields], fields
 
 
-def parse_sdo_geometry(elem_info, ordinates):
-    start_index = elem_info[0] - 1
-    gtype, dim = parse_sdo_geometry_type(elem_info[1])
+def parse_sdo_geometry(elem_info, ordinates, sdo_gtype=None):
+    return wkb_to_geometry(sdo_to_wkb(elem_info, ordinates, sdo_gtype))
 
-    result = []
-    start = start_index
-    while True:
-        end = start + min(2, dim)
-        result.append(QgsPointXY(*ordinates[start:end]))
-        start += dim
-        if start >= len(ordinates):
-            break
 
-    if gtype == GPOINT:
-        return QgsGeometry.fromPointXY(result[0])
-    elif gtype == GLINESTRING:
-        return QgsGeometry.fromPolyline(result)
-    elif gtype == GPOLYGON:
-        return QgsGeometry.fromPolygonXY([result])
+def wkb_to_geometry(wkb, multi=False):
+    if wkb is None:
+        return None
+    geometry = QgsGeometry()
+    geometry.fromWkb(wkb)
+    if multi:
+        # fit curved and single part geometries into a linear multi layer
+        if QgsWkbTypes.isCurvedType(geometry.wkbType()):
+            geometry = QgsGeometry(geometry.constGet().segmentize())
+        geometry.convertToMultiType()
+    return geometry
 
 
-def sdo_to_feature(sdo, fields):
-    attrs = [sdo[f] for f in fields]
-    geometry = parse_sdo_geometry(sdo['boundary']['sdoElemInfo'], sdo['boundary']['sdoOrdinates'])
-
+def wkb_to_feature(attrs, wkb, multi=False):
     feature = QgsFeature()
-    feature.setGeometry(geometry)
+    feature.setGeometry(wkb_to_geometry(wkb, multi))
     feature.setAttributes(attrs)
-
     return feature
 
 
-def sdo_to_layer(sdo, name, crs=None):
-    if not isinstance(sdo, list):
-        sdo = [sdo]
+def sdo_to_feature(sdo, fields, multi=False):
+    attrs = [sdo[f] for f in fields]
+    boundary = sdo['boundary']
+    wkb = sdo_to_wkb(boundary['sdoElemInfo'], boundary['sdoOrdinates'], boundary.get('sdoGtype'))
+    return wkb_to_feature(attrs, wkb, multi)
+
 
-    gtype, dim = parse_sdo_geometry_type(sdo[0]['boundary']['sdoGtype'])
-    uri = gtype if not crs else f'{gtype}?crs={crs}'
+def _create_sdo_layer(sdo, name, crs=None):
+    """Empty memory layer matching the geometry type and fields of an SDO record"""
+    gtype, dim = parse_sdo_geometry_type(sdo['boundary']['sdoGtype'])
+    # multi layer type so parcels with several parts fit next to single ones
+    layer_type = SDO_LAYER_TYPE.get(gtype, gtype)
+    uri = layer_type if not crs else f'{layer_type}?crs={crs}'
     layer = QgsVectorLayer(uri, name, 'memory')
-    fields, raw_fields = parse_sdo_fields(sdo[0])
+    fields, raw_fields = parse_sdo_fields(sdo)
 
-    provider = layer.dataProvider()
-    provider.addAttributes(fields)
+    layer.dataProvider().addAttributes(fields)
     layer.updateFields()
+    return layer, raw_fields, layer_type.startswith('Multi')
 
-    pool = ThreadPool()
-    func = partial(sdo_to_feature, fields=raw_fields)
-    features = pool.map(func, sdo)
-    pool.close()
-    pool.join()
-    provider.addFeatures(features)
-    layer.commitChanges()
+
+def sdo_to_layer(sdo, name, crs=None):
+    """
+    Build a memory layer from SDO records. Geometries are decoded to WKB in
+    a process pool for large responses and added to the provider one chunk
+    at a time, so only a chunk of QgsFeature objects is alive at once.
+    """
+    if not isinstance(sdo, list):
+        sdo = [sdo]
+
+    layer, raw_fields, multi = _create_sdo_layer(sdo[0], name, crs)
+    provider = layer.dataProvider()
+    for chunk in iter_decoded_sdo(sdo, raw_fields):
+        provider.addFeatures([wkb_to_feature(attrs, wkb, multi) for attrs, wkb in chunk])
+    layer.updateExtents()
 
     return layer
 
 
+class SdoLayerBuilder:
+    """
+    Build a memory layer from SDO records while they are still arriving,
+    e.g. from JsonArrayStream. The layer is created from the first record,
+    features are added chunk by chunk as soon as they are decoded.
+
+    Usage
+    -----
+    ::
+        builder = SdoLayerBuilder('Batas Desa', 'EPSG:23830')
+        for sdo in stream.feed(data):
+            builder.add(sdo)
+        layer = builder.finish()
+    """
+
+    def __init__(self, name, crs=None):
+        self.name = name
+        self.crs = crs
+        self.layer = None
+        self._decoder = None
+        self._multi = False
+
+    def add(self, sdo):
+        if self.layer is None:
+            self.layer, raw_fields, self._multi = _create_sdo_layer(sdo, self.name, self.crs)
+            self._decoder = SdoStreamDecoder(raw_fields)
+        self._insert(self._decoder.push(sdo))
+
+    def finish(self):
+        """Flush the remaining records, return the layer or None if no record was added"""
+        if self.layer is None:
+            return None
+        self._insert(self._decoder.finish())
+        self.layer.updateExtents()
+        return self.layer
+
+    def _insert(self, chunks):
+        provider = self.layer.dataProvider()
+        for chunk in chunks:
+            provider.addFeatures([wkb_to_feature(attrs, wkb, self._multi) for attrs, wkb in chunk])
+
+
 def get_epsg_from_tm3_zone(zone, include_epsg_key=True):
     splitted_zone = zone.split('.')
     major = int(splitted_zone[0])
@@ -597,107 +646,50 @@ def get_layer_by_id(layer_id):
 
 
 def draw_rect_bound(xMin, yMin, xMax, yMax, epsg, nama="Blok NLP"):
+    """
+    Gambar kotak batas ke layer nama. Layer dengan nama dan CRS yang sama
+    dipakai ulang, sehingga setiap klik tidak membuat layer baru
+    """
     epsg = str(epsg)
-    is_layer_exist
-    layer = QgsVectorLayer(f"Polygon?crs={epsg}", nama, "memory")
-    QgsProject.instance().addMapLayer(layer)
-
-    rect = QgsRectangle(xMin, yMin, xMax, yMax)
-    print(rect)
-    polygon = QgsGeometry.fromRect(rect)
-    print(polygon)
+    layer = None
+    for candidate in QgsProject.instance().mapLayersByName(nama):
+        if candidate.providerType() == "memory" and candidate.crs().authid() == epsg:
+            layer = candidate
+            break
+    if layer is None:
+        layer = QgsVectorLayer(f"Polygon?crs={epsg}&index=yes", nama, "memory")
+        QgsProject.instance().addMapLayer(layer)
 
     feature = QgsFeature()
-    feature.setGeometry(polygon)
+    feature.setGeometry(QgsGeometry.fromRect(QgsRectangle(xMin, yMin, xMax, yMax)))
 
     layer.dataProvider().addFeatures([feature])
     layer.updateExtents()
+    layer.triggerRepaint()
 
 
-def bk_10000(x, y):
-    k_10rb = int((x - x_origin)/grid_10rb)+1
-    b_10rb = int((y - y_origin)/grid_10rb)+1
-    return [k_10rb, b_10rb]
-
-
-def bk_2500(x, y):
-    k_10rb, b_10rb = bk_10000(x, y)
-    k_2500 = int((x-(x_origin+(k_10rb - 1)*grid_10rb))/grid_2500)+1
-    b_2500 = int((y-(y_origin+(b_10rb - 1)*grid_10rb))/grid_2500)+1
-    return [k_2500, b_2500]
-
-
-def bk_1000(x, y):
-    k_10rb, b_10rb = bk_10000(x, y)
-    k_2500, b_2500 = bk_2500(x, y)
-    k_1000 = int((x-(x_origin+(k_10rb - 1)*grid_10rb + (k_2500-1)*grid_2500))/grid_1000)+1
-    b_1000 = int((y-(y_origin+(b_10rb - 1)*grid_10rb + (b_2500-1)*grid_2500))/grid_1000)+1
-    return [k_1000, b_1000]
-
-
-def bk_500(x, y):
-    k_10rb, b_10rb = bk_10000(x, y)
-    k_2500, b_2500 = bk_2500(x, y)
-    k_1000, b_1000 = bk_1000(x, y)
-    k_500 = int((x-(x_origin+(k_10rb - 1)*grid_10rb + ((k_2500-1)*grid_2500) + (k_1000-1)*grid_1000))/grid_500)+1
-    b_500 = int((y-(y_origin+(b_10rb - 1)*grid_10rb + ((b_2500-1)*grid_2500) + (b_1000-1)*grid_1000))/grid_500)+1
-    return [k_500, b_500]
-
-
-def bk_250(x, y):
-    k_10rb, b_10rb = bk_10000(x, y)
-    k_2500, b_2500 = bk_2500(x, y)
-    k_1000, b_1000 = bk_1000(x, y)
-    k_500, b_500 = bk_500(x, y)
-    k_250 = int((x-(x_origin+(k_10rb - 1)*grid_10rb
-            + ((k_2500-1)*grid_2500) # noqa
-            + ((k_1000-1)*grid_1000)
-            + (k_500-1)*grid_500))/grid_250)+1
-    b_250 = int((y-(y_origin+(b_10rb - 1)*grid_10rb
-            + ((b_2500-1)*grid_2500) # noqa
-            + ((b_1000-1)*grid_1000)
-            + (b_500-1)*grid_500))/grid_250)+1
-    return [k_250, b_250]
-
-
-def get_nlp(skala, x, y):
-    """
-    Cetak Nomor Lembar Peta berdasarkan skala
-
-    argumen:
-        skala   : skala peta dalam string
-        x       : koordinat x dalam CRS TM-3
-        y       : koordinat y dalam CRS TM-3
-    output: string NLP
-    """
-    # hitungan baris dan kolom
-    k_10rb, b_10rb = bk_10000(x, y)
-    k_2500, b_2500 = bk_2500(x, y)
-    k_1000, b_1000 = bk_1000(x, y)
-    k_500, b_500 = bk_500(x, y)
-    k_250, b_250 = bk_250(x, y)    
-
-    # Skala 2500
-    nlp_2500 = 4*(b_2500-1)+k_2500
-
-    # Skala 1000
-    nlp_1000 = 3*(b_1000-1)+k_1000
-
-    # Skala 500
-    nlp_500 = 2*(b_500-1)+k_500
-
-    # Skala 250
-    nlp_250 = 2*(b_250-1)+k_250
-
-    if (skala == "10000"):
-        return f'{k_10rb:02d}.{b_10rb:03d}'
-    elif (skala == "2500"):
-        return f'{k_10rb:02d}.{b_10rb:03d}-{nlp_2500:02d}'
-    elif (skala == "1000"):
-        return f'{k_10rb:02d}.{b_10rb:03d}-{nlp_2500:02d}-{nlp_1000}'
-    elif (skala == "500"):
-        return f'{k_10rb:02d}.{b_10rb:03d}-{nlp_2500:02d}-{nlp_1000}-{nlp_500}'
-    elif (skala == "250"):
-        return f'{k_10rb:02d}.{b_10rb:03d}-{nlp_2500:02d}-{nlp_1000}-{nlp_500}-{nlp_250}'
-    else:
-        return "Kesalahan Penentuan skala"
+def iter_nlp_sheet_features(xmin, ymin, xmax, ymax, skala, fields):
+    """
+    Features of every NLP sheet of a scale overlapping an extent in TM-3,
+    yielded in lists of up to a few thousand. fields must start with the
+    NLP and scale fields, see nlp_sheet_fields().
+    """
+    size = sheet_size(skala)
+    label = f"1:{skala}"
+    for corner_x, corner_y, nlp in iter_sheet_grid(xmin, ymin, xmax, ymax, skala):
+        features = []
+        for wkb, number in zip(rectangles_wkb(corner_x, corner_y, size), nlp.tolist()):
+            feature = QgsFeature(fields)
+            geometry = QgsGeometry()
+            geometry.fromWkb(wkb)
+            feature.setGeometry(geometry)
+            feature.setAttributes([number, label])
+            features.append(feature)
+        yield features
+
+
+def nlp_sheet_fields():
+    fields = QgsFields()
+    fields.append(QgsField("NLP", QVariant.String, len=32))
+    fields.append(QgsField("SKALA", QVariant.String, len=8))
+    return fields
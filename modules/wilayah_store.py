@@ -0,0 +1,139 @@
+"""
+Snapshot Hierarki Wilayah
+===========================================
+
+Salinan lokal (SQLite) dari seluruh provinsi, kabupaten, kecamatan dan desa
+yang dapat dipilih pada satu kantor, sehingga combo wilayah di panel kerja
+diisi dari memori tanpa menunggu server. Modul ini tidak bergantung pada qgis.
+"""
+
+import json
+import os
+import sqlite3
+import time
+
+# level: (response key, id field, name field) as returned by getPropinsi, getKabupaten, ...
+LEVELS = {
+    'provinsi': ('PROPINSI', 'PROPINSIID', 'PROPNAMA'),
+    'kabupaten': ('KABUPATEN', 'KABUPATENID', 'KABUNAMA'),
+    'kecamatan': ('KECAMATAN', 'KECAMATANID', 'KECANAMA'),
+    'desa': ('DESA', 'DESAID', 'DESANAMA'),
+}
+LEVEL_ORDER = ('provinsi', 'kabupaten', 'kecamatan', 'desa')
+
+
+class WilayahStore:
+    """
+    Wilayah hierarchy of each kantor, on disk and in memory
+
+    A snapshot is written whole, in one transaction, replacing the previous
+    one of the kantor. The first read of a kantor loads its rows once into
+    a dict of children lists keyed by (level, parent id), every later read
+    is a dict lookup. Records are kept as the API returned them.
+
+    Usage
+    -----
+    ::
+        store.replace(kantor_id, [('provinsi', None, provinsi), ('kabupaten', provinsi_id, kabupaten), ...])
+        for kabupaten in store.children(kantor_id, 'kabupaten', provinsi_id):
+            ...
+    """
+
+    def __init__(self, path):
+        self._path = path
+        self._db = None
+        self._children = {}
+        self._fetched_at = {}
+
+    def _connection(self):
+        if self._db is None:
+            if os.path.dirname(self._path):
+                os.makedirs(os.path.dirname(self._path), exist_ok=True)
+            self._db = sqlite3.connect(self._path)
+            self._db.executescript(
+                'CREATE TABLE IF NOT EXISTS wilayah ('
+                'kantor_id TEXT, level TEXT, id TEXT, parent_id TEXT, position INTEGER, record TEXT, '
+                'PRIMARY KEY (kantor_id, level, id));'
+                'CREATE INDEX IF NOT EXISTS wilayah_parent ON wilayah (kantor_id, level, parent_id, position);'
+                'CREATE TABLE IF NOT EXISTS snapshot (kantor_id TEXT PRIMARY KEY, fetched_at REAL);'
+            )
+        return self._db
+
+    @staticmethod
+    def record_id(level, record):
+        return str(record[LEVELS[level][1]])
+
+    @staticmethod
+    def record_name(level, record):
+        return record[LEVELS[level][2]]
+
+    def replace(self, kantor_id, rows, fetched_at=None):
+        """Store the snapshot of kantor_id, rows of (level, parent id, record) in display order"""
+        kantor_id = str(kantor_id)
+        fetched_at = time.time() if fetched_at is None else fetched_at
+        children = {}
+        values = []
+        for level, parent_id, record in rows:
+            parent_id = None if parent_id is None else str(parent_id)
+            siblings = children.setdefault((level, parent_id), [])
+            values.append((
+                kantor_id, level, self.record_id(level, record), parent_id, len(siblings), json.dumps(record)
+            ))
+            siblings.append(record)
+
+        db = self._connection()
+        with db:
+            db.execute('DELETE FROM wilayah WHERE kantor_id = ?', (kantor_id,))
+            db.executemany('INSERT OR REPLACE INTO wilayah VALUES (?, ?, ?, ?, ?, ?)', values)
+            db.execute('INSERT OR REPLACE INTO snapshot VALUES (?, ?)', (kantor_id, fetched_at))
+        self._children[kantor_id] = children
+        self._fetched_at[kantor_id] = fetched_at
+
+    def _load(self, kantor_id):
+        if kantor_id in self._children:
+            return self._children[kantor_id]
+        db = self._connection()
+        row = db.execute('SELECT fetched_at FROM snapshot WHERE kantor_id = ?', (kantor_id,)).fetchone()
+        children = {}
+        if row is not None:
+            rows = db.execute(
+                'SELECT level, parent_id, record FROM wilayah WHERE kantor_id = ? '
+                'ORDER BY level, parent_id, position', (kantor_id,)
+            )
+            for level, parent_id, record in rows:
+                children.setdefault((level, parent_id), []).append(json.loads(record))
+        self._children[kantor_id] = children
+        self._fetched_at[kantor_id] = row[0] if row is not None else None
+        return children
+
+    def fetched_at(self, kantor_id):
+        """Time the snapshot of kantor_id was taken, None without one"""
+        kantor_id = str(kantor_id)
+        self._load(kantor_id)
+        return self._fetched_at[kantor_id]
+
+    def children(self, kantor_id, level, parent_id=None):
+        """Records of level under parent_id (None for provinsi) in the kantor snapshot"""
+        parent_id = None if parent_id is None else str(parent_id)
+        return self._load(str(kantor_id)).get((level, parent_id), [])
+
+    def purge(self, kantor_id=None):
+        """Remove the snapshot of kantor_id, or every snapshot"""
+        db = self._connection()
+        with db:
+            if kantor_id is None:
+                db.execute('DELETE FROM wilayah')
+                db.execute('DELETE FROM snapshot')
+                self._children.clear()
+                self._fetched_at.clear()
+            else:
+                kantor_id = str(kantor_id)
+                db.execute('DELETE FROM wilayah WHERE kantor_id = ?', (kantor_id,))
+                db.execute('DELETE FROM snapshot WHERE kantor_id = ?', (kantor_id,))
+                self._children.pop(kantor_id, None)
+                self._fetched_at.pop(kantor_id, None)
+
+    def close(self):
+        if self._db is not None:
+            self._db.close()
+            self._db = None
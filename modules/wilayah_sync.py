@@ -0,0 +1,140 @@
+import os
+import json
+import time
+from functools import partial
+
+from qgis.PyQt.QtCore import QObject, pyqtSignal
+from qgis.core import QgsApplication
+
+from .api import endpoints
+from .api.cache import DAY
+from .wilayah_store import LEVELS, WilayahStore
+
+"""
+Sinkronisasi Hierarki Wilayah
+===========================================
+
+Mengunduh seluruh hierarki wilayah sebuah kantor di latar belakang ke
+snapshot lokal. Server tidak menyediakan endpoint massal, sehingga
+permintaan satu tingkat dikirim serentak begitu induknya diterima.
+"""
+
+WILAYAH_STORE_FILE = os.path.join(QgsApplication.qgisSettingsDirPath(), 'geokkp', 'wilayah.sqlite')
+SNAPSHOT_TTL = DAY
+
+# level: (endpoint listing it for a kantor, level below it)
+FETCH = {
+    'provinsi': (endpoints.get_provinsi_by_kantor, 'kabupaten'),
+    'kabupaten': (endpoints.get_kabupaten_by_kantor, 'kecamatan'),
+    'kecamatan': (endpoints.get_kecamatan_by_kantor, 'desa'),
+    'desa': (endpoints.get_desa_by_kantor, None),
+}
+
+
+class WilayahSync(QObject):
+    """
+    Background download of the wilayah hierarchy of a kantor into a WilayahStore
+
+    The provinsi of the kantor are listed first, then the kabupaten of every
+    provinsi at once, and so on down to desa. The snapshot is stored only
+    when every call has succeeded, a failure keeps the previous one.
+
+    Usage
+    -----
+    ::
+        wilayah_sync.finished.connect(self.wilayah_synced)
+        wilayah_sync.refresh(kantor_id, tipe_kantor_id)
+    """
+
+    finished = pyqtSignal(str)
+    failed = pyqtSignal(str, object)
+
+    def __init__(self, store, ttl=SNAPSHOT_TTL, parent=None):
+        super(WilayahSync, self).__init__(parent)
+        self._store = store
+        self._ttl = ttl
+        self._jobs = {}
+
+    def is_stale(self, kantor_id):
+        fetched_at = self._store.fetched_at(kantor_id)
+        return fetched_at is None or time.time() - fetched_at > self._ttl
+
+    def is_running(self, kantor_id):
+        return str(kantor_id) in self._jobs
+
+    def refresh(self, kantor_id, tipe_kantor_id, force=False):
+        """Download the snapshot of kantor_id when it is missing or stale, True while a download runs"""
+        key = str(kantor_id)
+        if key in self._jobs:
+            return True
+        if not force and not self.is_stale(key):
+            return False
+        job = {'kantor_id': kantor_id, 'tipe_kantor_id': str(tipe_kantor_id), 'rows': [], 'futures': [], 'pending': 0}
+        self._jobs[key] = job
+        self._fetch(key, job, 'provinsi', None)
+        return True
+
+    def _fetch(self, key, job, level, parent_id):
+        endpoint, _ = FETCH[level]
+        args = (job['kantor_id'], job['tipe_kantor_id']) + (() if parent_id is None else (parent_id,))
+        # counted before the callbacks, a cached response calls them right away
+        job['pending'] += 1
+        # the snapshot replaces response_cache for these endpoints, its refresh must reach the server
+        if parent_id is None:
+            # while the kantor combo is scrolled only the last kantor is downloaded
+            future = endpoint.run_latest(*args, channel='wilayah_sync', revalidate=True)
+        else:
+            future = endpoint.run_async(*args, revalidate=True)
+        job['futures'].append(future)
+        future.on_finished(partial(self._loaded, key, job, level, parent_id))
+        future.on_error(partial(self._failed, key, job))
+        future.on_cancelled(partial(self._cancelled, key, job))
+
+    def _loaded(self, key, job, level, parent_id, response):
+        if self._jobs.get(key) is not job:
+            return
+        try:
+            response_json = json.loads(response.content)
+            records = (response_json.get(LEVELS[level][0]) if response_json else None) or []
+        except (ValueError, AttributeError) as e:
+            self._failed(key, job, e)
+            return
+
+        _, child_level = FETCH[level]
+        for record in records:
+            job['rows'].append((level, parent_id, record))
+            if child_level is not None:
+                self._fetch(key, job, child_level, record[LEVELS[level][1]])
+            if self._jobs.get(key) is not job:
+                return
+
+        job['pending'] -= 1
+        if job['pending'] == 0:
+            del self._jobs[key]
+            self._store.replace(key, job['rows'])
+            self.finished.emit(key)
+
+    def _failed(self, key, job, exception):
+        if self._jobs.get(key) is not job:
+            return
+        del self._jobs[key]
+        for future in job['futures']:
+            future.cancel()
+        self.failed.emit(key, exception)
+
+    def _cancelled(self, key, job):
+        # superseded by the download of another kantor
+        if self._jobs.get(key) is job:
+            self.cancel(key)
+
+    def cancel(self, kantor_id=None):
+        """Stop the download of kantor_id, or every download"""
+        keys = list(self._jobs) if kantor_id is None else [str(kantor_id)]
+        for key in keys:
+            job = self._jobs.pop(key, None)
+            for future in job['futures'] if job else ():
+                future.cancel()
+
+
+wilayah_store = WilayahStore(WILAYAH_STORE_FILE)
+wilayah_sync = WilayahSync(wilayah_store)
@@ -1,46 +1,57 @@
-import os
-import json
+from functools import partial
 
-from qgis.PyQt import QtWidgets, uic
+from qgis.PyQt import QtWidgets
 from qgis.core import QgsProject
 from qgis.PyQt.QtGui import QDesktopServices
 
-from qgis.PyQt.QtCore import pyqtSignal, QUrl
+from qgis.PyQt.QtCore import Qt, pyqtSignal, QUrl
 from qgis.utils import iface
 
-from .login import LoginDialog
-
 # using utils
 from .utils import (
     icon,
+    logMessage,
     readSetting,
     storeSetting,
     get_epsg_from_tm3_zone,
     set_project_crs_by_epsg,
-    sdo_to_layer
+    SdoLayerBuilder
 )
+from .jsonstream import JsonArrayStream
+from .layer_cache import layer_cache
 from .api import endpoints
+from .wilayah_store import LEVEL_ORDER, WilayahStore
+from .wilayah_sync import wilayah_store, wilayah_sync
+from .ui_loader import load_ui
 
-FORM_CLASS, _ = uic.loadUiType(os.path.join(
-    os.path.dirname(__file__), '../ui/panel_kerjav2.ui'))
+FORM_CLASS, _ = load_ui('panel_kerjav2')
 
 
 STACKWIDGET_RUTIN = 1
 
+# setting holding the wilayah selected at each level
+SELECTED_SETTING = {
+    "provinsi": "provinsiterpilih",
+    "kabupaten": "kabupatenterpilih",
+    "kecamatan": "kecamatanterpilih",
+    "desa": "kelurahanterpilih",
+}
+
 
 class Workpanel(QtWidgets.QDockWidget, FORM_CLASS):
     """ Dialog for Peta Bidang """
 
     closingPlugin = pyqtSignal()
 
-    def __init__(self, parent=iface.mainWindow()):
+    def __init__(self, dialogs, parent=iface.mainWindow()):
         super(Workpanel, self).__init__(parent)
         self.setupUi(self)
         self.setWindowIcon(icon("icon.png"))
         self.stackedWidget.setCurrentIndex(0)
         self.project = QgsProject
 
-        self.loginaction = LoginDialog()
+        # the login dialog, and the post login dock behind it, are created on the first click
+        self.dialogs = dialogs
 
         self.current_kantor_id = None
         self.current_tipe_kantor_id = None
@@ -49,6 +60,20 @@ class Workpanel(QtWidgets.QDockWidget, FORM_CLASS):
         self.current_kecamatan_id = None
         self.current_kelurahan_id = None
 
+        self.combos = {
+            "provinsi": self.combo_provinsi,
+            "kabupaten": self.combo_kabupaten,
+            "kecamatan": self.combo_kecamatan,
+            "desa": self.combo_kelurahan,
+        }
+        # wilayah records listed in each combo
+        self._wilayah = {level: [] for level in LEVEL_ORDER}
+        for combo in (self.combo_kantor, *self.combos.values()):
+            self.setup_type_ahead(combo)
+
+        wilayah_sync.finished.connect(self.wilayah_synced)
+        wilayah_sync.failed.connect(self.wilayah_sync_failed)
+
         self.mulaiGeokkp.clicked.connect(self.login_geokkp)
         self.bantuanGeokkp.clicked.connect(self.openhelp)
         self.btn_simpan_area_kerja.clicked.connect(self.simpan_area_kerja)
@@ -60,15 +85,23 @@ class Workpanel(QtWidgets.QDockWidget, FORM_CLASS):
         self.combo_kecamatan.currentIndexChanged.connect(self.kecamatan_changed)
         self.combo_kelurahan.currentIndexChanged.connect(self.kelurahan_changed)
 
+    @staticmethod
+    def setup_type_ahead(combo):
+        """Let the user type part of a name to filter the entries of combo"""
+        combo.setEditable(True)
+        combo.setInsertPolicy(QtWidgets.QComboBox.NoInsert)
+        completer = combo.completer()
+        completer.setCompletionMode(QtWidgets.QCompleter.PopupCompletion)
+        completer.setCaseSensitivity(Qt.CaseInsensitive)
+        completer.setFilterMode(Qt.MatchContains)
+
     def closeEvent(self, event):
         self.closingPlugin.emit()
         self.stackedWidget.setCurrentIndex(0)
         event.accept()
 
     def login_geokkp(self):
-        if self.loginaction is None:
-            self.loginaction = LoginDialog()
-        self.loginaction.show()
+        self.dialogs.get('login').show()
 
     def show_workpanel(self):
         workspace = readSetting("workspace_terpilih", "rutin")
@@ -91,39 +124,41 @@ class Workpanel(QtWidgets.QDockWidget, FORM_CLASS):
         self.populate_kantor()
 
     def kantor_changed(self, index):
+        if index < 0:
+            return
         data_kantor = readSetting("listkantor", [])
         kantor = data_kantor[index]
         self.current_kantor_id = kantor["kantorID"]
         self.current_tipe_kantor_id = kantor["tipeKantorId"]
         storeSetting("kantorterpilih", kantor)
-        self.populate_provinsi(self.current_kantor_id, self.current_tipe_kantor_id)
+        self.populate_wilayah("provinsi")
+        # the snapshot is downloaded when missing and refreshed when stale
+        if wilayah_sync.refresh(self.current_kantor_id, self.current_tipe_kantor_id) \
+                and not self._wilayah["provinsi"]:
+            iface.statusBarIface().showMessage("Memuat data wilayah kantor...")
 
     def provinsi_changed(self, index):
-        data_provinsi = readSetting("listprovinsi", [])
-        provinsi = data_provinsi[index]
-        self.current_provinsi_id = provinsi["PROPINSIID"]
-        storeSetting("provinsiterpilih", provinsi)
-        self.populate_kabupaten(self.current_kantor_id, self.current_tipe_kantor_id, self.current_provinsi_id)
+        provinsi = self.select_wilayah("provinsi", index)
+        if provinsi is not None:
+            self.current_provinsi_id = provinsi["PROPINSIID"]
+            self.populate_wilayah("kabupaten", self.current_provinsi_id)
 
     def kabupaten_changed(self, index):
-        data_kabupaten = readSetting("listkabupaten", [])
-        kabupaten = data_kabupaten[index]
-        self.current_kabupaten_id = kabupaten["KABUPATENID"]
-        storeSetting("kabupatenterpilih", kabupaten)
-        self.populate_kecamatan(self.current_kantor_id, self.current_tipe_kantor_id, self.current_kabupaten_id)
+        kabupaten = self.select_wilayah("kabupaten", index)
+        if kabupaten is not None:
+            self.current_kabupaten_id = kabupaten["KABUPATENID"]
+            self.populate_wilayah("kecamatan", self.current_kabupaten_id)
 
     def kecamatan_changed(self, index):
-        data_kecamatan = readSetting("listkecamatan", [])
-        kecamatan = data_kecamatan[index]
-        self.current_kecamatan_id = kecamatan["KECAMATANID"]
-        storeSetting("kecamatanterpilih", kecamatan)
-        self.populate_kelurahan(self.current_kantor_id, self.current_tipe_kantor_id, self.current_kecamatan_id)
+        kecamatan = self.select_wilayah("kecamatan", index)
+        if kecamatan is not None:
+            self.current_kecamatan_id = kecamatan["KECAMATANID"]
+            self.populate_wilayah("desa", self.current_kecamatan_id)
 
     def kelurahan_changed(self, index):
-        data_kelurahan = readSetting("listkelurahan", [])
-        kelurahan = data_kelurahan[index]
-        self.current_kelurahan_id = kelurahan["DESAID"]
-        storeSetting("kelurahanterpilih", kelurahan)
+        kelurahan = self.select_wilayah("desa", index)
+        if kelurahan is not None:
+            self.current_kelurahan_id = kelurahan["DESAID"]
 
     def populate_kantor(self):
         self.combo_kantor.clear()
@@ -131,45 +166,60 @@ class Workpanel(QtWidgets.QDockWidget, FORM_CLASS):
         for kantor in data_kantor:
             self.combo_kantor.addItem(kantor["nama"])
 
-    def populate_provinsi(self, kantor_id, tipe_kantor_id):
-        self.combo_provinsi.clear()
-        response = endpoints.get_provinsi_by_kantor(kantor_id, str(tipe_kantor_id))
-        response_json = json.loads(response.content)
-        if response_json and len(response_json['PROPINSI']):
-            data_provinsi = response_json['PROPINSI']
-            storeSetting("listprovinsi", data_provinsi)
-            for provinsi in data_provinsi:
-                self.combo_provinsi.addItem(provinsi["PROPNAMA"])
-
-    def populate_kabupaten(self, kantor_id, tipe_kantor_id, provinsi_id):
-        self.combo_kabupaten.clear()
-        response = endpoints.get_kabupaten_by_kantor(kantor_id, str(tipe_kantor_id), provinsi_id)
-        response_json = json.loads(response.content)
-        if response_json and len(response_json['KABUPATEN']):
-            data_kabupaten = response_json['KABUPATEN']
-            storeSetting("listkabupaten", data_kabupaten)
-            for kabupaten in data_kabupaten:
-                self.combo_kabupaten.addItem(kabupaten["KABUNAMA"])
-
-    def populate_kecamatan(self, kantor_id, tipe_kantor_id, kabupaten_id):
-        self.combo_kecamatan.clear()
-        response = endpoints.get_kecamatan_by_kantor(kantor_id, str(tipe_kantor_id), kabupaten_id)
-        response_json = json.loads(response.content)
-        if response_json and len(response_json['KECAMATAN']):
-            data_kecamatan = response_json['KECAMATAN']
-            storeSetting("listkecamatan", data_kecamatan)
-            for kecamatan in data_kecamatan:
-                self.combo_kecamatan.addItem(kecamatan["KECANAMA"])
-
-    def populate_kelurahan(self, kantor_id, tipe_kantor_id, kecamatan_id):
-        self.combo_kelurahan.clear()
-        response = endpoints.get_desa_by_kantor(kantor_id, str(tipe_kantor_id), kecamatan_id)
-        response_json = json.loads(response.content)
-        if response_json and len(response_json['DESA']):
-            data_kelurahan = response_json['DESA']
-            storeSetting("listkelurahan", data_kelurahan)
-            for kelurahan in data_kelurahan:
-                self.combo_kelurahan.addItem(kelurahan["DESANAMA"])
+    def select_wilayah(self, level, index):
+        """Record shown at index of the combo of level, stored as the selected one"""
+        if not 0 <= index < len(self._wilayah[level]):
+            return None
+        wilayah = self._wilayah[level][index]
+        storeSetting(SELECTED_SETTING[level], wilayah)
+        return wilayah
+
+    def populate_wilayah(self, level, parent_id=None):
+        """
+        Fill the combo of level from the wilayah snapshot of the current
+        kantor, selecting the first entry fills the levels below it
+        """
+        for lower in LEVEL_ORDER[LEVEL_ORDER.index(level) + 1:]:
+            self._wilayah[lower] = []
+            self.combos[lower].blockSignals(True)
+            self.combos[lower].clear()
+            self.combos[lower].blockSignals(False)
+
+        self._wilayah[level] = wilayah_store.children(self.current_kantor_id, level, parent_id)
+        self.combos[level].clear()
+        self.combos[level].addItems([WilayahStore.record_name(level, wilayah) for wilayah in self._wilayah[level]])
+
+    def wilayah_synced(self, kantor_id):
+        """Show the new snapshot, keeping the wilayah selected in the old one"""
+        if kantor_id != str(self.current_kantor_id):
+            return
+        iface.statusBarIface().clearMessage()
+        selected = [
+            self.current_provinsi_id,
+            self.current_kabupaten_id,
+            self.current_kecamatan_id,
+            self.current_kelurahan_id
+        ]
+        self.populate_wilayah("provinsi")
+        for level, wilayah_id in zip(LEVEL_ORDER, selected):
+            ids = [WilayahStore.record_id(level, wilayah) for wilayah in self._wilayah[level]]
+            if wilayah_id is None or str(wilayah_id) not in ids:
+                break
+            self.combos[level].setCurrentIndex(ids.index(str(wilayah_id)))
+
+    def wilayah_sync_failed(self, kantor_id, exception):
+        if kantor_id != str(self.current_kantor_id):
+            return
+        iface.statusBarIface().clearMessage()
+        if self._wilayah["provinsi"]:
+            # the previous snapshot stays in use
+            logMessage(f"Gagal memperbarui data wilayah: {exception}")
+        else:
+            self.request_failed(exception)
+
+    def request_failed(self, exception):
+        logMessage(str(exception))
+        QtWidgets.QMessageBox.critical(None, 'Error', 'Gagal memuat data dari server GeoKKP')
 
     def simpan_area_kerja(self):
         kabupaten = readSetting("kabupatenterpilih")
@@ -186,11 +236,48 @@ class Workpanel(QtWidgets.QDockWidget, FORM_CLASS):
         set_project_crs_by_epsg(f'EPSG:{epsg}')
 
     def get_batas_desa(self, wilayah_id, epsg):
-        response = endpoints.get_wilayah_sdo(wilayah_id, 'Desa', epsg)
-        response_json = json.loads(response.content)
-        if response_json["status"] and len(response_json["wilayahs"]):
-            layer = sdo_to_layer(response_json["wilayahs"], "Batas Desa", f"EPSG:{epsg}")
-            layer.setReadOnly(True)
-            QgsProject.instance().addMapLayer(layer)
+        layer = layer_cache.load('Desa', wilayah_id, f"EPSG:{epsg}", "Batas Desa")
+        if layer is not None:
+            self.add_batas_desa(layer)
+            return
+
+        self.btn_simpan_area_kerja.setEnabled(False)
+        # boundaries are parsed and decoded while the response downloads
+        stream = JsonArrayStream("wilayahs")
+        builder = SdoLayerBuilder("Batas Desa", f"EPSG:{epsg}")
+        future = endpoints.get_wilayah_sdo.run_latest(wilayah_id, 'Desa', epsg, channel='batas_desa', delay=0)
+        future.on_progress(self.download_progress)
+        future.on_data(partial(self.batas_desa_received, stream, builder))
+        future.on_finished(partial(self.batas_desa_loaded, wilayah_id, epsg, stream, builder))
+        future.on_error(self.request_failed)
+        future.on_error(lambda _: self.btn_simpan_area_kerja.setEnabled(True))
+
+    def download_progress(self, received, total):
+        if total > 0:
+            message = f'Mengunduh data: {received * 100 // total}%'
+        else:
+            message = f'Mengunduh data: {received // 1024} KB'
+        iface.statusBarIface().showMessage(message, 2000)
+
+    def batas_desa_received(self, stream, builder, data):
+        for wilayah in stream.feed(data):
+            builder.add(wilayah)
+
+    def batas_desa_loaded(self, wilayah_id, epsg, stream, builder, response):
+        self.btn_simpan_area_kerja.setEnabled(True)
+        try:
+            # a truncated or non-JSON body, e.g. a proxy error page or an aborted download
+            status = stream.envelope()["status"]
+        except (ValueError, KeyError, TypeError) as e:
+            self.request_failed(e)
+            return
+        layer = builder.finish()
+        if status and layer is not None:
+            layer = layer_cache.save(layer, 'Desa', wilayah_id, f"EPSG:{epsg}")
+            self.add_batas_desa(layer)
         else:
             QtWidgets.QMessageBox.critical(None, 'Error', 'Desa tidak ditemukan')
+
+    def add_batas_desa(self, layer):
+        layer.setReadOnly(True)
+        QgsProject.instance().addMapLayer(layer)
@@ -0,0 +1,106 @@
+# coding=utf-8
+"""Benchmark API client reuse against a local stub server.
+
+A fresh client per call builds an API and NetworkAccessManager and connects
+its requestTimedOut trap each time, the shared client does it once. Both
+send their requests through the same QgsNetworkAccessManager, so this
+measures the cost of building the client, not HTTP connection reuse.
+
+Also counts the requests reaching the server while a combo is scrolled,
+with run_async per selection against run_latest.
+
+Run from the plugin directory with the QGIS python environment:
+
+    python -m test.bench_api_client
+"""
+
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, HTTPServer
+
+from .utilities import get_qgis_app
+
+QGIS_APP = get_qgis_app()
+
+from modules.api.base import API, api, get_client, close_clients  # noqa: E402
+
+CALLS = 200
+# selections while scrolling a combo with the keyboard, ms apart
+SCROLL_STEPS = 30
+SCROLL_INTERVAL = 30
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    received = 0
+
+    def do_POST(self):
+        StubHandler.received += 1
+        length = int(self.headers.get('Content-Length', 0))
+        self.rfile.read(length)
+        body = json.dumps({'status': True, 'PROPINSI': []}).encode('utf8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def measure(factory, base_url, calls=CALLS):
+    start = time.perf_counter()
+    for _ in range(calls):
+        factory(base_url).request('getPropinsi', body={'kantorId': '1'})
+    return (time.perf_counter() - start) / calls * 1000
+
+
+def scroll(base_url, latest):
+    """Requests the server received for SCROLL_STEPS selections"""
+    app = QGIS_APP[0]
+
+    # not a cached reference endpoint, every call that is sent reaches the stub
+    @api(endpoint='benchScroll', base_url=base_url)
+    def get_kecamatan(kabupaten_id, **kwargs):
+        return {'kabupatenId': kabupaten_id}
+
+    StubHandler.received = 0
+    futures = []
+    for kabupaten_id in range(SCROLL_STEPS):
+        if latest:
+            futures.append(get_kecamatan.run_latest(kabupaten_id, channel='bench_scroll'))
+        else:
+            futures.append(get_kecamatan.run_async(kabupaten_id))
+        deadline = time.perf_counter() + SCROLL_INTERVAL / 1000
+        while time.perf_counter() < deadline:
+            app.processEvents()
+    while not all(future.done() for future in futures):
+        app.processEvents()
+    return StubHandler.received
+
+
+def main():
+    server = HTTPServer(('127.0.0.1', 0), StubHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    base_url = f'http://127.0.0.1:{server.server_port}'
+
+    try:
+        fresh = measure(lambda url: API(base_url=url), base_url)
+        pooled = measure(lambda url: get_client(base_url=url), base_url)
+        every_selection = scroll(base_url, latest=False)
+        last_selection = scroll(base_url, latest=True)
+    finally:
+        close_clients()
+        server.shutdown()
+
+    print(f'client built per call  : {fresh:.3f} ms/call')
+    print(f'client from registry   : {pooled:.3f} ms/call')
+    print(f'scrolling {SCROLL_STEPS} items, run_async  : {every_selection} requests')
+    print(f'scrolling {SCROLL_STEPS} items, run_latest : {last_selection} requests')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,41 @@
+# coding=utf-8
+"""Benchmark the kabupaten reverse geocoder on 1M points.
+
+Run from the plugin directory with the QGIS python environment:
+
+    python -m test.bench_geocoder
+"""
+
+import time
+
+import numpy as np
+
+from modules.geocoder import ReverseGeocoder
+
+POINTS = 1000000
+
+
+def main():
+    rng = np.random.default_rng(0)
+    geocoder = ReverseGeocoder()
+
+    start = time.perf_counter()
+    geocoder.locate_array([106.8], [-6.2])
+    print(f'index build                : {time.perf_counter() - start:.3f} s')
+
+    lon, lat = rng.uniform(95, 141, POINTS), rng.uniform(-11, 6, POINTS)
+    start = time.perf_counter()
+    found = geocoder.locate_array(lon, lat)
+    print(f'{POINTS} points, uniform  : {time.perf_counter() - start:.3f} s ({(found >= 0).sum()} on land)')
+
+    # survey-like clusters around points on land
+    centres = rng.choice(np.flatnonzero(found >= 0), 500)
+    lon = np.repeat(lon[centres], POINTS // 500) + rng.normal(0, 0.05, POINTS)
+    lat = np.repeat(lat[centres], POINTS // 500) + rng.normal(0, 0.05, POINTS)
+    start = time.perf_counter()
+    geocoder.locate_array(lon, lat)
+    print(f'{POINTS} points, clustered: {time.perf_counter() - start:.3f} s')
+
+
+if __name__ == '__main__':
+    main()
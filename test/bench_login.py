@@ -0,0 +1,102 @@
+# coding=utf-8
+"""Benchmark the wilayah lookup after login, server chain against the offline snapshot.
+
+Without a snapshot the first provinsi, kabupaten, kecamatan and desa of the
+kantor are requested one after the other, each waiting for its parent. With
+a fresh snapshot they are read from the WilayahStore. The stub server
+answers after LATENCY ms, as the link to a remote kantor would.
+
+Run from the plugin directory with the QGIS python environment:
+
+    python -m test.bench_login
+"""
+
+import os
+import shutil
+import tempfile
+import threading
+import time
+from http.server import HTTPServer
+
+from .utilities import get_qgis_app
+
+QGIS_APP = get_qgis_app()
+
+from modules.api.base import api, close_clients  # noqa: E402
+from modules.wilayah_store import LEVEL_ORDER, WilayahStore  # noqa: E402
+
+from .bench_api_client import StubHandler  # noqa: E402
+
+LATENCY = 80
+REPEAT = 5
+KANTOR_ID = 1
+# not cached reference endpoints, every call reaches the stub
+ENDPOINTS = ('benchPropinsi', 'benchKabupaten', 'benchKecamatan', 'benchDesa')
+ROWS = [
+    ('provinsi', None, {'PROPINSIID': 32, 'PROPNAMA': 'Jawa Barat'}),
+    ('kabupaten', 32, {'KABUPATENID': 3273, 'KABUNAMA': 'Kota Bandung'}),
+    ('kecamatan', 3273, {'KECAMATANID': 327301, 'KECANAMA': 'Sukasari'}),
+    ('desa', 327301, {'DESAID': 3273011001, 'DESANAMA': 'Sukarasa', 'ZONATM3': '48.2'}),
+]
+
+
+class SlowStubHandler(StubHandler):
+    def do_POST(self):
+        time.sleep(LATENCY / 1000)
+        super(SlowStubHandler, self).do_POST()
+
+
+def server_chain(base_url):
+    app = QGIS_APP[0]
+    start = time.perf_counter()
+    for endpoint in ENDPOINTS:
+        @api(endpoint=endpoint, base_url=base_url)
+        def get_wilayah(parent_id, **kwargs):
+            return {'parentId': parent_id}
+
+        future = get_wilayah.run_async(KANTOR_ID)
+        while not future.done():
+            app.processEvents()
+    return time.perf_counter() - start
+
+
+def snapshot_chain(path):
+    # a new store, so the snapshot is read from disk as on the first login of a session
+    store = WilayahStore(path)
+    start = time.perf_counter()
+    parent_id = None
+    for level in LEVEL_ORDER:
+        record = store.children(KANTOR_ID, level, parent_id)[0]
+        parent_id = WilayahStore.record_id(level, record)
+    elapsed = time.perf_counter() - start
+    store.close()
+    return elapsed
+
+
+def main():
+    server = HTTPServer(('127.0.0.1', 0), SlowStubHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    base_url = f'http://127.0.0.1:{server.server_port}'
+
+    directory = tempfile.mkdtemp()
+    path = os.path.join(directory, 'wilayah.sqlite')
+    store = WilayahStore(path)
+    store.replace(KANTOR_ID, ROWS)
+    store.close()
+
+    try:
+        chain = min(server_chain(base_url) for _ in range(REPEAT))
+        snapshot = min(snapshot_chain(path) for _ in range(REPEAT))
+    finally:
+        close_clients()
+        server.shutdown()
+        shutil.rmtree(directory)
+
+    print(f'server latency             : {LATENCY} ms')
+    print(f'wilayah from the server    : {chain * 1000:8.1f} ms')
+    print(f'wilayah from the snapshot  : {snapshot * 1000:8.1f} ms')
+
+
+if __name__ == '__main__':
+    main()
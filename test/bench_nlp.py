@@ -0,0 +1,52 @@
+# coding=utf-8
+"""Benchmark NLP computation on 1M synthetic TM-3 points.
+
+Run from the plugin directory with the QGIS python environment:
+
+    python -m test.bench_nlp
+"""
+
+import time
+
+import numpy as np
+
+from modules.nlp import SCALES, get_nlp, get_nlp_array
+
+from .test_nlp import legacy_get_nlp
+
+POINTS = 1000000
+# the per point loops are timed on a sample and scaled up
+SAMPLE = 50000
+
+
+def synthetic_points(count=POINTS, seed=0):
+    rng = np.random.default_rng(seed)
+    return rng.uniform(200000, 800000, count), rng.uniform(9000000, 9800000, count)
+
+
+def measure_loop(function, xs, ys):
+    start = time.perf_counter()
+    for x, y in zip(xs, ys):
+        for skala in SCALES:
+            function(skala, x, y)
+    return (time.perf_counter() - start) * POINTS / len(xs)
+
+
+def main():
+    xs, ys = synthetic_points()
+    sample_x = xs[:SAMPLE].tolist()
+    sample_y = ys[:SAMPLE].tolist()
+
+    legacy = measure_loop(legacy_get_nlp, sample_x, sample_y)
+    single_pass = measure_loop(get_nlp, sample_x, sample_y)
+    start = time.perf_counter()
+    get_nlp_array(xs, ys)
+    vectorized = time.perf_counter() - start
+
+    print(f'{POINTS} points, all scales, former get_nlp : {legacy:.3f} s (estimated)')
+    print(f'{POINTS} points, all scales, single pass    : {single_pass:.3f} s (estimated)')
+    print(f'{POINTS} points, all scales, get_nlp_array  : {vectorized:.3f} s')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,52 @@
+# coding=utf-8
+"""Benchmark SDO decoding on a synthetic 10k parcel payload.
+
+Run from the plugin directory with the QGIS python environment:
+
+    python -m test.bench_sdo
+"""
+
+import random
+import time
+
+from .utilities import get_qgis_app
+
+QGIS_APP = get_qgis_app()
+
+from .test_sdo import legacy_parse_sdo_geometry, parse_sdo_geometry  # noqa: E402
+
+PARCELS = 10000
+
+
+def synthetic_parcels(count=PARCELS, vertices=12, seed=0):
+    """Closed polygon rings around random origins in a TM-3 zone"""
+    rng = random.Random(seed)
+    parcels = []
+    for _ in range(count):
+        x0 = rng.uniform(400000, 500000)
+        y0 = rng.uniform(9100000, 9200000)
+        ring = []
+        for i in range(vertices - 1):
+            ring += [x0 + rng.uniform(0, 50), y0 + rng.uniform(0, 50)]
+        ring += ring[:2]
+        parcels.append(([1, 1003, 1], ring))
+    return parcels
+
+
+def measure(decoder, parcels):
+    start = time.perf_counter()
+    for elem_info, ordinates in parcels:
+        decoder(elem_info, ordinates)
+    return time.perf_counter() - start
+
+
+def main():
+    parcels = synthetic_parcels()
+    legacy = measure(legacy_parse_sdo_geometry, parcels)
+    wkb = measure(parse_sdo_geometry, parcels)
+    print(f'{PARCELS} parcels, loop decoder : {legacy:.3f} s')
+    print(f'{PARCELS} parcels, WKB decoder  : {wkb:.3f} s')
+
+
+if __name__ == '__main__':
+    main()
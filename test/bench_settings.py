@@ -0,0 +1,65 @@
+# coding=utf-8
+"""Benchmark 10k settings reads and writes, direct QgsSettings against the cache.
+
+Run from the plugin directory with the QGIS python environment:
+
+    python -m test.bench_settings
+"""
+
+import time
+
+from .utilities import get_qgis_app
+
+QGIS_APP = get_qgis_app()
+
+from qgis.core import QgsSettings  # noqa: E402
+
+from modules.settings_cache import SETTINGS_PREFIX, SettingsCache  # noqa: E402
+
+OPERATIONS = 10000
+# about the size of listkantor / listkelurahan after login
+VALUE = [{'KANTORID': str(i), 'NAMA': f'Kantor Pertanahan {i}', 'ZONATM3': '49.1'} for i in range(500)]
+
+
+def direct(settings):
+    """storeSetting / readSetting as they were: sync on every write, decode on every read"""
+    start = time.perf_counter()
+    for i in range(OPERATIONS):
+        settings.setValue(SETTINGS_PREFIX + 'listkantor', VALUE)
+        settings.sync()
+    writes = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for i in range(OPERATIONS):
+        settings.value(SETTINGS_PREFIX + 'listkantor', [])
+    return writes, time.perf_counter() - start
+
+
+def cached(settings):
+    cache = SettingsCache(settings)
+    start = time.perf_counter()
+    for i in range(OPERATIONS):
+        cache.set_value('listkantor', VALUE)
+    cache.flush()
+    writes = time.perf_counter() - start
+
+    cache.invalidate()
+    start = time.perf_counter()
+    for i in range(OPERATIONS):
+        cache.value('listkantor', [])
+    return writes, time.perf_counter() - start
+
+
+def main():
+    settings = QgsSettings('GeoKKP-GIS', 'bench_settings')
+    try:
+        for name, function in (('QgsSettings', direct), ('SettingsCache', cached)):
+            writes, reads = function(settings)
+            print(f'{name:14} {OPERATIONS} writes: {writes:.3f} s, {OPERATIONS} reads: {reads:.3f} s')
+    finally:
+        settings.clear()
+        settings.sync()
+
+
+if __name__ == '__main__':
+    main()
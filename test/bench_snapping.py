@@ -0,0 +1,91 @@
+# coding=utf-8
+"""Benchmark adjusting parcels, qgis:snapgeometries against the reused snapping engine.
+
+Snaps a few parcels, each a reference cell shifted by less than the
+tolerance, to a grid of reference parcels: once through the processing
+algorithm as AdjustDialog did before, then with the snapping engine on a
+first click (index built) and on a repeated click.
+
+Run from the plugin directory with the QGIS python environment:
+
+    python -m test.bench_snapping
+"""
+
+import time
+
+from .utilities import get_qgis_app
+
+QGIS_APP = get_qgis_app()
+
+from qgis.analysis import QgsNativeAlgorithms  # noqa: E402
+from qgis.core import QgsApplication, QgsFeature, QgsGeometry, QgsProject, QgsVectorLayer  # noqa: E402
+from processing.core.Processing import Processing  # noqa: E402
+
+from modules.snapping import SnappingEngine  # noqa: E402
+from modules.utils import snap_geometries_to_layer  # noqa: E402
+
+GRID = 300  # GRID x GRID reference parcels
+CELL = 20.0
+PARCELS = 50
+SHIFT = 0.4
+
+
+def square(x, y, shift=0.0):
+    x, y = x * CELL + shift, y * CELL + shift
+    return QgsGeometry.fromWkt(f'POLYGON(({x} {y},{x + CELL} {y},{x + CELL} {y + CELL},{x} {y + CELL},{x} {y}))')
+
+
+def polygon_layer(name, geometries):
+    layer = QgsVectorLayer('Polygon?crs=EPSG:23834', name, 'memory')
+    features = []
+    for geometry in geometries:
+        feature = QgsFeature()
+        feature.setGeometry(geometry)
+        features.append(feature)
+    layer.dataProvider().addFeatures(features)
+    QgsProject.instance().addMapLayer(layer)
+    return layer
+
+
+def parcels():
+    step = GRID // PARCELS
+    layer = polygon_layer('bench parcels', [square(i * step, i * step, SHIFT) for i in range(PARCELS)])
+    layer.selectAll()
+    return layer
+
+
+def processing_adjust(layer, reference):
+    """AdjustDialog.adjust_parcel before the snapping engine"""
+    out = snap_geometries_to_layer(layer, reference, only_selected=True)
+    selected_feature_ids = layer.selectedFeatureIds()
+    layer.dataProvider().deleteFeatures(selected_feature_ids)
+    layer.dataProvider().addFeatures(out.getFeatures())
+
+
+def timed(function, *args):
+    start = time.perf_counter()
+    function(*args)
+    return time.perf_counter() - start
+
+
+def main():
+    Processing.initialize()
+    QgsApplication.processingRegistry().addProvider(QgsNativeAlgorithms())
+
+    reference = polygon_layer('bench reference', [square(x, y) for x in range(GRID) for y in range(GRID)])
+    print(f'{GRID * GRID} reference parcels, {PARCELS} parcels adjusted')
+
+    elapsed = timed(processing_adjust, parcels(), reference)
+    print(f'qgis:snapgeometries        : {elapsed * 1000:9.1f} ms')
+
+    engine = SnappingEngine()
+    layer = parcels()
+    first = timed(engine.snap_features, layer, layer.selectedFeatureIds(), reference)
+    layer = parcels()
+    repeated = timed(engine.snap_features, layer, layer.selectedFeatureIds(), reference)
+    print(f'snapping engine, first     : {first * 1000:9.1f} ms (index built)')
+    print(f'snapping engine, repeated  : {repeated * 1000:9.1f} ms')
+
+
+if __name__ == '__main__':
+    main()
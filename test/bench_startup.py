@@ -0,0 +1,83 @@
+# coding=utf-8
+"""Benchmark the plugin's share of QGIS start up time.
+
+Starts a headless QGIS with the interface stub of test/qgis_interface.py,
+then times importing the plugin, GeoKKP.__init__ and initGui, lists the
+dialog modules imported by then, and what creating every dialog up front
+(as before the lazy registry) would add.
+
+Run from the plugin directory with the QGIS python environment:
+
+    python -m test.bench_startup
+"""
+
+import importlib.util
+import os
+import sys
+import time
+
+from .utilities import get_qgis_app
+
+PLUGIN_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PLUGIN_PACKAGE = 'geokkp'
+
+
+def load_plugin_package():
+    spec = importlib.util.spec_from_file_location(
+        PLUGIN_PACKAGE, os.path.join(PLUGIN_DIR, '__init__.py'), submodule_search_locations=[PLUGIN_DIR]
+    )
+    package = importlib.util.module_from_spec(spec)
+    sys.modules[PLUGIN_PACKAGE] = package
+    spec.loader.exec_module(package)
+    return package
+
+
+def timed(function, *args):
+    start = time.perf_counter()
+    result = function(*args)
+    return result, time.perf_counter() - start
+
+
+def main():
+    (app, canvas, iface, parent), qgis_start = timed(get_qgis_app)
+
+    # plugin modules read qgis.utils.iface at import
+    import qgis.utils
+    qgis.utils.iface = iface
+
+    package, package_import = timed(load_plugin_package)
+    _, module_import = timed(importlib.import_module, f'{PLUGIN_PACKAGE}.geokkp')
+    plugin, construct = timed(package.classFactory, iface)
+    try:
+        _, init_gui = timed(plugin.initGui)
+    except Exception as e:
+        init_gui = 0.0
+        print(f'initGui not timed, the interface stub lacks: {e}')
+
+    plugin_total = package_import + module_import + construct + init_gui
+    print(f'QGIS start                 : {qgis_start:.3f} s')
+    print(f'plugin import              : {package_import + module_import:.3f} s')
+    print(f'GeoKKP.__init__            : {construct:.3f} s')
+    print(f'initGui                    : {init_gui:.3f} s')
+    print(f'plugin share of start up   : {plugin_total / (qgis_start + plugin_total):.1%}')
+
+    # dialog modules already imported, each should wait for its dialog to be opened
+    imported = sorted(
+        module for module, _, _, _ in plugin.dialogs._specs.values()
+        if f'{PLUGIN_PACKAGE}.modules.{module}' in sys.modules
+    )
+    print(f'dialog modules imported    : {", ".join(imported) or "none"}')
+
+    # what the former eager construction of every dialog cost on top
+    eager = 0.0
+    for name in list(plugin.dialogs._specs):
+        try:
+            _, elapsed = timed(plugin.dialogs.get, name)
+            eager += elapsed
+        except Exception as e:
+            print(f'{name} not created: {e}')
+    print(f'all dialogs created eagerly: +{eager:.3f} s')
+
+
+if __name__ == '__main__':
+    main()
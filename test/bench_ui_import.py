@@ -0,0 +1,74 @@
+# coding=utf-8
+"""Profile loading the plugin forms, runtime uic.loadUiType against the compiled modules.
+
+Compiles ui/*.ui into ui_compiled/ first when it is missing, then times each
+form both ways as a plugin import at QGIS start would load it.
+
+Run from the plugin directory with the QGIS python environment:
+
+    python -m test.bench_ui_import
+"""
+
+import os
+import sys
+import time
+
+from .utilities import get_qgis_app
+
+QGIS_APP = get_qgis_app()
+
+from qgis.PyQt import uic  # noqa: E402
+
+from modules.ui_loader import (  # noqa: E402
+    COMPILED_DIR,
+    COMPILED_PACKAGE,
+    UI_DIR,
+    compile_all,
+    compiled_form,
+    ui_path
+)
+
+REPEAT = 5
+
+
+def runtime(name):
+    return uic.loadUiType(ui_path(name))
+
+
+def compiled(name):
+    # a fresh import, as on each QGIS start; the bytecode stays cached in __pycache__
+    sys.modules.pop(f'{COMPILED_PACKAGE}.{name}', None)
+    return compiled_form(name)
+
+
+def best(function, name):
+    times = []
+    for _ in range(REPEAT):
+        start = time.perf_counter()
+        function(name)
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def main():
+    if not os.path.isdir(COMPILED_DIR):
+        compile_all()
+    names = sorted(filename[:-3] for filename in os.listdir(UI_DIR) if filename.endswith('.ui'))
+
+    total_runtime = total_compiled = 0.0
+    for name in names:
+        if compiled(name) is None:
+            print(f'{name:20} compiled module missing or stale, run make compile-ui')
+            continue
+        loaded, imported = best(runtime, name), best(compiled, name)
+        total_runtime += loaded
+        total_compiled += imported
+        print(f'{name:20} loadUiType {loaded * 1000:7.2f} ms   compiled {imported * 1000:6.2f} ms')
+
+    print(f'{"total":20} loadUiType {total_runtime * 1000:7.2f} ms   compiled {total_compiled * 1000:6.2f} ms')
+    if total_compiled:
+        print(f'form loading {total_runtime / total_compiled:.1f}x faster')
+
+
+if __name__ == '__main__':
+    main()
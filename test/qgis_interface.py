@@ -25,8 +25,9 @@ __copyright__ = (
 
 import logging
 from qgis.PyQt.QtCore import QObject, pyqtSlot, pyqtSignal
-from qgis.core import QgsMapLayerRegistry
-from qgis.gui import QgsMapCanvasLayer
+from qgis.PyQt.QtWidgets import QMainWindow
+from qgis.core import QgsMapLayer, QgsProject
+from qgis.gui import QgsMessageBar
 LOGGER = logging.getLogger('QGIS')
 
 
@@ -37,7 +38,7 @@ class QgisInterface(QObject):
     This class is here for enabling us to run unit tests only,
     so most methods are simply stubs.
     """
-    currentLayerChanged = pyqtSignal(QgsMapCanvasLayer)
+    currentLayerChanged = pyqtSignal(QgsMapLayer)
 
     def __init__(self, canvas):
         """Constructor
@@ -49,16 +50,22 @@ class QgisInterface(QObject):
         # are added.
         LOGGER.debug('Initialising canvas...')
         # noinspection PyArgumentList
-        QgsMapLayerRegistry.instance().layersAdded.connect(self.addLayers)
+        QgsProject.instance().layersAdded.connect(self.addLayers)
         # noinspection PyArgumentList
-        QgsMapLayerRegistry.instance().layerWasAdded.connect(self.addLayer)
+        QgsProject.instance().layerWasAdded.connect(self.addLayer)
         # noinspection PyArgumentList
-        QgsMapLayerRegistry.instance().removeAll.connect(self.removeAllLayers)
+        QgsProject.instance().removeAll.connect(self.removeAllLayers)
 
         # For processing module
         self.destCrs = None
 
-    @pyqtSlot('QStringList')
+        # Main window with a menu bar, plugins insert their menus before
+        # the last menu as in QGIS
+        self.main_window = QMainWindow()
+        self.main_window.menuBar().addMenu('Help')
+        self.message_bar = QgsMessageBar(self.main_window)
+
+    @pyqtSlot(list)
     def addLayers(self, layers):
         """Handle layers being added to the registry so they show up in canvas.
 
@@ -70,17 +77,10 @@ class QgisInterface(QObject):
         # LOGGER.debug('addLayers called on qgis_interface')
         # LOGGER.debug('Number of layers being added: %s' % len(layers))
         # LOGGER.debug('Layer Count Before: %s' % len(self.canvas.layers()))
-        current_layers = self.canvas.layers()
-        final_layers = []
-        for layer in current_layers:
-            final_layers.append(QgsMapCanvasLayer(layer))
-        for layer in layers:
-            final_layers.append(QgsMapCanvasLayer(layer))
-
-        self.canvas.setLayerSet(final_layers)
+        self.canvas.setLayers(self.canvas.layers() + list(layers))
         # LOGGER.debug('Layer Count After: %s' % len(self.canvas.layers()))
 
-    @pyqtSlot('QgsMapLayer')
+    @pyqtSlot(QgsMapLayer)
     def addLayer(self, layer):
         """Handle a layer being added to the registry so it shows up in canvas.
 
@@ -97,12 +97,12 @@ class QgisInterface(QObject):
     @pyqtSlot()
     def removeAllLayers(self):
         """Remove layers from the canvas before they get deleted."""
-        self.canvas.setLayerSet([])
+        self.canvas.setLayers([])
 
     def newProject(self):
         """Create new project."""
         # noinspection PyArgumentList
-        QgsMapLayerRegistry.instance().removeAllMapLayers()
+        QgsProject.instance().removeAllMapLayers()
 
     # ---------------- API Mock for QgsInterface follows -------------------
 
@@ -150,7 +150,7 @@ class QgisInterface(QObject):
     def activeLayer(self):
         """Get pointer to the active layer (layer selected in the legend)."""
         # noinspection PyArgumentList
-        layers = QgsMapLayerRegistry.instance().mapLayers()
+        layers = QgsProject.instance().mapLayers()
         for item in layers:
             return layers[item]
 
@@ -176,7 +176,7 @@ class QgisInterface(QObject):
         :param name: Name for the toolbar.
         :type name: str
         """
-        pass
+        return self.main_window.addToolBar(name)
 
     def mapCanvas(self):
         """Return a pointer to the map canvas."""
@@ -187,7 +187,7 @@ class QgisInterface(QObject):
 
         In case of QGIS it returns an instance of QgisApp.
         """
-        pass
+        return self.main_window
 
     def addDockWidget(self, area, dock_widget):
         """Add a dock widget to the main window.
@@ -198,8 +198,24 @@ class QgisInterface(QObject):
         :param dock_widget: A dock widget to add to the UI.
         :type dock_widget: QDockWidget
         """
-        pass
+        self.main_window.addDockWidget(area, dock_widget)
 
     def legendInterface(self):
         """Get the legend."""
         return self.canvas
+
+    def messageBar(self):
+        """Return the message bar of the main window."""
+        return self.message_bar
+
+    def openMessageLog(self):
+        """Open the message log dock."""
+        pass
+
+    def addPluginToMenu(self, name, action):
+        """Add an action to the plugin menu."""
+        pass
+
+    def removePluginMenu(self, name, action):
+        """Remove an action from the plugin menu."""
+        pass
@@ -0,0 +1,57 @@
+# coding=utf-8
+"""Tests for the precomputed kabupaten index."""
+
+import json
+import unittest
+
+from modules.adm_index import (
+    ADM_INDEX_FILE,
+    build_index,
+    district,
+    feature_summary,
+    tm3_zone,
+    tm3_zone_epsg
+)
+
+
+class AdmIndexTest(unittest.TestCase):
+    """Test the kabupaten index against the TopoJSON it is built from."""
+
+    def test_shipped_index(self):
+        """The index in data/ is up to date with idn_adm_lv2.json."""
+        with open(ADM_INDEX_FILE, encoding='utf-8') as source:
+            shipped = json.load(source)
+        self.assertEqual(shipped, json.loads(json.dumps(build_index())))
+
+    def test_district(self):
+        """Zone and bounding box of a kabupaten."""
+        entry = district('Kota Bandung')
+        self.assertEqual((entry['zone'], entry['epsg']), ('48.2', 23834))
+        xmin, ymin, xmax, ymax = entry['bbox']
+        lon, lat = entry['centroid']
+        self.assertTrue(xmin < lon < xmax and ymin < lat < ymax)
+        self.assertIsNone(district('Bukan Kabupaten'))
+
+    def test_tm3_zone(self):
+        """Zone names and EPSG codes follow the TM-3 numbering."""
+        self.assertEqual([tm3_zone(lon) for lon in (94, 97, 100, 106.8, 140)],
+                         ['46.2', '47.1', '47.2', '48.2', '54.1'])
+        self.assertEqual([tm3_zone_epsg(zone) for zone in ('46.2', '47.1', '54.1')], [23830, 23831, 23845])
+
+    def test_centroid_with_hole(self):
+        """Holes are subtracted from the area and centroid."""
+        arcs = [
+            [(0, 0), (0, 10), (10, 10), (10, 0), (0, 0)],
+            [(5, 5), (10, 5), (10, 10), (5, 10), (5, 5)],
+        ]
+        bbox, (x, y), area = feature_summary(arcs, {'type': 'Polygon', 'arcs': [[0], [1]]})
+        self.assertEqual(bbox, [0, 0, 10, 10])
+        self.assertAlmostEqual(area, 75)
+        self.assertAlmostEqual(x, (100 * 5 - 25 * 7.5) / 75)
+        self.assertAlmostEqual(y, (100 * 5 - 25 * 7.5) / 75)
+
+
+if __name__ == "__main__":
+    suite = unittest.makeSuite(AdmIndexTest)
+    runner = unittest.TextTestRunner(verbosity=2)
+    runner.run(suite)
@@ -0,0 +1,88 @@
+# coding=utf-8
+"""Tests for the bulk coordinate transformation."""
+
+import math
+import unittest
+
+import numpy as np
+
+from modules.batch_transform import (
+    TARGET_TM3,
+    TARGET_UTM,
+    iter_coordinate_chunks,
+    parse_coordinate_line,
+    tm3_epsg_array,
+    transform_chunks,
+    utm_epsg_array
+)
+
+
+class RecordingTransform:
+    """Shifts points by the EPSG code of the destination and records every call"""
+
+    def __init__(self, lon_offset=0):
+        self.calls = []
+        self.lon_offset = lon_offset
+
+    def __call__(self, source, destination, x, y):
+        self.calls.append((source, destination, len(x)))
+        if destination == 'EPSG:4326':
+            return np.asarray(x) + self.lon_offset, np.asarray(y)
+        offset = int(destination.split(':')[1])
+        return np.asarray(x) + offset, np.asarray(y)
+
+
+class BatchTransformTest(unittest.TestCase):
+    """Test parsing and zone grouping of coordinate lists."""
+
+    def test_parse_line(self):
+        """Pasted pairs, id columns, the semicolon form and headers."""
+        self.assertEqual(parse_coordinate_line('106.8, -6.2'), [(None, 106.8, -6.2)])
+        self.assertEqual(parse_coordinate_line('P1;500000;9300000'), [('P1', 500000, 9300000)])
+        self.assertEqual(parse_coordinate_line('"7"\t1.5 2.5'), [('7', 1.5, 2.5)])
+        self.assertEqual(parse_coordinate_line('1,2;3,4'), [(None, 1, 2), (None, 3, 4)])
+        self.assertEqual(parse_coordinate_line('id,x,y'), [])
+        self.assertEqual(parse_coordinate_line('  '), [])
+
+    def test_chunks(self):
+        """Points are numbered in input order and split in chunks."""
+        lines = ['x,y'] + [f'{i}, {i * 2}' for i in range(25)]
+        chunks = list(iter_coordinate_chunks(lines, chunk_size=10))
+        self.assertEqual([len(ids) for ids, x, y in chunks], [10, 10, 5])
+        self.assertEqual(chunks[1][0][0], '11')
+        self.assertEqual(chunks[2][2].tolist(), [40, 42, 44, 46, 48])
+
+    def test_zones(self):
+        """Zone codes match the scalar TM-3 and UTM formulas."""
+        lon = np.array([93.0, 95.99, 96.0, 106.8, 140.9, 92.0, 141.0])
+        lat = np.array([5.0, 1.0, -1.0, -6.2, -2.5, 0.0, 0.0])
+        self.assertEqual(tm3_epsg_array(lon).tolist(), [23830, 23830, 23831, 23834, 23845, 0, 0])
+        expected = [(32700 if b < 0 else 32600) + math.floor((a + 180) / 6) + 1 for a, b in zip(lon, lat)]
+        self.assertEqual(utm_epsg_array(lon, lat).tolist(), expected)
+
+    def test_grouped_transform(self):
+        """One transform call per zone and chunk, results in input order."""
+        lines = ['106.8, -6.2', '110.4, -7.0', '91.0, 2.0', '107.0, -6.0']
+        transform = RecordingTransform()
+        chunks = iter_coordinate_chunks(lines)
+        [(ids, x, y, out_x, out_y, codes)] = transform_chunks(chunks, 'EPSG:4326', TARGET_TM3, transform)
+        self.assertEqual(codes.tolist(), [23834, 23835, 0, 23834])
+        self.assertEqual(sorted(transform.calls), [
+            ('EPSG:4326', 'EPSG:23834', 2), ('EPSG:4326', 'EPSG:23835', 1)
+        ])
+        self.assertEqual(out_x[[0, 1, 3]].tolist(), [106.8 + 23834, 110.4 + 23835, 107.0 + 23834])
+        self.assertTrue(np.isnan(out_x[2]))
+
+    def test_projected_source(self):
+        """Zones of a projected source are found through lat long."""
+        transform = RecordingTransform(lon_offset=106)
+        chunks = iter_coordinate_chunks(['1, -6'])
+        [result] = transform_chunks(chunks, 'EPSG:23833', TARGET_UTM, transform)
+        self.assertEqual(transform.calls, [('EPSG:23833', 'EPSG:4326', 1), ('EPSG:23833', 'EPSG:32748', 1)])
+        self.assertEqual(result[5].tolist(), [32748])
+
+
+if __name__ == "__main__":
+    suite = unittest.makeSuite(BatchTransformTest)
+    runner = unittest.TextTestRunner(verbosity=2)
+    runner.run(suite)
@@ -0,0 +1,77 @@
+# coding=utf-8
+"""Tests for the kabupaten reverse geocoder."""
+
+import unittest
+
+import numpy as np
+
+from modules.adm_index import feature_rings, read_topology
+from modules.geocoder import ReverseGeocoder, kantor_by_kode
+
+
+def boundary_edges():
+    """Every boundary edge with the feature owning it"""
+    arcs, geometries = read_topology()
+    edges, owners = [], []
+    for offset, geometry in enumerate(geometries):
+        for _, ring in feature_rings(arcs, geometry):
+            ring = np.asarray(ring)
+            edges.append(np.hstack([ring[:-1], ring[1:]]))
+            owners.append(np.full(len(ring) - 1, offset))
+    return np.concatenate(edges), np.concatenate(owners)
+
+
+def brute_force(edges, owners, x, y):
+    """Features containing a point, by a ray cast against every edge"""
+    x0, y0, x1, y1 = edges.T
+    straddle = (y0 <= y) != (y1 <= y)
+    crossing_x = x0[straddle] + (y - y0[straddle]) * (x1[straddle] - x0[straddle]) / (y1[straddle] - y0[straddle])
+    counts = np.bincount(owners[straddle][crossing_x > x], minlength=owners.max() + 1)
+    return set(np.flatnonzero(counts % 2 == 1).tolist())
+
+
+class GeocoderTest(unittest.TestCase):
+    """Test point in polygon lookups against a brute force ray cast."""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.geocoder = ReverseGeocoder()
+
+    def test_locate(self):
+        """Kabupaten, kantor and TM-3 zone of a point."""
+        info = self.geocoder.locate(107.6, -6.92)
+        self.assertEqual(info['WAK'], 'Kota Bandung')
+        self.assertEqual(info['KODE_BPN'], '1015')
+        self.assertEqual(info['kantor']['propinsi'], 'Jawa Barat')
+        self.assertEqual((info['zone'], info['epsg']), ('48.2', 23834))
+        self.assertIsNone(self.geocoder.locate(90.0, 0.0))
+        self.assertIsNone(self.geocoder.locate(100.0, -5.0))
+
+    def test_near_boundaries(self):
+        """Points around boundary vertices match the brute force ray cast."""
+        edges, owners = boundary_edges()
+        rng = np.random.default_rng(0)
+        picked = rng.integers(0, len(edges), 500)
+        lon = edges[picked, 0] + rng.normal(0, 0.003, len(picked))
+        lat = edges[picked, 1] + rng.normal(0, 0.003, len(picked))
+        lon = np.r_[lon, rng.uniform(95, 141, 500)]
+        lat = np.r_[lat, rng.uniform(-11, 6, 500)]
+        result = self.geocoder.locate_array(lon, lat)
+        for x, y, offset in zip(lon, lat, result.tolist()):
+            expected = brute_force(edges, owners, x, y)
+            if expected:
+                self.assertIn(offset, expected, (x, y))
+            else:
+                self.assertEqual(offset, -1, (x, y))
+
+    def test_kantor_by_kode(self):
+        """KODE_BPN as in the TopoJSON or as a number."""
+        self.assertEqual(kantor_by_kode('0104')['WAK'], 'Aceh Barat')
+        self.assertEqual(kantor_by_kode(104)['propinsi'], 'Aceh')
+        self.assertIsNone(kantor_by_kode(None))
+
+
+if __name__ == "__main__":
+    suite = unittest.makeSuite(GeocoderTest)
+    runner = unittest.TextTestRunner(verbosity=2)
+    runner.run(suite)
@@ -0,0 +1,70 @@
+# coding=utf-8
+"""Tests for the incremental JSON array reader."""
+
+import json
+import unittest
+
+from modules.jsonstream import JsonArrayStream
+
+
+RESPONSE = {
+    'status': True,
+    'message': 'teks "wilayahs": [1] } dalam string',
+    'wilayahs': [
+        {'wilayahId': 'A', 'nama': 'Désa \\"]}', 'boundary': {'sdoElemInfo': [1, 1003, 1]}},
+        {'wilayahId': 'B', 'nama': 'Desa B', 'boundary': {'sdoOrdinates': [1.5, 2, [3]]}},
+        12345,
+        1.5e10,
+    ],
+    'total': 4,
+}
+
+
+def feed_in_chunks(stream, data, size):
+    items = []
+    for start in range(0, len(data), size):
+        items += stream.feed(data[start:start + size])
+    return items
+
+
+class JsonArrayStreamTest(unittest.TestCase):
+    """Test array elements are read as the bytes arrive."""
+
+    def test_chunk_sizes(self):
+        """Every split of the response gives the same elements and envelope."""
+        data = json.dumps(RESPONSE, ensure_ascii=False).encode('utf8')
+        for size in (1, 2, 3, 7, 64, len(data)):
+            stream = JsonArrayStream('wilayahs')
+            self.assertEqual(feed_in_chunks(stream, data, size), RESPONSE['wilayahs'])
+            self.assertEqual(stream.envelope(), dict(RESPONSE, wilayahs=[]))
+            self.assertEqual(stream.count, 4)
+
+    def test_elements_before_end(self):
+        """Complete elements are returned before the document ends."""
+        data = json.dumps(RESPONSE).encode('utf8')
+        stream = JsonArrayStream('wilayahs')
+        items = stream.feed(data[:data.index(b'12345')])
+        self.assertEqual(items, RESPONSE['wilayahs'][:2])
+
+    def test_decoded_once(self):
+        """An element received over many chunks is decoded once it is complete."""
+        data = json.dumps(RESPONSE).encode('utf8')
+        stream = JsonArrayStream('wilayahs')
+        decode = stream._decoder.raw_decode
+        calls = []
+        stream._decoder.raw_decode = lambda *args: calls.append(args[1]) or decode(*args)
+        self.assertEqual(feed_in_chunks(stream, data, 1), RESPONSE['wilayahs'])
+        self.assertEqual(len(calls), len(RESPONSE['wilayahs']))
+
+    def test_missing_key(self):
+        """Without the key nothing is streamed and the envelope is the document."""
+        data = json.dumps({'status': False, 'message': 'Desa tidak ditemukan'}).encode('utf8')
+        stream = JsonArrayStream('wilayahs')
+        self.assertEqual(feed_in_chunks(stream, data, 5), [])
+        self.assertEqual(stream.envelope(), {'status': False, 'message': 'Desa tidak ditemukan'})
+
+
+if __name__ == "__main__":
+    suite = unittest.makeSuite(JsonArrayStreamTest)
+    runner = unittest.TextTestRunner(verbosity=2)
+    runner.run(suite)
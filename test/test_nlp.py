@@ -0,0 +1,192 @@
+# coding=utf-8
+"""Tests for the NLP (Nomor Lembar Peta) computation."""
+
+import random
+import struct
+import unittest
+
+import numpy as np
+
+from modules.nlp import (
+    SCALES,
+    x_origin,
+    y_origin,
+    grid_10rb,
+    grid_2500,
+    grid_1000,
+    grid_500,
+    grid_250,
+    bk_250,
+    get_nlp,
+    get_nlp_array,
+    sheets_in_extent,
+    iter_sheet_grid,
+    rectangles_wkb,
+    nlp_to_rect,
+    is_valid_nlp
+)
+
+
+def legacy_bk_10000(x, y):
+    """bk_* and get_nlp as they were before the single pass version, kept as reference"""
+    k_10rb = int((x - x_origin)/grid_10rb)+1
+    b_10rb = int((y - y_origin)/grid_10rb)+1
+    return [k_10rb, b_10rb]
+
+
+def legacy_bk_2500(x, y):
+    k_10rb, b_10rb = legacy_bk_10000(x, y)
+    k_2500 = int((x-(x_origin+(k_10rb - 1)*grid_10rb))/grid_2500)+1
+    b_2500 = int((y-(y_origin+(b_10rb - 1)*grid_10rb))/grid_2500)+1
+    return [k_2500, b_2500]
+
+
+def legacy_bk_1000(x, y):
+    k_10rb, b_10rb = legacy_bk_10000(x, y)
+    k_2500, b_2500 = legacy_bk_2500(x, y)
+    k_1000 = int((x-(x_origin+(k_10rb - 1)*grid_10rb + (k_2500-1)*grid_2500))/grid_1000)+1
+    b_1000 = int((y-(y_origin+(b_10rb - 1)*grid_10rb + (b_2500-1)*grid_2500))/grid_1000)+1
+    return [k_1000, b_1000]
+
+
+def legacy_bk_500(x, y):
+    k_10rb, b_10rb = legacy_bk_10000(x, y)
+    k_2500, b_2500 = legacy_bk_2500(x, y)
+    k_1000, b_1000 = legacy_bk_1000(x, y)
+    k_500 = int((x-(x_origin+(k_10rb - 1)*grid_10rb + ((k_2500-1)*grid_2500) + (k_1000-1)*grid_1000))/grid_500)+1
+    b_500 = int((y-(y_origin+(b_10rb - 1)*grid_10rb + ((b_2500-1)*grid_2500) + (b_1000-1)*grid_1000))/grid_500)+1
+    return [k_500, b_500]
+
+
+def legacy_bk_250(x, y):
+    k_10rb, b_10rb = legacy_bk_10000(x, y)
+    k_2500, b_2500 = legacy_bk_2500(x, y)
+    k_1000, b_1000 = legacy_bk_1000(x, y)
+    k_500, b_500 = legacy_bk_500(x, y)
+    k_250 = int((x-(x_origin+(k_10rb - 1)*grid_10rb
+            + ((k_2500-1)*grid_2500) # noqa
+            + ((k_1000-1)*grid_1000)
+            + (k_500-1)*grid_500))/grid_250)+1
+    b_250 = int((y-(y_origin+(b_10rb - 1)*grid_10rb
+            + ((b_2500-1)*grid_2500) # noqa
+            + ((b_1000-1)*grid_1000)
+            + (b_500-1)*grid_500))/grid_250)+1
+    return [k_250, b_250]
+
+
+def legacy_get_nlp(skala, x, y):
+    k_10rb, b_10rb = legacy_bk_10000(x, y)
+    k_2500, b_2500 = legacy_bk_2500(x, y)
+    k_1000, b_1000 = legacy_bk_1000(x, y)
+    k_500, b_500 = legacy_bk_500(x, y)
+    k_250, b_250 = legacy_bk_250(x, y)
+
+    nlp_2500 = 4*(b_2500-1)+k_2500
+    nlp_1000 = 3*(b_1000-1)+k_1000
+    nlp_500 = 2*(b_500-1)+k_500
+    nlp_250 = 2*(b_250-1)+k_250
+
+    if (skala == "10000"):
+        return f'{k_10rb:02d}.{b_10rb:03d}'
+    elif (skala == "2500"):
+        return f'{k_10rb:02d}.{b_10rb:03d}-{nlp_2500:02d}'
+    elif (skala == "1000"):
+        return f'{k_10rb:02d}.{b_10rb:03d}-{nlp_2500:02d}-{nlp_1000}'
+    elif (skala == "500"):
+        return f'{k_10rb:02d}.{b_10rb:03d}-{nlp_2500:02d}-{nlp_1000}-{nlp_500}'
+    elif (skala == "250"):
+        return f'{k_10rb:02d}.{b_10rb:03d}-{nlp_2500:02d}-{nlp_1000}-{nlp_500}-{nlp_250}'
+    else:
+        return "Kesalahan Penentuan skala"
+
+
+def sample_points(count=2000, seed=0):
+    """Random points in and outside the grid, plus points on sheet edges"""
+    rng = random.Random(seed)
+    points = [(rng.uniform(200000, 800000), rng.uniform(9000000, 9800000)) for _ in range(count)]
+    points += [(rng.uniform(-50000, 100000), rng.uniform(0, 600000)) for _ in range(count)]
+    points += [(x_origin + i * grid_250, y_origin + i * grid_250) for i in range(100)]
+    points += [(x_origin + i * grid_250 - 1e-9, y_origin + i * grid_500) for i in range(100)]
+    return points
+
+
+class NlpTest(unittest.TestCase):
+    """Test the single pass and vectorized NLP match the former functions."""
+
+    def test_scalar(self):
+        """get_nlp and bk_250 give the same results as before."""
+        for x, y in sample_points():
+            self.assertEqual(bk_250(x, y), legacy_bk_250(x, y))
+            for skala in SCALES:
+                self.assertEqual(get_nlp(skala, x, y), legacy_get_nlp(skala, x, y))
+        self.assertEqual(get_nlp("5000", 500000, 9500000), "Kesalahan Penentuan skala")
+
+    def test_array(self):
+        """get_nlp_array gives the same strings as get_nlp at every scale."""
+        points = sample_points()
+        xs, ys = zip(*points)
+        result = get_nlp_array(xs, ys)
+        for skala in SCALES:
+            expected = [legacy_get_nlp(skala, x, y) for x, y in points]
+            self.assertEqual(result[skala].tolist(), expected)
+
+    def test_array_scales(self):
+        """Only the requested scales are returned."""
+        result = get_nlp_array([500000.0], [9500000.0], scales=('2500',))
+        self.assertEqual(list(result), ['2500'])
+        self.assertEqual(result['2500'][0], legacy_get_nlp('2500', 500000.0, 9500000.0))
+
+    def test_sheets_in_extent(self):
+        """Sheets overlapping an extent, not those only touching it."""
+        x0 = x_origin + 10 * grid_1000
+        y0 = y_origin + 20 * grid_1000
+        xs, ys = sheets_in_extent(x0, y0, x0 + 2 * grid_1000, y0 + grid_1000 + 1, '1000')
+        self.assertEqual(sorted(zip(xs.tolist(), ys.tolist())), [
+            (x0, y0), (x0, y0 + grid_1000), (x0 + grid_1000, y0), (x0 + grid_1000, y0 + grid_1000)
+        ])
+        xs, ys = sheets_in_extent(x0 + 1, y0 + 1, x0 + 1, y0 + 1, '1000')
+        self.assertEqual((xs.tolist(), ys.tolist()), ([x0], [y0]))
+
+    def test_sheet_grid(self):
+        """The generated grid covers the extent in chunks, numbered like get_nlp."""
+        xmin, ymin = 500100, 9500100
+        xmax, ymax = xmin + 20 * grid_1000, ymin + 30 * grid_1000
+        chunks = list(iter_sheet_grid(xmin, ymin, xmax, ymax, '1000', chunk_size=100))
+        self.assertGreater(len(chunks), 1)
+        sheets = [sheet for xs, ys, nlp in chunks for sheet in zip(xs.tolist(), ys.tolist(), nlp.tolist())]
+        self.assertEqual(len(sheets), 21 * 31)
+        self.assertEqual(len(set(nlp for x, y, nlp in sheets)), len(sheets))
+        for x, y, nlp in sheets[::50]:
+            self.assertEqual(nlp, legacy_get_nlp('1000', x + 1, y + 1))
+
+    def test_rectangles_wkb(self):
+        """Rectangles are closed little endian WKB polygons."""
+        wkb = rectangles_wkb(np.array([10.0, 20.0]), np.array([5.0, 5.0]), 125)
+        self.assertEqual(len(wkb), 2)
+        order, wkb_type, rings, points = struct.unpack('<BIII', wkb[1][:13])
+        self.assertEqual((order, wkb_type, rings, points), (1, 3, 1, 5))
+        coords = struct.unpack('<10d', wkb[1][13:])
+        self.assertEqual(coords, (20, 5, 145, 5, 145, 130, 20, 130, 20, 5))
+
+    def test_nlp_to_rect(self):
+        """The sheet of an NLP contains every point numbered with it."""
+        for x, y in sample_points()[:2000]:
+            for skala in SCALES:
+                nlp = legacy_get_nlp(skala, x, y)
+                xmin, ymin, xmax, ymax, sheet_scale = nlp_to_rect(nlp)
+                self.assertEqual(sheet_scale, skala)
+                self.assertTrue(xmin <= x < xmax and ymin <= y < ymax, nlp)
+        self.assertEqual(nlp_to_rect('12.034-05-7-2-3'), (98250, 482625, 98375, 482750, '250'))
+
+    def test_invalid_nlp(self):
+        """Malformed NLP strings are rejected."""
+        for nlp in ('', '12', '12.034-17', '12.034-05-10', '12.034-05-7-2-3-1', 'AB.034'):
+            self.assertFalse(is_valid_nlp(nlp), nlp)
+            self.assertRaises(ValueError, nlp_to_rect, nlp)
+        self.assertTrue(is_valid_nlp(' 12.034-05 '))
+
+
+if __name__ == "__main__":
+    suite = unittest.makeSuite(NlpTest)
+    runner = unittest.TextTestRunner(verbosity=2)
+    runner.run(suite)
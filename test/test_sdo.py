@@ -0,0 +1,105 @@
+# coding=utf-8
+"""Tests for the SDO geometry decoder."""
+
+import unittest
+
+from qgis.core import QgsGeometry, QgsPointXY
+
+from .utilities import get_qgis_app
+QGIS_APP = get_qgis_app()
+
+from modules.sdo import parse_sdo_geometry_type, sdo_to_wkb  # noqa: E402
+
+
+def legacy_parse_sdo_geometry(elem_info, ordinates):
+    """Loop based decoder used before the WKB decoder, kept as reference"""
+    start_index = elem_info[0] - 1
+    gtype, dim = parse_sdo_geometry_type(elem_info[1])
+
+    result = []
+    start = start_index
+    while True:
+        end = start + min(2, dim)
+        result.append(QgsPointXY(*ordinates[start:end]))
+        start += dim
+        if start >= len(ordinates):
+            break
+
+    if gtype == 'Point':
+        return QgsGeometry.fromPointXY(result[0])
+    elif gtype == 'LineString':
+        return QgsGeometry.fromPolylineXY(result)
+    elif gtype == 'Polygon':
+        return QgsGeometry.fromPolygonXY([result])
+
+
+def parse_sdo_geometry(elem_info, ordinates, sdo_gtype=None):
+    """Same as modules.utils.parse_sdo_geometry, which needs a running iface"""
+    geometry = QgsGeometry()
+    geometry.fromWkb(sdo_to_wkb(elem_info, ordinates, sdo_gtype))
+    return geometry
+
+
+class SdoDecoderTest(unittest.TestCase):
+    """Test the WKB based SDO decoder against the loop based decoder"""
+
+    def assertParity(self, elem_info, ordinates):
+        expected = legacy_parse_sdo_geometry(elem_info, ordinates)
+        actual = parse_sdo_geometry(elem_info, ordinates)
+        self.assertEqual(actual.asWkb(), expected.asWkb())
+
+    def test_point(self):
+        self.assertParity([1, 1, 1], [451234.125, 9123456.5])
+
+    def test_linestring(self):
+        self.assertParity([1, 2, 1], [0.0, 0.0, 10.5, 0.25, 20.0, 5.0])
+
+    def test_polygon(self):
+        self.assertParity(
+            [1, 1003, 1],
+            [451000.0, 9120000.0, 451010.5, 9120000.0, 451010.5, 9120020.25,
+             451000.0, 9120020.25, 451000.0, 9120000.0])
+
+
+class SdoElemInfoTest(unittest.TestCase):
+    """Test decoding of every sdoElemInfo triplet"""
+
+    def assertWkt(self, elem_info, ordinates, sdo_gtype, expected):
+        geometry = parse_sdo_geometry(elem_info, ordinates, sdo_gtype)
+        self.assertTrue(geometry.equals(QgsGeometry.fromWkt(expected)), geometry.asWkt())
+
+    def test_polygon_with_hole(self):
+        self.assertWkt(
+            [1, 1003, 1, 11, 2003, 1],
+            [0, 0, 10, 0, 10, 10, 0, 10, 0, 0, 2, 2, 2, 4, 4, 4, 4, 2, 2, 2],
+            2003,
+            'Polygon ((0 0, 10 0, 10 10, 0 10, 0 0), (2 2, 2 4, 4 4, 4 2, 2 2))')
+
+    def test_multipolygon(self):
+        self.assertWkt(
+            [1, 1003, 1, 11, 1003, 3],
+            [0, 0, 10, 0, 10, 10, 0, 10, 0, 0, 20, 20, 30, 30],
+            2007,
+            'MultiPolygon (((0 0, 10 0, 10 10, 0 10, 0 0)), ((20 20, 30 20, 30 30, 20 30, 20 20)))')
+
+    def test_point_cluster(self):
+        self.assertWkt([1, 1, 3], [0, 0, 1, 1, 2, 2], 2005, 'MultiPoint ((0 0), (1 1), (2 2))')
+
+    def test_three_dimensional_ordinates(self):
+        self.assertWkt(
+            [1, 1003, 1], [0, 0, 9, 10, 0, 9, 10, 10, 9, 0, 0, 9], 3003, 'Polygon ((0 0, 10 0, 10 10, 0 0))')
+
+    def test_compound_ring(self):
+        self.assertWkt(
+            [1, 1005, 2, 1, 2, 1, 5, 2, 2],
+            [0, 0, 10, 0, 5, 5, 0, 0],
+            2003,
+            'CurvePolygon (CompoundCurve ((0 0, 10 0), CircularString (10 0, 5 5, 0 0)))')
+
+    def test_circle(self):
+        self.assertWkt(
+            [1, 1003, 4], [0, 0, 2, 2, 4, 0], 2003, 'CurvePolygon (CircularString (0 0, 4 0, 0 0))')
+
+
+if __name__ == '__main__':
+    unittest.main()
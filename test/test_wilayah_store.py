@@ -0,0 +1,73 @@
+# coding=utf-8
+"""Tests for the offline wilayah hierarchy snapshot."""
+
+import os
+import shutil
+import tempfile
+import unittest
+
+from modules.wilayah_store import WilayahStore
+
+ROWS = [
+    ('provinsi', None, {'PROPINSIID': 32, 'PROPNAMA': 'Jawa Barat'}),
+    ('kabupaten', 32, {'KABUPATENID': 3273, 'KABUNAMA': 'Kota Bandung'}),
+    ('kabupaten', 32, {'KABUPATENID': 3204, 'KABUNAMA': 'Bandung'}),
+    ('kecamatan', 3273, {'KECAMATANID': 327301, 'KECANAMA': 'Sukasari'}),
+    ('desa', 327301, {'DESAID': 3273011001, 'DESANAMA': 'Sukarasa', 'ZONATM3': '48.2'}),
+]
+
+
+class WilayahStoreTest(unittest.TestCase):
+    """Test storing and reading the snapshot of a kantor."""
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, 'wilayah.sqlite')
+        self.store = WilayahStore(self.path)
+
+    def tearDown(self):
+        self.store.close()
+        shutil.rmtree(self.directory)
+
+    def test_children(self):
+        """Children are listed per parent in the order they were stored."""
+        self.store.replace(1, ROWS)
+        self.assertEqual(
+            [WilayahStore.record_name('kabupaten', row) for row in self.store.children(1, 'kabupaten', 32)],
+            ['Kota Bandung', 'Bandung']
+        )
+        self.assertEqual(self.store.children('1', 'desa', '327301'), [ROWS[-1][2]])
+        self.assertEqual(self.store.children(1, 'kecamatan', 3204), [])
+        self.assertEqual(self.store.children(2, 'provinsi'), [])
+
+    def test_reopen(self):
+        """A new store reads the snapshot written by a previous one."""
+        self.store.replace(1, ROWS, fetched_at=100.0)
+        reopened = WilayahStore(self.path)
+        try:
+            self.assertEqual(reopened.fetched_at(1), 100.0)
+            self.assertEqual(
+                [row['KABUPATENID'] for row in reopened.children(1, 'kabupaten', 32)], [3273, 3204]
+            )
+            self.assertIsNone(reopened.fetched_at(2))
+        finally:
+            reopened.close()
+
+    def test_replace_and_purge(self):
+        """A new snapshot replaces the previous one of the same kantor only."""
+        self.store.replace(1, ROWS)
+        self.store.replace(2, ROWS[:1])
+        self.store.replace(1, ROWS[:2])
+        self.assertEqual(len(self.store.children(1, 'kabupaten', 32)), 1)
+        self.assertEqual(self.store.children(1, 'kecamatan', 3273), [])
+        self.assertEqual(len(self.store.children(2, 'provinsi')), 1)
+
+        self.store.purge(1)
+        self.assertIsNone(self.store.fetched_at(1))
+        self.assertIsNotNone(self.store.fetched_at(2))
+
+
+if __name__ == "__main__":
+    suite = unittest.makeSuite(WilayahStoreTest)
+    runner = unittest.TextTestRunner(verbosity=2)
+    runner.run(suite)